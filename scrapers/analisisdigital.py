@@ -3,21 +3,30 @@
 # =====================================
 # - Enfocado en intendentes y ciudades locales
 # - Filtrado por nombres y localidades clave
-# - Backup incremental durante la corrida
+# - Bitácora JSONL durante la corrida (retoma si se corta, ver journal.py)
 # - Guardado final incremental + dedupe
 # =====================================
 
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 import time
 import os
 import random
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from hashlib import md5
 import sys
-import re
+
+import http_client
+from matcher import Matcher
+import html_cache
+import extraccion
+from html_parse import sopa
+from store import AppendStore
+from journal import Journal
+from fetch_pool import HostTokenBucket, fetch_in_order
+from page_seek import primera_pagina_vieja
+from http_client import NotModified
 
 # ------------ CONFIGURACIÓN -----------
 MEDIO             = "analisisdigital"
@@ -25,40 +34,43 @@ SECCIONES         = {
     'locales': 'https://www.analisisdigital.com.ar/locales'
 }
 OUT_PATH          = "../data/raw/analisisdigital_locales.csv"
-BACKUP_PATH       = "tmp_analisisdigital_locales.csv"
+JOURNAL_PATH      = "tmp_analisisdigital_locales.jsonl"
 HEADERS           = {'User-Agent': 'Mozilla/5.0'}
 ORDEN_CRONOLOGICO = True
 MAX_PAGINAS       = 200
-SLEEP_PAGE        = (0.8, 1.6)
+LISTADO_RATE      = 1.0          # páginas de listado por segundo (descarga en paralelo)
+LISTADO_WORKERS   = 2
 SLEEP_ART         = (0.3, 0.8)
-CHECKPOINT_EVERY  = 20
+VALIDADORES       = http_client.validadores(OUT_PATH)   # GET condicional: sólo notas ya guardadas en OUT_PATH
 
 # ----------- INTENDENTES Y LOCALIDADES -----------
-CLAVES_RELEVANTES = [
+CLAVES_RELEVANTES = {
     # Intendentes
-    "rosario romero", "romero",
-    "francisco azcué", "azcué", "azcue",
-    "mauricio davico", "davico",
-    "jose eduardo lauritto", "jose lauritto", "lauritto",
-    "dora bogdan", "bogdan",
-    "claudia monjo", "monjo",
-    
+    "rosario romero":         ["rosario romero", "romero"],
+    "francisco azcué":        ["francisco azcué", "azcué"],
+    "mauricio davico":        ["mauricio davico", "davico"],
+    "jose eduardo lauritto":  ["jose eduardo lauritto", "jose lauritto", "lauritto"],
+    "dora bogdan":            ["dora bogdan", "bogdan"],
+    "claudia monjo":          ["claudia monjo", "monjo"],
     # Localidades
-    "paraná",
-    "concordia",
-    "gualeguaychú", "gualeguaychu",
-    "concepción del uruguay", "concepcion del uruguay",
-    "gualeguay",
-    "villaguay"
-]
+    "paraná":                 ["paraná"],
+    "concordia":              ["concordia"],
+    "gualeguaychú":           ["gualeguaychú"],
+    "concepción del uruguay": ["concepción del uruguay"],
+    "gualeguay":              ["gualeguay"],
+    "villaguay":              ["villaguay"],
+}
+MATCHER = Matcher(CLAVES_RELEVANTES)   # sin tildes: "azcue" == "azcué"
 
 def menciona_relevante(texto):
-    texto_limpio = texto.lower()
-    return any(clave in texto_limpio for clave in CLAVES_RELEVANTES)
+    return MATCHER.menciona(texto)
 
 # ----------- FECHA DE CORTE -----------
-if len(sys.argv) > 1:
-    FECHA_CORTE_STR = sys.argv[1]
+# uso: python <script>.py [YYYY-MM-DD] [--replay]
+ARGS   = [a for a in sys.argv[1:] if not a.startswith("--")]
+REPLAY = "--replay" in sys.argv   # re-parsear desde data/html_cache/ sin red
+if ARGS:
+    FECHA_CORTE_STR = ARGS[0]
     FECHA_CORTE_DT = datetime.strptime(FECHA_CORTE_STR, "%Y-%m-%d")
 else:
     FECHA_CORTE_DT = datetime.today() - timedelta(days=7)
@@ -86,85 +98,111 @@ def make_hash(s: str) -> str:
     return md5(s.encode("utf-8")).hexdigest()
 
 # ----------- REQUEST ROBUSTO -----------
-def robust_request(url, headers=None, timeout=15, max_retries=3, wait=2):
-    for i in range(max_retries):
-        try:
-            return requests.get(url, headers=headers, timeout=timeout)
-        except requests.RequestException as e:
-            log(f"Intento {i+1} fallido para {url}: {e}", "warning")
-            time.sleep(wait)
-    log(f"ERROR persistente para {url} tras {max_retries} reintentos.", "error")
-    return None
-
-# ----------- PARSER DE FECHA ROBUSTO -----------
-def parse_fecha_analisis(fecha_str):
-    meses = {
-        'enero': '01', 'febrero': '02', 'marzo': '03',
-        'abril': '04', 'mayo': '05', 'junio': '06',
-        'julio': '07', 'agosto': '08', 'septiembre': '09',
-        'octubre': '10', 'noviembre': '11', 'diciembre': '12'
+# Reintentos/backoff los maneja la sesión compartida de http_client
+def robust_request(url, headers=None, timeout=15, validators=None):
+    try:
+        return http_client.get(url, headers=headers, timeout=timeout, validators=validators)
+    except requests.RequestException as e:
+        log(f"ERROR persistente para {url}: {e}", "error")
+        return None
+
+# ----------- PARSER DE NOTA -----------
+def parse_nota(html):
+    """Devuelve (fecha_parseada | NaT, contenido) a partir del HTML de detalle."""
+    nota = extraccion.extraer(MEDIO, html)
+    return (nota.fecha or pd.NaT), nota.contenido
+
+def armar_fila(enlace, titulo, seccion, n_pag, fecha_parseada, contenido):
+    return {
+        'id': make_hash(enlace),
+        'medio': MEDIO,
+        'seccion': seccion,
+        'pagina': n_pag,
+        'fecha': fecha_parseada.strftime("%Y-%m-%d %H:%M"),
+        'titulo': titulo,
+        'enlace': enlace,
+        'contenido': contenido
     }
-    if not fecha_str or not isinstance(fecha_str, str):
-        return pd.NaT
+
+# ----------- PAGINACIÓN -----------
+def url_pagina(seccion, n_pag):
+    return SECCIONES[seccion] if n_pag == 1 else f"{SECCIONES[seccion]}?page={n_pag-1}"
+
+def items_listado(html):
+    main_content = sopa(html, ["div.body"]).find('div', class_='body')
+    return main_content.find_all('div', class_='views-row') if main_content else []
+
+def enlace_item(item):
+    """URL absoluta de la nota de un item del listado, o None."""
+    a_tag = item.find('a', href=True)
+    if not a_tag:
+        return None
+    enlace = a_tag['href']
+    return enlace if enlace.startswith('http') else "https://www.analisisdigital.com.ar" + enlace
+
+def ultima_pagina(seccion, fecha_corte_dt):
+    """Primera página cuya última nota es anterior al corte (galope + binaria, ver page_seek.py)."""
+    def fecha_pagina(n_pag):
+        res = robust_request(url_pagina(seccion, n_pag), headers=HEADERS, timeout=15)
+        links = [e for e in map(enlace_item, items_listado(res.text) if res is not None else []) if e]
+        if not links:
+            return date.min
+        enlace = links[-1]
+        res_nota = robust_request(enlace, headers=HEADERS, timeout=15)
+        fecha = parse_nota(res_nota.text)[0] if res_nota is not None else None
+        return fecha.date() if fecha and not pd.isna(fecha) else None
     try:
-        partes = fecha_str.lower().split(' de ')
-        dia = int(partes[0].strip())
-        mes = meses.get(partes[1].strip(), None)
-        if mes is None:
-            log(f"Mes no reconocido en fecha: {fecha_str}", "warning")
-            return pd.NaT
-        anio_hora = partes[2].split(' - ')
-        anio = anio_hora[0].strip()
-        hora = anio_hora[1].strip() if len(anio_hora) > 1 else "00:00"
-        return datetime.strptime(f"{anio}-{mes}-{dia:02d} {hora}", "%Y-%m-%d %H:%M")
-    except Exception:
-        try:
-            m = re.search(r'(\d{1,2}) de ([a-záéíóú]+) de (\d{4})', fecha_str.lower())
-            if m:
-                dia, mes_str, anio = int(m.group(1)), m.group(2), int(m.group(3))
-                mes = meses.get(mes_str, None)
-                if mes:
-                    return datetime.strptime(f"{anio}-{mes}-{dia:02d} 00:00", "%Y-%m-%d %H:%M")
-        except Exception as e:
-            log(f"Error parseando fecha: {fecha_str} -> {e}", "warning")
-        return pd.NaT
+        return primera_pagina_vieja(fecha_pagina, fecha_corte_dt.date(), MAX_PAGINAS, log=log)
+    except Exception as e:
+        log(f"Seek de páginas falló ({e}); recorro hasta {MAX_PAGINAS}", "warning")
+        return MAX_PAGINAS
+
+def listados(seccion, ultima):
+    """
+    (n_pag, respuesta) de las páginas 1..ultima, en orden. Se bajan en paralelo a lo
+    sumo LISTADO_WORKERS por delante: cortar por fecha no descarga el resto.
+    """
+    urls = [url_pagina(seccion, n) for n in range(1, ultima + 1)]
+    fetch = lambda u: robust_request(u, headers=HEADERS, timeout=15)
+    throttle = HostTokenBucket(rate=LISTADO_RATE, burst=LISTADO_WORKERS)
+    descargas = fetch_in_order(fetch, urls, throttle, max_workers=LISTADO_WORKERS, adelanto=LISTADO_WORKERS)
+    try:
+        for n_pag, (url, res) in enumerate(descargas, 1):
+            yield n_pag, url, res
+    finally:
+        descargas.close()
 
 # ----------- SCRAPER FUNC -----------
-def scrapear_seccion(seccion, fecha_corte_dt, backup_path):
+def scrapear_seccion(seccion, fecha_corte_dt, journal):
     log(f"Iniciando scraping: {MEDIO} - {seccion}")
-    resultados = []
     omitidas_sin_fecha = 0
-    if os.path.exists(backup_path):
-        df_old = pd.read_csv(backup_path)
-        resultados = df_old.to_dict('records')
-        log(f"Cargadas {len(resultados)} noticias de backup")
+    # notas de una corrida anterior cortada (misma fecha de corte): no se vuelven a pedir
+    resultados = [r for r in journal.filas() if r.get('seccion') == seccion]
+    if len(journal):
+        log(f"Retomando: {len(journal)} notas ya procesadas ({len(resultados)} relevantes en {seccion})")
 
-    enlaces_vistos = {r['enlace'] for r in resultados}
+    enlaces_vistos = set(journal.hechas)
+    salida = AppendStore(OUT_PATH, key="id")
 
-    for n_pag in range(1, MAX_PAGINAS + 1):
-        url = SECCIONES[seccion] if n_pag == 1 else f"{SECCIONES[seccion]}?page={n_pag-1}"
-        log(f"Página {n_pag}: {url}")
+    ultima = ultima_pagina(seccion, fecha_corte_dt) if ORDEN_CRONOLOGICO else MAX_PAGINAS
+    for n_pag, url, res in listados(seccion, ultima):
+        log(f"Página {n_pag}/{ultima}: {url}")
         t0 = time.time()
 
         try:
-            res = robust_request(url, headers=HEADERS, timeout=15)
-            if res is None:
+            if res is None or isinstance(res, Exception):
                 log(f"Omitida página {n_pag} por fallo repetido", "warning")
                 continue
-            soup = BeautifulSoup(res.text, "html.parser")
-            main_content = soup.find('div', class_='body')
-            items = main_content.find_all('div', class_='views-row') if main_content else []
+            items = items_listado(res.text)
+            # condicional sólo para las notas ya en OUT_PATH (un 304 no puede perder filas):
+            # una consulta al índice por página
+            guardadas = salida.contiene([make_hash(e) for e in map(enlace_item, items) if e])
 
             for item in items:
                 try:
-                    a_tag = item.find('a', href=True)
-                    if not a_tag:
+                    enlace = enlace_item(item)
+                    if not enlace or f"/{seccion}/" not in enlace:
                         continue
-                    enlace = a_tag['href']
-                    if f"/{seccion}/" not in enlace:
-                        continue
-                    if not enlace.startswith('http'):
-                        enlace = "https://www.analisisdigital.com.ar" + enlace
                     if enlace in enlaces_vistos:
                         continue
 
@@ -172,61 +210,50 @@ def scrapear_seccion(seccion, fecha_corte_dt, backup_path):
                     h3_tag = item.find('h3')
                     titulo = h2_tag.get_text(strip=True) if h2_tag else (h3_tag.get_text(strip=True) if h3_tag else '')
 
-                    res_nota = robust_request(enlace, headers=HEADERS, timeout=15)
+                    guardada = make_hash(enlace) in guardadas
+                    try:
+                        res_nota = robust_request(enlace, headers=HEADERS, timeout=15,
+                                                  validators=VALIDADORES if guardada else None)
+                    except NotModified as e:
+                        # Sin cambios desde la última corrida: sólo sirve para el corte por fecha
+                        f304 = e.meta.get("fecha")
+                        if ORDEN_CRONOLOGICO and f304 and datetime.strptime(f304, "%Y-%m-%d").date() < fecha_corte_dt.date():
+                            log(f"Corte por fecha (304): {f304} < {fecha_corte_dt}", "info")
+                            return resultados
+                        journal.registrar(enlace)
+                        continue
                     if res_nota is None:
                         log(f"Omitida nota {enlace} por fallo repetido", "warning")
                         continue
 
-                    soup_nota = BeautifulSoup(res_nota.text, "html.parser")
-                    fecha_tag = soup_nota.find('div', class_=lambda x: x and 'field--name-node-post-date' in x)
-                    fecha_raw = fecha_tag.get_text(strip=True) if fecha_tag else ''
-                    fecha_parseada = parse_fecha_analisis(fecha_raw)
-
-                    if not fecha_parseada or pd.isna(fecha_parseada):
-                        body_txt = soup_nota.get_text(separator=" ", strip=True)
-                        fecha_regex = re.search(r'(\d{1,2}) de ([a-záéíóú]+) de (\d{4})', body_txt, re.I)
-                        if fecha_regex:
-                            fecha_parseada = parse_fecha_analisis(fecha_regex.group(0))
+                    html_cache.put(MEDIO, enlace, res_nota.text, titulo=titulo, seccion=seccion, pagina=n_pag)
+                    fecha_parseada, contenido = parse_nota(res_nota.text)
                     if not fecha_parseada or pd.isna(fecha_parseada):
                         log(f"Nota omitida por no parsear fecha: {enlace}", "warning")
                         omitidas_sin_fecha += 1
+                        journal.registrar(enlace)
                         continue
 
                     if ORDEN_CRONOLOGICO and fecha_parseada.date() < fecha_corte_dt.date():
                         log(f"Corte por fecha: {fecha_parseada} < {fecha_corte_dt}", "info")
                         return resultados
 
-                    cuerpo_div = soup_nota.find('div', class_=lambda x: x and 'body-noticia' in x)
-                    parrafos = [p.get_text(strip=True) for p in cuerpo_div.find_all('p')] if cuerpo_div else []
-                    contenido = "\n".join(parrafos)
-
                     # FILTRAR por relevancia
                     if not (menciona_relevante(titulo) or menciona_relevante(contenido)):
+                        journal.registrar(enlace)
+                        enlaces_vistos.add(enlace)
                         continue
 
-                    row = {
-                        'id': make_hash(enlace),
-                        'medio': MEDIO,
-                        'seccion': seccion,
-                        'pagina': n_pag,
-                        'fecha': fecha_parseada.strftime("%Y-%m-%d %H:%M"),
-                        'titulo': titulo,
-                        'enlace': enlace,
-                        'contenido': contenido
-                    }
+                    row = armar_fila(enlace, titulo, seccion, n_pag, fecha_parseada, contenido)
                     resultados.append(row)
+                    VALIDADORES.remember(enlace, res_nota, fecha=fecha_parseada.strftime("%Y-%m-%d"))
                     enlaces_vistos.add(enlace)
-
-                    if len(resultados) % CHECKPOINT_EVERY == 0:
-                        pd.DataFrame(resultados).to_csv(backup_path, index=False)
-                        log(f"Backup parcial guardado: {len(resultados)} filas")
+                    journal.registrar(enlace, row)
 
                     time.sleep(random.uniform(*SLEEP_ART))
                 except Exception as e:
                     log(f"Error scrapeando item en página {n_pag}: {e}", "warning")
 
-            pd.DataFrame(resultados).to_csv(backup_path, index=False)
-
             if not items:
                 log(f"No hay más items en página {n_pag}.", "warning")
                 break
@@ -236,17 +263,37 @@ def scrapear_seccion(seccion, fecha_corte_dt, backup_path):
 
         t1 = time.time()
         log(f"Tiempo: {t1 - t0:.1f} segundos")
-        time.sleep(random.uniform(*SLEEP_PAGE))
 
     log(f"Total de noticias omitidas por problemas de fecha: {omitidas_sin_fecha}", "warning")
     return resultados
 
+# ----------- REPLAY (sin red) -----------
+def replay_seccion(seccion, fecha_corte_dt):
+    """Re-parsea desde data/html_cache/ las notas de la sección con fecha >= corte."""
+    resultados = []
+    for enlace, html, meta in html_cache.iter_medio(MEDIO):
+        if meta.get("seccion") != seccion:
+            continue
+        fecha_parseada, contenido = parse_nota(html)
+        if not fecha_parseada or pd.isna(fecha_parseada) or fecha_parseada.date() < fecha_corte_dt.date():
+            continue
+        titulo = meta.get("titulo", "")
+        if not (menciona_relevante(titulo) or menciona_relevante(contenido)):
+            continue
+        resultados.append(armar_fila(enlace, titulo, seccion, meta.get("pagina"), fecha_parseada, contenido))
+    log(f"Replay {seccion}: {len(resultados)} notas re-parseadas desde caché")
+    return resultados
+
 # ----------- MAIN -----------
 if __name__ == "__main__":
     os.makedirs(os.path.dirname(OUT_PATH), exist_ok=True)
     all_notas = []
+    journal = None if REPLAY else Journal(JOURNAL_PATH, meta={"medio": MEDIO, "fecha_corte": FECHA_CORTE_STR})
     for sec in SECCIONES:
-        notas = scrapear_seccion(sec, FECHA_CORTE_DT, BACKUP_PATH)
+        if REPLAY:
+            notas = replay_seccion(sec, FECHA_CORTE_DT)
+        else:
+            notas = scrapear_seccion(sec, FECHA_CORTE_DT, journal)
         all_notas.extend(notas)
 
     df = pd.DataFrame(all_notas)
@@ -254,12 +301,9 @@ if __name__ == "__main__":
         log("No se obtuvieron resultados.", "warning")
     else:
         df = df.drop_duplicates(subset=["id"]).reset_index(drop=True)
-        if os.path.exists(OUT_PATH):
-            old = pd.read_csv(OUT_PATH)
-            antes = len(old)
-            combined = pd.concat([old, df], ignore_index=True).drop_duplicates(subset=["id"])
-            combined.to_csv(OUT_PATH, index=False)
-            log(f"Incremental: {antes} -> {len(combined)} filas (+{len(combined)-antes})")
-        else:
-            df.to_csv(OUT_PATH, index=False)
-            log(f"Archivo nuevo guardado: {len(df)} filas")
+        # append-only (ver store.py); en replay las filas re-extraídas pisan a las previas
+        antes, despues = AppendStore(OUT_PATH, key="id").save_incremental(df, reemplazar=REPLAY)
+        log(f"Incremental: {antes} -> {despues} filas (+{despues-antes})")
+        VALIDADORES.save()  # recién con las filas en OUT_PATH
+    if journal is not None:
+        journal.clear()  # salida final escrita: la bitácora ya no hace falta
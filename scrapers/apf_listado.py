@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Listado de APF Digital sin Selenium.
+
+El botón "Ver más noticias" (span.button[data-role='categorias']) no navega: el JS
+del sitio pide un fragmento HTML con las tarjetas siguientes usando los data-* del
+botón (data-qpage = página siguiente) y lo agrega al DOM. Acá se hace ese mismo
+pedido por HTTP y se parsean las tarjetas del fragmento, así el listado corre en
+cualquier worker sin Chrome.
+
+- Si el botón trae data-url / data-href se usa esa ruta; si no, VER_MAS_PATH.
+- El resto de los data-* del botón (salvo role) viajan como parámetros de query.
+- La respuesta puede ser HTML o JSON con el HTML adentro: se aceptan ambos.
+- El data-qpage siguiente sale del botón que viene en el fragmento; si no viene,
+  qpage + 1. El listado termina cuando un fragmento no trae tarjetas nuevas (si el
+  servidor ignora el qpage y repite una página, no se queda dando vueltas) o al
+  llegar a MAX_PAGINAS. Un fragmento con error HTTP lanza la excepción: el
+  llamador decide si sigue con Selenium.
+"""
+
+import json
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlencode, urljoin
+
+from bs4 import BeautifulSoup
+
+import http_client
+from html_parse import sopa
+
+BASE_URL = "https://www.apfdigital.com.ar"
+VER_MAS_PATH = "/ajax/{role}"   # ruta del fragmento cuando el botón no la declara
+MAX_PAGINAS = 1000              # tope duro aunque el llamador no ponga max_paginas
+SEL_BOTON = "span.button[data-role='categorias']"
+SEL_CARDS = (
+    "article.listado-noticias-relacionadas, "
+    "article.listado-noticias, "
+    "article.noticia-relacionada, "
+    "article.listado-noticias-simple"
+)
+
+def parse_cards(soup: BeautifulSoup) -> List[Dict[str, str]]:
+    """Tarjetas del listado → [{'url', 'titulo'}] (mismos selectores que la versión Selenium)."""
+    return parse_cards_tags(soup.select(SEL_CARDS))
+
+def parse_cards_tags(cards) -> List[Dict[str, str]]:
+    """Igual que parse_cards, sobre tarjetas ya seleccionadas (p. ej. las de ListadoIncremental)."""
+    out = []
+    for c in cards:
+        a_tag = c.select_one("a.div-image[href], a[href]")
+        if not a_tag:
+            continue
+        h2_tag = c.select_one("h2.text-noticia-simple-titulo, h2")
+        out.append({
+            "url": urljoin(BASE_URL + "/", a_tag.get("href")),
+            "titulo": h2_tag.get_text(strip=True) if h2_tag else "",
+        })
+    return out
+
+def boton_ver_mas(soup: BeautifulSoup) -> Optional[Dict[str, str]]:
+    """data-* del botón 'Ver más' (sin el prefijo), o None si no hay botón."""
+    btn = soup.select_one(SEL_BOTON)
+    if btn is None:
+        return None
+    return {k[5:]: v for k, v in btn.attrs.items() if k.startswith("data-")}
+
+def fragment_request(seccion_url: str, data: Dict[str, str]):
+    """(url, params) del pedido que dispara el botón."""
+    ruta = data.get("url") or data.get("href") or VER_MAS_PATH.format(role=data.get("role", ""))
+    params = {k: v for k, v in data.items() if k not in ("url", "href", "role")}
+    return urljoin(seccion_url, ruta), params
+
+def _con_query(url: str, params: Dict[str, str]) -> str:
+    return f"{url}{'&' if '?' in url else '?'}{urlencode(params)}" if params else url
+
+def _fragment_html(r) -> str:
+    if "json" not in r.headers.get("Content-Type", ""):
+        return r.text
+    try:
+        payload = r.json()
+    except ValueError:
+        return r.text
+    if isinstance(payload, str):
+        return payload
+    if isinstance(payload, dict):
+        # el HTML viene en alguno de los campos de texto ('html', 'content', ...)
+        return "".join(v for v in payload.values() if isinstance(v, str) and "<" in v)
+    return json.dumps(payload)
+
+def iter_paginas(seccion_url: str, headers: Optional[dict] = None,
+                 max_paginas: Optional[int] = None) -> Iterator[List[Dict[str, str]]]:
+    """
+    Rinde las tarjetas de cada página del listado (sólo las que no salieron en
+    páginas anteriores). Termina cuando una página no agrega tarjetas nuevas.
+    """
+    limite = min(max_paginas or MAX_PAGINAS, MAX_PAGINAS)
+    vistas = set()
+    r = http_client.get(seccion_url, headers=headers)
+    r.raise_for_status()
+    soup = sopa(r.text)
+    cards = parse_cards(soup)
+    data = boton_ver_mas(soup)
+    pagina = 1
+    while True:
+        cards = [c for c in cards if c["url"] not in vistas]
+        if not cards:
+            return
+        vistas.update(c["url"] for c in cards)
+        yield cards
+        if data is None or pagina >= limite:
+            return
+        url, params = fragment_request(seccion_url, data)
+        r = http_client.get(_con_query(url, params), headers=headers)
+        r.raise_for_status()
+        frag = sopa(_fragment_html(r))
+        cards = parse_cards(frag)
+        siguiente = boton_ver_mas(frag)
+        if siguiente is None:
+            siguiente = dict(data)
+            try:
+                siguiente["qpage"] = str(int(data.get("qpage", pagina)) + 1)
+            except ValueError:
+                return
+        data = siguiente
+        pagina += 1
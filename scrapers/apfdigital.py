@@ -3,40 +3,56 @@
 # ===========================================
 # - Sección: Municipales
 # - Filtra por intendentes y ciudades clave
-# - Selenium para listado, Requests para detalle
+# - Listado por HTTP (endpoint de "ver más", ver apf_listado.py);
+#   Selenium sólo como respaldo. Requests para detalle
 # - Corte por fecha y guardado incremental
 # ===========================================
 
-import os, re, time, random, logging
+import os, time, random, logging
 from datetime import datetime, timedelta
 from hashlib import md5
-from urllib.parse import urljoin
 
-import requests
-from requests.adapters import HTTPAdapter, Retry
 import pandas as pd
-from bs4 import BeautifulSoup
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import (
-    NoSuchElementException, StaleElementReferenceException, TimeoutException
-)
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+# ----- Selenium opcional (respaldo del listado HTTP) -----
+try:
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.common.exceptions import (
+        NoSuchElementException, StaleElementReferenceException, TimeoutException
+    )
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    from webdriver_manager.chrome import ChromeDriverManager
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    SELENIUM_OK = True
+except Exception:
+    SELENIUM_OK = False
 import sys
 
+import apf_listado
+from frontier import Frontier
+from journal import Journal
+from listado_incremental import ListadoIncremental, esperar_mas
+import http_client
+from matcher import Matcher
+import html_cache
+import extraccion
+from store import AppendStore
+from http_client import NotModified
+
 # ------------------ CONFIG ------------------
 
 SECCIONES_INICIO = [
     "https://www.apfdigital.com.ar/municipales"
 ]
 
-if len(sys.argv) > 1:
-    FECHA_CORTE_STR = sys.argv[1]
+# uso: python <script>.py [YYYY-MM-DD] [--replay]
+ARGS   = [a for a in sys.argv[1:] if not a.startswith("--")]
+REPLAY = "--replay" in sys.argv   # re-parsear desde data/html_cache/ sin red
+if ARGS:
+    FECHA_CORTE_STR = ARGS[0]
     FECHA_CORTE_DT = datetime.strptime(FECHA_CORTE_STR, "%Y-%m-%d")
 else:
     FECHA_CORTE_DT = datetime.today() - timedelta(days=7)
@@ -46,9 +62,10 @@ print(f"Fecha de corte: {FECHA_CORTE_STR}")
 OUT_PATH          = "../data/raw/apfdigital_municipales.csv"
 LOG_PATH          = f"logs/apfdigital_{datetime.now().date()}.log"
 HEADLESS          = True
+LISTADO_HTTP      = True   # False = forzar el listado con Selenium
 MAX_NOTAS_TOTAL   = None
-SAVE_EVERY        = 100
 TMP_DIR           = "tmp"
+JOURNAL_PATH      = os.path.join(TMP_DIR, "apf_journal.jsonl")   # notas hechas + filas, para retomar
 BASE_URL          = "https://www.apfdigital.com.ar"
 
 WAIT_SELECTOR_LIST = (
@@ -58,24 +75,26 @@ WAIT_SELECTOR_LIST = (
     "article.listado-noticias-simple"
 )
 
-CLAVES_RELEVANTES = [
-    "rosario romero", "romero",
-    "francisco azcué", "azcué", "azcue",
-    "mauricio davico", "davico",
-    "jose eduardo lauritto", "jose lauritto", "lauritto",
-    "dora bogdan", "bogdan",
-    "claudia monjo", "monjo",
-    "paraná",
-    "concordia",
-    "gualeguaychú", "gualeguaychu",
-    "concepción del uruguay", "concepcion del uruguay",
-    "gualeguay",
-    "villaguay"
-]
+CLAVES_RELEVANTES = {
+    # Intendentes
+    "rosario romero":         ["rosario romero", "romero"],
+    "francisco azcué":        ["francisco azcué", "azcué"],
+    "mauricio davico":        ["mauricio davico", "davico"],
+    "jose eduardo lauritto":  ["jose eduardo lauritto", "jose lauritto", "lauritto"],
+    "dora bogdan":            ["dora bogdan", "bogdan"],
+    "claudia monjo":          ["claudia monjo", "monjo"],
+    # Localidades
+    "paraná":                 ["paraná"],
+    "concordia":              ["concordia"],
+    "gualeguaychú":           ["gualeguaychú"],
+    "concepción del uruguay": ["concepción del uruguay"],
+    "gualeguay":              ["gualeguay"],
+    "villaguay":              ["villaguay"],
+}
+MATCHER = Matcher(CLAVES_RELEVANTES)   # sin tildes: "azcue" == "azcué"
 
 def menciona_relevante(texto):
-    texto_limpio = texto.lower()
-    return any(clave in texto_limpio for clave in CLAVES_RELEVANTES)
+    return MATCHER.menciona(texto)
 
 os.makedirs("logs", exist_ok=True)
 os.makedirs(TMP_DIR, exist_ok=True)
@@ -94,24 +113,8 @@ def log(msg, level="info"):
     getattr(logging, level)(msg)
     print(msg)
 
-session = requests.Session()
-retries = Retry(total=3, backoff_factor=0.6, status_forcelist=[500,502,503,504])
-session.mount("https://", HTTPAdapter(max_retries=retries))
 HEADERS = {"User-Agent": "Mozilla/5.0"}
 
-MESES_ES = {
-    "enero":1,"febrero":2,"marzo":3,"abril":4,"mayo":5,"junio":6,
-    "julio":7,"agosto":8,"septiembre":9,"octubre":10,"noviembre":11,"diciembre":12
-}
-def parse_fecha_apf(txt):
-    if not txt: return None
-    m = re.search(r'(\d{1,2})\s+de\s+([a-záéíóú]+)\s+de\s+(\d{4})', txt.lower())
-    if not m: return None
-    d = int(m.group(1)); mes = MESES_ES.get(m.group(2).strip(" .")); y = int(m.group(3))
-    if not mes: return None
-    try: return datetime(y, mes, d)
-    except: return None
-
 def setup_driver(headless=True):
     opts = Options()
     if headless: opts.add_argument("--headless=new")
@@ -124,18 +127,9 @@ def setup_driver(headless=True):
 def make_hash(v: str) -> str:
     return md5(v.encode("utf-8")).hexdigest()
 
-def get_articles_on_page(driver):
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    cards = soup.select(WAIT_SELECTOR_LIST)
-    out = []
-    for c in cards:
-        a_tag = c.select_one("a[href]")
-        h2_tag = c.select_one("h2.text-noticia-simple-titulo, h2")
-        if not a_tag: continue
-        href   = urljoin(BASE_URL + "/", a_tag.get("href"))
-        titulo = h2_tag.get_text(strip=True) if h2_tag else ""
-        out.append({"url": href, "titulo": titulo})
-    return out
+def get_articles_on_page(listado):
+    """Tarjetas agregadas desde la lectura anterior (no re-parsea el DOM acumulado)."""
+    return apf_listado.parse_cards_tags(listado.nuevas())
 
 def click_next_page(driver, prev_count, timeout=10):
     try:
@@ -150,9 +144,8 @@ def click_next_page(driver, prev_count, timeout=10):
                 driver.execute_script("arguments[0].scrollIntoView();", nxt)
                 time.sleep(0.2)
                 driver.execute_script("arguments[0].click();", nxt)
-                WebDriverWait(driver, timeout).until(
-                    lambda d: len(BeautifulSoup(d.page_source,"html.parser").select(WAIT_SELECTOR_LIST)) > prev_count
-                )
+                if not esperar_mas(driver, WAIT_SELECTOR_LIST, prev_count, timeout):
+                    raise TimeoutException()
                 return True
             except Exception:
                 continue
@@ -170,54 +163,39 @@ def click_next_page(driver, prev_count, timeout=10):
         log(f"No se pudo clickear span.button: {e}", "warning")
         return False
 
-    try:
-        WebDriverWait(driver, timeout).until(
-            lambda d: len(BeautifulSoup(d.page_source,"html.parser").select(WAIT_SELECTOR_LIST)) > prev_count
-        )
+    if esperar_mas(driver, WAIT_SELECTOR_LIST, prev_count, timeout):
         return True
-    except TimeoutException:
-        try:
-            btn_after = driver.find_element(By.CSS_SELECTOR, "span.button[data-role='categorias']")
-            if btn_after.get_attribute("data-qpage") != qpage_before:
-                return True
-        except Exception:
-            pass
-        log("No cargaron nuevas noticias tras el click.", "info")
-        return False
-
-def scrap_articulo_requests(url_abs, titulo_listado, default_section=None):
-    r = session.get(url_abs, headers=HEADERS, timeout=25)
+    try:
+        btn_after = driver.find_element(By.CSS_SELECTOR, "span.button[data-role='categorias']")
+        if btn_after.get_attribute("data-qpage") != qpage_before:
+            return True
+    except Exception:
+        pass
+    log("No cargaron nuevas noticias tras el click.", "info")
+    return False
+
+def scrap_articulo_requests(url_abs, titulo_listado, default_section=None, validators=None):
+    """
+    (row, fecha, respuesta); row=None si la nota no es relevante (la fecha igual
+    sirve para el corte). Con `validators` se pide condicional (304 → NotModified);
+    el llamador los pasa sólo si la nota ya está en su salida y registra los
+    validadores recién al sumar la fila.
+    """
+    r = http_client.get(url_abs, headers=HEADERS, timeout=25, validators=validators)
     r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
+    html_cache.put("apfdigital", url_abs, r.text, titulo=titulo_listado, seccion="municipales")
+    row, fecha = parse_articulo(r.text, url_abs, titulo_listado)
+    return row, fecha, r
 
-    h1 = soup.select_one("h1.titulo-nota") or soup.select_one("h1")
-    titulo = h1.get_text(strip=True) if h1 else titulo_listado
-
-    h2_bajada = soup.select_one("h2.bajada")
-    copete = h2_bajada.get_text(strip=True) if h2_bajada else ""
-
-    fecha = None
-    tag_data = soup.select_one("[data-fecha]")
-    if tag_data and tag_data.get("data-fecha"):
-        try:
-            fecha = datetime.strptime(tag_data["data-fecha"], "%Y/%m/%d %H:%M:%S")
-        except Exception:
-            pass
-    if fecha is None:
-        tag_txt = soup.select_one("div[class*='fecha'], span[class*='fecha'], time")
-        fecha_txt = tag_txt.get_text(strip=True) if tag_txt else ""
-        fecha = parse_fecha_apf(fecha_txt)
-
-    cuerpo_div = soup.select_one("div.noticia-contenido, div.cuerpo-nota, div.texto, div#cuerpo-nota")
-    if cuerpo_div:
-        texto = " ".join(p.get_text(strip=True) for p in cuerpo_div.find_all(["p","h3"]) if p.get_text(strip=True))
-    else:
-        texto = ""
-
-    contenido_completo = (copete + " " + texto).strip()
+def parse_articulo(html, url_abs, titulo_listado):
+    """Extrae la nota desde el HTML de detalle. row=None si no menciona nada relevante."""
+    nota = extraccion.extraer("apfdigital", html)
+    titulo = nota.titulo or titulo_listado
+    fecha = nota.fecha
+    contenido_completo = nota.contenido
 
     if not (menciona_relevante(titulo) or menciona_relevante(contenido_completo)):
-        raise ValueError("nota no relevante")
+        return None, fecha
 
     return {
         "id": make_hash(url_abs),
@@ -229,41 +207,77 @@ def scrap_articulo_requests(url_abs, titulo_listado, default_section=None):
         "contenido": contenido_completo
     }, fecha
 
-def save_incremental(df, path):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    if os.path.exists(path):
-        prev = pd.read_csv(path)
-        before = len(prev)
-        all_df = pd.concat([prev, df], ignore_index=True)
-        all_df.drop_duplicates(subset=["id"], inplace=True)
-        all_df.to_csv(path, index=False)
-        log(f"Incremental: {before} -> {len(all_df)} filas (+{len(all_df)-before})")
-    else:
-        df.to_csv(path, index=False)
-        log(f"Archivo nuevo guardado: {len(df)} filas")
+def save_incremental(df, path, reemplazar=False):
+    """Append-only sobre el CSV (ver store.py). reemplazar=True: las filas nuevas pisan a las previas."""
+    before, after = AppendStore(path, key="id").save_incremental(df, reemplazar=reemplazar)
+    log(f"Incremental: {before} -> {after} filas (+{after-before})")
+
+def paginas_selenium(drv, start_url):
+    """Rinde sólo las tarjetas nuevas de cada 'Ver más', igual que el listado HTTP."""
+    drv.get(start_url)
+    time.sleep(2)
+    listado = ListadoIncremental(drv, WAIT_SELECTOR_LIST)
+    while True:
+        articles = get_articles_on_page(listado)
+        if not articles:
+            return
+        yield articles
+        if not click_next_page(drv, prev_count=listado.offset):
+            return
+
+def iter_listado(start_url, headless, drivers):
+    """
+    Páginas de tarjetas de la sección. Primero por HTTP (apf_listado); si se corta
+    con error o el endpoint de "Ver más" no llega a la página 2, se levanta Chrome
+    (una sola vez, queda en `drivers`). Las tarjetas repetidas las filtra la frontera.
+    """
+    if LISTADO_HTTP:
+        paginas = 0
+        try:
+            for cards in apf_listado.iter_paginas(start_url, headers=HEADERS):
+                paginas += 1
+                yield cards
+            if paginas >= 2:
+                return
+            log(f"Listado HTTP: {paginas} página(s), el 'Ver más' no devolvió tarjetas; uso Selenium.", "warning")
+        except Exception as e:
+            log(f"Listado HTTP interrumpido en la página {paginas + 1}: {e}; uso Selenium.", "warning")
+    if not SELENIUM_OK:
+        log("Selenium no disponible. Fin sección.", "warning")
+        return
+    if not drivers:
+        drivers.append(setup_driver(headless=headless))
+    yield from paginas_selenium(drivers[0], start_url)
 
 def run_full_apf(secciones_inicio, fecha_corte, out_path,
-                 headless=True, max_notas_total=None, save_every=SAVE_EVERY):
+                 headless=True, max_notas_total=None):
 
-    drv = setup_driver(headless=headless)
-    resultados = []
-    total_scraped = 0
+    drivers = []
     cortar = False
 
+    # retomar sólo si la bitácora es de la misma fecha de corte (si no, empieza de cero)
+    journal = Journal(JOURNAL_PATH, meta={"medio": "apfdigital", "fecha_corte": fecha_corte.strftime("%Y-%m-%d")})
+    frontier = Frontier()
+    for url in journal.hechas:
+        frontier.marcar(url)
+    resultados = journal.filas()
+    total_scraped = len(resultados)
+    salida = AppendStore(out_path, key="id")
+    validadores = http_client.validadores(out_path)
+    if len(journal):
+        log(f"Retomando corrida: {len(journal)} notas hechas, {total_scraped} filas desde {JOURNAL_PATH}")
+
     try:
         for start_url in secciones_inicio:
             if cortar: break
             log(f"=== Sección inicial: {start_url} ===")
 
-            drv.get(start_url)
-            time.sleep(2)
-
-            while True:
-                articles = get_articles_on_page(drv)
+            for articles in iter_listado(start_url, headless, drivers):
+                articles = frontier.nuevas(articles, key=lambda a: a["url"])
                 prev_count = len(articles)
-                if prev_count == 0:
-                    log("Sin artículos. Fin sección.")
-                    break
+                if not articles:
+                    log("Página sin tarjetas nuevas.")
+                    continue
 
                 log(f"Voy a scrapear {prev_count} notas (acumulado={total_scraped})")
 
@@ -275,8 +289,21 @@ def run_full_apf(secciones_inicio, fecha_corte, out_path,
                         break
 
                     url_abs = art["url"]
+                    # condicional sólo si la nota ya está en out_path: un 304 no puede perder filas
+                    guardada = bool(salida.contiene([make_hash(url_abs)]))
                     try:
-                        row, fecha = scrap_articulo_requests(url_abs, art["titulo"])
+                        row, fecha, r = scrap_articulo_requests(url_abs, art["titulo"],
+                                                                validators=validadores if guardada else None)
+                    except NotModified as e:
+                        # Sin cambios desde la última corrida: sólo sirve para el corte por fecha
+                        f304 = e.meta.get("fecha")
+                        if f304 and datetime.strptime(f304, "%Y-%m-%d") < fecha_corte:
+                            log(f"Corte por fecha (304): {f304} < {fecha_corte.date()} (sección terminada)")
+                            cortar = True
+                            break
+                        frontier.marcar(url_abs)
+                        journal.registrar(url_abs)
+                        continue
                     except Exception as e:
                         log(f"Error nota {url_abs} ({i}/{prev_count}): {e}", "warning")
                         continue
@@ -286,38 +313,65 @@ def run_full_apf(secciones_inicio, fecha_corte, out_path,
                         cortar = True
                         break
 
+                    if row is None:
+                        # no relevante: queda en la bitácora para no pedirla de nuevo al retomar
+                        frontier.marcar(url_abs)
+                        journal.registrar(url_abs)
+                        continue
+
                     resultados.append(row)
+                    validadores.remember(url_abs, r, fecha=fecha.strftime("%Y-%m-%d") if fecha else "")
+                    frontier.marcar(url_abs)
+                    journal.registrar(url_abs, row)
                     total_scraped += 1
 
                     if i % 20 == 0 or i == prev_count:
                         log(f"Notas procesadas (sección actual): {i}/{prev_count}")
 
-                    if save_every and (len(resultados) % save_every == 0):
-                        tmp_df = pd.DataFrame(resultados).drop_duplicates(subset=["id"])
-                        tmp_path = os.path.join(TMP_DIR, f"apf_partial_{total_scraped}.csv")
-                        tmp_df.to_csv(tmp_path, index=False)
-                        log(f"Checkpoint guardado ({len(tmp_df)} filas) -> {tmp_path}")
-
                 if cortar:
                     break
-
-                if not click_next_page(drv, prev_count=prev_count):
-                    break
+            log("Fin sección.")
 
     finally:
-        drv.quit()
+        for drv in drivers:
+            drv.quit()
+        journal.close()
 
     df = pd.DataFrame(resultados)
     if df.empty:
         log("No se obtuvieron resultados nuevos.", "warning")
+        journal.clear()
         return df
 
     df.drop_duplicates(subset=["id"], inplace=True)
     save_incremental(df, out_path)
+    validadores.save()  # recién con las filas en out_path
+    journal.clear()
+    return df
+
+def replay_apf(fecha_corte, out_path):
+    """Re-parsea desde la caché las notas de municipales con fecha >= corte y reemplaza sus filas."""
+    resultados = []
+    for url_abs, html, meta in html_cache.iter_medio("apfdigital"):
+        if meta.get("seccion") != "municipales":
+            continue
+        row, fecha = parse_articulo(html, url_abs, meta.get("titulo", ""))
+        if row is None or (fecha and fecha < fecha_corte):
+            continue
+        resultados.append(row)
+    df = pd.DataFrame(resultados)
+    log(f"Replay: {len(df)} notas re-parseadas desde caché")
+    if not df.empty:
+        df.drop_duplicates(subset=["id"], inplace=True)
+        save_incremental(df, out_path, reemplazar=True)
     return df
 
 if __name__ == "__main__":
     fecha_corte = datetime.strptime(FECHA_CORTE_STR, "%Y-%m-%d")
+    if REPLAY:
+        df_new = replay_apf(fecha_corte, OUT_PATH)
+        print("Filas re-extraídas:", len(df_new))
+        sys.exit()
     df_new = run_full_apf(
         secciones_inicio=SECCIONES_INICIO,
         fecha_corte=fecha_corte,
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de backends de parseo por medio, sobre las páginas de data/html_cache/.
+
+Para cada medio corre el motor de extracción (extraccion.py, la spec del medio)
+con cada backend de html_parse: "lxml" (XPath precompilados sobre el árbol de
+lxml), "selectolax" (recorte + selectores soupsieve) y "bs4" (= html.parser sobre
+el documento completo, el camino de siempre). Reporta documentos por segundo,
+aceleración contra bs4 y el % de documentos cuya nota extraída es idéntica a la de bs4.
+
+uso: python bench_parsers.py [medio ...] [--max N] [--rondas R]
+"""
+
+import argparse, time
+
+import extraccion
+import html_cache
+import html_parse
+
+def medir(fn, docs, rondas):
+    filas, t0 = [], time.perf_counter()
+    for _ in range(rondas):
+        filas = [fn(html) for html in docs]
+    dt = time.perf_counter() - t0
+    return len(docs) * rondas / dt if dt else float("inf"), filas
+
+def main():
+    ap = argparse.ArgumentParser(description="Documentos/seg por medio y backend de parseo")
+    ap.add_argument("medios", nargs="*", default=list(extraccion.SPECS))
+    ap.add_argument("--max", type=int, default=300, help="páginas cacheadas por medio (0 = todas)")
+    ap.add_argument("--rondas", type=int, default=1)
+    args = ap.parse_args()
+
+    backends = html_parse.disponibles()
+    print(f"backends disponibles: {', '.join(backends)} (por defecto: {html_parse.BACKEND})\n")
+    print(f"{'medio':16s} {'backend':11s} {'docs':>6s} {'docs/s':>9s} {'x bs4':>7s} {'iguales':>8s}")
+    for medio in args.medios:
+        fn = extraccion.extractor(medio)
+        docs = []
+        for _, html, _ in html_cache.iter_medio(medio):
+            docs.append(html)
+            if args.max and len(docs) >= args.max:
+                break
+        if not docs:
+            print(f"{medio:16s} (sin páginas en html_cache)")
+            continue
+        base_vel, base_filas = None, None
+        for b in ["bs4"] + [x for x in backends if x != "bs4"]:
+            html_parse.BACKEND = b
+            vel, filas = medir(fn, docs, args.rondas)
+            if b == "bs4":
+                base_vel, base_filas = vel, filas
+            iguales = sum(f == g for f, g in zip(filas, base_filas)) / len(docs)
+            print(f"{medio:16s} {b:11s} {len(docs):6d} {vel:9.1f} {vel / base_vel:7.2f} {iguales:8.1%}")
+
+if __name__ == "__main__":
+    main()
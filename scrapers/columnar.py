@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Tablas columnares (Parquet) para la app Shiny, junto a los CSV de siempre.
+
+- lemma / medio / sentimiento van como columnas diccionario (se leen como factor
+  en R con arrow::read_parquet): cada string se guarda una vez.
+- frecuencias_acumuladas.parquet: por lemma, la suma acumulada hasta cada fecha en
+  que aparece, ordenada por (lemma_id, dia). El total de un rango [desde, hasta]
+  es acum(hasta) - acum(desde - 1), donde acum(d) es la última fila del lemma con
+  dia <= d (una búsqueda binaria por lemma en vez de sumar todos los días).
+
+pyarrow es opcional: sin él no se escriben los .parquet y la app sigue con los CSV.
+"""
+
+import os
+from typing import Iterable
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    ARROW_OK = True
+except Exception:
+    ARROW_OK = False
+
+EPOCH = pd.Timestamp("1970-01-01")
+
+def escribir_parquet(df: pd.DataFrame, path: str, categorias: Iterable[str] = ()) -> bool:
+    """Escribe df (atómico) con `categorias` diccionario-codificadas. False si no hay pyarrow."""
+    if not ARROW_OK:
+        return False
+    df = df.copy()
+    for c in categorias:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    tmp = path + ".tmp"
+    pq.write_table(tabla, tmp, compression="zstd")
+    os.replace(tmp, path)
+    return True
+
+def _fechas(s: pd.Series) -> pd.Series:
+    return pd.to_datetime(s, errors="coerce").dt.floor("D")
+
+def acumulado(frec: pd.DataFrame) -> pd.DataFrame:
+    """(lemma_id, lemma, dia, fecha, acum) ordenado por (lemma_id, dia); dia = días desde 1970-01-01."""
+    df = frec.assign(fecha=_fechas(frec["fecha"])).dropna(subset=["fecha"])
+    df = df.groupby(["lemma", "fecha"], as_index=False)["frecuencia"].sum()
+    lemas = pd.Categorical(df["lemma"])
+    df["lemma_id"] = lemas.codes.astype("int32")
+    df["dia"] = ((df["fecha"] - EPOCH).dt.days).astype("int32")
+    df = df.sort_values(["lemma_id", "dia"], kind="stable")
+    df["acum"] = df.groupby("lemma_id")["frecuencia"].cumsum().astype("int64")
+    df["fecha"] = df["fecha"].dt.date
+    return df[["lemma_id", "lemma", "dia", "fecha", "acum"]].reset_index(drop=True)
+
+def escribir_frecuencias(frec: pd.DataFrame, tab_dir: str) -> list:
+    """Los .parquet derivados de frecuencias_por_dia; devuelve los paths escritos."""
+    if not ARROW_OK:
+        return []
+    diario = frec.assign(fecha=_fechas(frec["fecha"]).dt.date)
+    salidas = {
+        "frecuencias_por_dia.parquet":    (diario, ["lemma"]),
+        "frecuencias_acumuladas.parquet": (acumulado(frec), ["lemma"]),
+    }
+    hechos = []
+    for nombre, (df, cats) in salidas.items():
+        path = os.path.join(tab_dir, nombre)
+        escribir_parquet(df, path, cats)
+        hechos.append(path)
+    return hechos
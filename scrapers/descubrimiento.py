@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Descubrimiento de notas por sitemap / RSS, en vez de recorrer páginas de listado.
+
+FEEDS da, por medio, los endpoints a probar en orden (sitemap de noticias, RSS de
+la sección, sitemap general) y un patrón de URL opcional (la sección que se
+scrapea). descubrir(medio, desde) baja esos XML y devuelve las Entrada(url,
+lastmod, titulo) con lastmod >= desde, de la más nueva a la más vieja: la
+descubierta semanal pasa de miles de pedidos de listado a un puñado de XML.
+
+Formatos: <urlset> (lastmod o news:publication_date), <sitemapindex> (sólo se
+bajan los hijos con lastmod >= desde, o sin lastmod; si son más de MAX_SITEMAPS
+el índice no sirve, para no dejar hijos sin leer), RSS 2.0 (pubDate), Atom
+(updated/published); .xml.gz también. Las entradas sin fecha se incluyen (el
+detalle decide con su propia fecha).
+
+Un endpoint sirve sólo si llega hasta la marca: algún ítem (o hijo del índice) es
+anterior a `desde`. Un RSS con las últimas 20 notas que no llega no cuenta (se
+perderían notas) y se prueba el siguiente. Si ninguno sirve, descubrir() devuelve
+None y el llamador recorre el listado como siempre.
+
+Para probar contra un servidor local (p. ej. `python -m http.server` sobre una
+carpeta con los XML):
+
+    python descubrimiento.py <medio> YYYY-MM-DD [url ...]
+"""
+
+import gzip, re, sys
+from datetime import date, datetime
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+from xml.etree import ElementTree
+
+import http_client
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+TIMEOUT = 20
+MAX_SITEMAPS = 20     # hijos a bajar de un sitemap índice; con más, el índice no sirve
+
+FEEDS: Dict[str, dict] = {
+    "analisisdigital": {
+        "urls": ["https://www.analisisdigital.com.ar/rss.xml",
+                 "https://www.analisisdigital.com.ar/sitemap.xml"],
+        "incluir": r"/provinciales/",
+    },
+    "apfdigital": {
+        "urls": ["https://www.apfdigital.com.ar/sitemap-news.xml",
+                 "https://www.apfdigital.com.ar/rss"],
+        "incluir": r"/provinciales/",
+    },
+    "elargentino": {
+        "urls": ["https://diarioelargentino.com/sitemap-news.xml",
+                 "https://diarioelargentino.com/rss"],
+        "incluir": r"/provincia/",
+    },
+    "elonce": {
+        "urls": ["https://www.elonce.com/sitemap-news.xml",
+                 "https://www.elonce.com/rss"],
+    },
+}
+
+class Entrada(NamedTuple):
+    url: str
+    lastmod: Optional[datetime]
+    titulo: str = ""
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+def _hijo(el, nombre: str):
+    for h in el.iter():
+        if h is not el and _local(h.tag) == nombre:
+            return h
+    return None
+
+def _texto(el, nombre: str) -> str:
+    h = _hijo(el, nombre)
+    return (h.text or "").strip() if h is not None else ""
+
+def parse_fecha(txt: str) -> Optional[datetime]:
+    """ISO 8601 (sitemaps, Atom) o RFC 822 (RSS)."""
+    if not txt:
+        return None
+    try:
+        return datetime.fromisoformat(txt.replace("Z", "+00:00"))
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(txt)
+    except (TypeError, ValueError):
+        return None
+
+def _dia(f: Optional[datetime]) -> Optional[date]:
+    return f.date() if f else None
+
+def parsear(xml: bytes):
+    """
+    ('indice', [Entrada de sitemaps hijos]) | ('notas', [Entrada]). Lanza ValueError
+    si no es un sitemap ni un feed.
+    """
+    if xml[:2] == b"\x1f\x8b":
+        xml = gzip.decompress(xml)
+    try:
+        raiz = ElementTree.fromstring(xml)
+    except ElementTree.ParseError as e:
+        raise ValueError(f"XML inválido: {e}")
+    tipo = _local(raiz.tag)
+    if tipo == "sitemapindex":
+        return "indice", [Entrada(_texto(s, "loc"), parse_fecha(_texto(s, "lastmod")))
+                          for s in raiz if _local(s.tag) == "sitemap"]
+    if tipo == "urlset":
+        return "notas", [Entrada(_texto(u, "loc"),
+                                 parse_fecha(_texto(u, "lastmod") or _texto(u, "publication_date")),
+                                 _texto(u, "title"))
+                         for u in raiz if _local(u.tag) == "url"]
+    if tipo in ("rss", "RDF"):
+        return "notas", [Entrada(_texto(i, "link"),
+                                 parse_fecha(_texto(i, "pubDate") or _texto(i, "date")),
+                                 _texto(i, "title"))
+                         for i in raiz.iter() if _local(i.tag) == "item"]
+    if tipo == "feed":
+        out = []
+        for e in raiz:
+            if _local(e.tag) != "entry":
+                continue
+            link = next((l.get("href") for l in e if _local(l.tag) == "link"
+                         and l.get("rel", "alternate") == "alternate"), "")
+            out.append(Entrada(link or "", parse_fecha(_texto(e, "updated") or _texto(e, "published")),
+                               _texto(e, "title")))
+        return "notas", out
+    raise ValueError(f"no es sitemap ni feed: <{tipo}>")
+
+def _get_default(url: str):
+    return http_client.get(url, headers=HEADERS, timeout=TIMEOUT)
+
+def _leer(url: str, desde: date, get: Callable, log: Callable[[str], None]):
+    """(entradas con lastmod >= desde, llega_a_la_marca) de un endpoint; None si no sirve."""
+    r = get(url)
+    if not r.ok:
+        log(f"[FEED] {url}: HTTP {r.status_code}")
+        return None
+    tipo, entradas = parsear(r.content)
+    if tipo == "notas":
+        llega = any(e.lastmod and _dia(e.lastmod) < desde for e in entradas)
+        return [e for e in entradas if e.url and (e.lastmod is None or _dia(e.lastmod) >= desde)], llega
+
+    # índice: los hijos sin cambios desde la marca no tienen notas nuevas
+    llega = any(s.lastmod and _dia(s.lastmod) < desde for s in entradas)
+    hijos = [s for s in entradas if s.url and (s.lastmod is None or _dia(s.lastmod) >= desde)]
+    if len(hijos) > MAX_SITEMAPS:
+        # quedarían hijos sin leer (y sus notas perdidas): mejor el listado
+        log(f"[FEED] {url}: {len(hijos)} sitemaps hijos desde {desde} (> {MAX_SITEMAPS}) → no sirve")
+        return None
+    out = []
+    for s in hijos:
+        sub = _leer(s.url, desde, get, log)
+        if sub is None:
+            return None
+        out.extend(sub[0])
+        llega = llega or sub[1]
+    return out, llega
+
+def descubrir(medio: str, desde: date, urls: Optional[Sequence[str]] = None,
+              patron: Optional[str] = None, get: Optional[Callable] = None,
+              log: Callable[[str], None] = print) -> Optional[List[Entrada]]:
+    """
+    Notas del medio con lastmod >= desde (más nuevas primero), o None si no hay un
+    sitemap/feed que llegue hasta la marca. `urls` y `patron` reemplazan a los de
+    FEEDS (p. ej. un servidor local de prueba, o la sección que scrapea otro
+    script); `get(url)` debe devolver algo con .ok y .content.
+    """
+    cfg = FEEDS.get(medio, {})
+    urls = list(urls or cfg.get("urls", []))
+    patron = patron or cfg.get("incluir")
+    patron = re.compile(patron) if patron else None
+    get = get or _get_default
+    for url in urls:
+        try:
+            res = _leer(url, desde, get, log)
+        except Exception as e:
+            log(f"[FEED] {url}: {e}")
+            continue
+        if res is None:
+            continue
+        entradas, llega = res
+        if not llega:
+            log(f"[FEED] {url}: no llega hasta {desde} → siguiente")
+            continue
+        vistas, out = set(), []
+        for e in entradas:
+            if e.url in vistas or (patron and not patron.search(e.url)):
+                continue
+            vistas.add(e.url)
+            out.append(e)
+        out.sort(key=lambda e: e.lastmod.timestamp() if e.lastmod else float("inf"), reverse=True)
+        log(f"[FEED] {url}: {len(out)} notas con lastmod >= {desde}")
+        return out
+    return None
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        sys.exit("uso: python descubrimiento.py <medio> YYYY-MM-DD [url ...]")
+    res = descubrir(sys.argv[1], date.fromisoformat(sys.argv[2]), urls=sys.argv[3:] or None)
+    if res is None:
+        print("sin feed que llegue a la marca → listado")
+    else:
+        for e in res:
+            print(e.lastmod.isoformat() if e.lastmod else "-", e.url, e.titulo, sep="\t")
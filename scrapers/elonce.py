@@ -2,20 +2,22 @@
 # Scraper FULL Elonce (municipales)
 # ================================
 # - Búsqueda por palabras clave (intendentes y localidades)
-# - Selenium para scroll y recolección de links
+# - Dos fases: links de todas las búsquedas en una frontera sin duplicados,
+#   después cada nota se descarga una sola vez (keyword multi-valor)
+# - Si el sitemap/RSS llega hasta la fecha de corte, la frontera sale de ahí
+#   (descubrimiento.py) y no se abre Chrome
+# - Selenium para scroll y recolección de links (lectura incremental del DOM)
 # - Requests para parseo de contenido
 # - Corte por fecha, incremental CSV, dedupe por id
 # ================================
 
-import os, re, time, random, logging
+import os, time, logging
 from datetime import datetime, timedelta
 from collections import OrderedDict
 from hashlib import md5
 from urllib.parse import urljoin
 
-import requests
 import pandas as pd
-from bs4 import BeautifulSoup
 
 # Selenium
 from selenium import webdriver
@@ -26,9 +28,21 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import NoSuchElementException
 import sys
 
+import http_client
+from matcher import Matcher
+import html_cache
+import descubrimiento
+import extraccion
+from listado_incremental import ListadoIncremental
+from store import AppendStore
+from http_client import NotModified
+
 # ---------- FECHA CORTE ----------
-if len(sys.argv) > 1:
-    FECHA_CORTE_STR = sys.argv[1]
+# uso: python <script>.py [YYYY-MM-DD] [--replay]
+ARGS   = [a for a in sys.argv[1:] if not a.startswith("--")]
+REPLAY = "--replay" in sys.argv   # re-parsear desde data/html_cache/ sin red
+if ARGS:
+    FECHA_CORTE_STR = ARGS[0]
     FECHA_CORTE_DT = datetime.strptime(FECHA_CORTE_STR, "%Y-%m-%d")
 else:
     FECHA_CORTE_DT = datetime.today() - timedelta(days=7)
@@ -57,8 +71,10 @@ HEADLESS              = True
 MAX_NOTAS_POR_CAND    = None
 FILTRAR_SECCIONES     = False
 SECCIONES_OK          = {"política", "economía"}
+SECCIONES_URL         = r"elonce\.com/(politica|economia)/"   # SECCIONES_OK en la URL (filtro del feed)
 BASE_URL              = "https://www.elonce.com"
 HEADERS               = {"User-Agent": "Mozilla/5.0"}
+KEYWORD_SEP           = "|"     # columna 'keyword': todas las búsquedas que encontraron la nota
 TMP_DIR               = "tmp"
 
 os.makedirs("logs", exist_ok=True)
@@ -76,26 +92,6 @@ console.setFormatter(logging.Formatter("%(levelname)s - %(message)s"))
 logging.getLogger().addHandler(console)
 
 # ---------- FUNCIONES AUXILIARES ----------
-MESES_ES = {
-    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6,
-    "julio": 7, "agosto": 8, "septiembre": 9, "octubre": 10, "noviembre": 11, "diciembre": 12
-}
-def parse_fecha_es(fecha_str: str):
-    if not fecha_str:
-        return None
-    f = fecha_str.lower().strip()
-    m = re.search(r"(\d{1,2})\s+de\s+([a-záéíóú]+)\s+de\s+(\d{4})", f)
-    if not m:
-        return None
-    d, mes_str, y = int(m.group(1)), m.group(2), int(m.group(3))
-    mes = MESES_ES.get(mes_str.strip(" ."))
-    if not mes:
-        return None
-    try:
-        return datetime(y, mes, d)
-    except Exception:
-        return None
-
 def make_hash(value: str) -> str:
     return md5(value.encode("utf-8")).hexdigest()
 
@@ -119,9 +115,9 @@ def parse_fecha_data_attr(fecha_raw: str):
 def scroll_and_collect_links(driver, fecha_corte: datetime, max_links=None):
     total_links = OrderedDict()
     pagina = 1
+    listado = ListadoIncremental(driver, "article.en-bandera--listado")
     while True:
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        articulos = soup.select("article.en-bandera--listado")
+        articulos = listado.nuevas()   # sólo las tarjetas que agregó el último "ver más"
         if not articulos:
             logging.warning("Sin artículos en la página %s", pagina)
 
@@ -159,7 +155,9 @@ def scroll_and_collect_links(driver, fecha_corte: datetime, max_links=None):
             driver.execute_script("arguments[0].scrollIntoView();", boton)
             time.sleep(0.4)
             driver.execute_script("arguments[0].click();", boton)
-            time.sleep(random.uniform(1.2, 2.2))
+            if not listado.esperar_mas(timeout=10):
+                logging.info("Fin del scroll (no cargaron tarjetas nuevas tras 'ver más').")
+                break
             pagina += 1
         except NoSuchElementException:
             logging.info("Fin del scroll (no hay botón 'ver más').")
@@ -170,109 +168,121 @@ def scroll_and_collect_links(driver, fecha_corte: datetime, max_links=None):
 
     return total_links
 
-def scrap_articulo_requests(url_abs: str, filtrar_secciones=False):
-    r = requests.get(url_abs, headers=HEADERS, timeout=25)
+def scrap_articulo_requests(url_abs: str, filtrar_secciones=False, keyword=None, validators=None):
+    """
+    (row, fecha, respuesta). Con `validators` se pide condicional (304 → NotModified);
+    el llamador los pasa sólo si la nota ya está en su salida y registra los
+    validadores recién al sumar la fila.
+    """
+    r = http_client.get(url_abs, headers=HEADERS, timeout=25, validators=validators)
     r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
+    html_cache.put("elonce", url_abs, r.text, keyword=keyword)
+    row, fecha_dt = parse_articulo(r.text, url_abs, filtrar_secciones)
+    return row, fecha_dt, r
 
-    seccion_tag = soup.select_one("div.cont-volanta a.etiqueta")
-    seccion = seccion_tag.get_text(strip=True).lower() if seccion_tag else None
+def parse_articulo(html: str, url_abs: str, filtrar_secciones=False):
+    nota = extraccion.extraer("elonce", html)
+    seccion = nota.seccion.lower() if nota.seccion else None
     if filtrar_secciones and seccion not in SECCIONES_OK:
         return None, None
-
-    h1 = soup.select_one("h1.titulo-nota") or soup.select_one("h1")
-    titulo = h1.get_text(strip=True) if h1 else "Sin título"
-    bajada_tag = soup.select_one("h2.bajada")
-    copete = bajada_tag.get_text(strip=True) if bajada_tag else ""
-
-    fecha_dt = None
-    fecha_tag = soup.select_one("span.fecha-nota")
-    if fecha_tag:
-        txt = fecha_tag.get_text(strip=True)
-        fecha_dt = parse_fecha_es(txt)
-
-    if not fecha_dt:
-        tag_data = soup.select_one("[data-fecha]")
-        if tag_data and tag_data.get("data-fecha"):
-            try:
-                fecha_dt = datetime.strptime(tag_data["data-fecha"], "%Y/%m/%d %H:%M:%S")
-            except:
-                pass
-
-    if not fecha_dt:
-        tag_txt = soup.select_one("div[class*='fecha'], span[class*='fecha'], time")
-        txt = tag_txt.get_text(strip=True) if tag_txt else ""
-        fecha_dt = parse_fecha_es(txt)
-
-    cuerpo_div = (soup.select_one("div.texto")
-                  or soup.select_one("div.noticia-contenido")
-                  or soup.select_one("div.cuerpo-nota"))
-    if cuerpo_div:
-        texto = "\n".join(p.get_text(strip=True) for p in cuerpo_div.find_all(["p","h3"]) if p.get_text(strip=True))
-    else:
-        texto = ""
+    fecha_dt = nota.fecha
 
     row = {
         "id": make_hash(url_abs),
         "medio": "elonce",
         "fecha": fecha_dt.strftime("%Y-%m-%d") if fecha_dt else None,
         "seccion": seccion,
-        "titulo": titulo,
+        "titulo": nota.titulo or "Sin título",
         "url": url_abs,
-        "contenido": (copete + " " + texto).strip()
+        "contenido": nota.contenido
     }
     return row, fecha_dt
 
-def save_incremental(df: pd.DataFrame, path: str):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    if os.path.exists(path):
-        prev = pd.read_csv(path)
-        before = len(prev)
-        df_all = pd.concat([prev, df], ignore_index=True)
-        df_all.drop_duplicates(subset=["id"], inplace=True)
-        df_all.to_csv(path, index=False)
-        logging.info("Guardado incremental: %s -> %s filas (+%s nuevas)",
-                     before, len(df_all), len(df_all) - before)
-    else:
-        df.to_csv(path, index=False)
-        logging.info("Archivo nuevo guardado: %s filas", len(df))
+def save_incremental(df: pd.DataFrame, path: str, reemplazar=False):
+    """Append-only sobre el CSV (ver store.py). reemplazar=True: las filas nuevas pisan a las previas."""
+    before, after = AppendStore(path, key="id").save_incremental(df, reemplazar=reemplazar)
+    logging.info("Guardado incremental: %s -> %s filas (+%s nuevas)", before, after, after - before)
+
+def collect_frontier(drv, candidatos, fecha_corte, max_notas_por_cand=None):
+    """Fase 1: url absoluta → {'fecha', 'keywords'} con los links de todas las búsquedas."""
+    frontera = OrderedDict()
+    for kw in candidatos:
+        logging.info("===== Keyword: %s =====", kw)
+        url_busqueda = f"{BASE_URL}/buscador/?q={kw}&enviar=Buscar&ord=desc"
+        drv.get(url_busqueda)
+        time.sleep(2)
+
+        links = scroll_and_collect_links(drv, fecha_corte=fecha_corte, max_links=max_notas_por_cand)
+        nuevas = 0
+        for i, (rel, fdt) in enumerate(links.items(), start=1):
+            if max_notas_por_cand and i > max_notas_por_cand:
+                break
+            url_abs = urljoin(BASE_URL + "/", rel)
+            if url_abs not in frontera:
+                frontera[url_abs] = {"fecha": fdt, "keywords": []}
+                nuevas += 1
+            if kw not in frontera[url_abs]["keywords"]:
+                frontera[url_abs]["keywords"].append(kw)
+        logging.info("Links: %s (%s nuevos en la frontera, total %s)", len(links), nuevas, len(frontera))
+    return frontera
+
+def collect_frontier_feed(fecha_corte, filtrar_secciones=False):
+    """
+    Fase 1 sin Selenium: notas del sitemap/feed desde el corte (None si no hay uno
+    que llegue). Con filtrar_secciones sólo las URLs de SECCIONES_OK; si no, todo el
+    feed, porque las búsquedas por keyword tampoco se limitan a una sección.
+    """
+    patron = SECCIONES_URL if filtrar_secciones else None
+    entradas = descubrimiento.descubrir("elonce", fecha_corte.date(), patron=patron, log=logging.info)
+    if entradas is None:
+        return None
+    return OrderedDict((e.url, {"fecha": e.lastmod, "keywords": []}) for e in entradas)
 
 def run_full(candidatos, fecha_corte, out_path,
              headless=True, max_notas_por_cand=None, filtrar_secciones=False):
     resultados = []
-    drv_scroll = setup_driver(headless=headless)
-
-    try:
-        for kw in candidatos:
-            logging.info("===== Keyword: %s =====", kw)
-            url_busqueda = f"{BASE_URL}/buscador/?q={kw}&enviar=Buscar&ord=desc"
-            drv_scroll.get(url_busqueda)
-            time.sleep(2)
-
-            links = scroll_and_collect_links(drv_scroll, fecha_corte=fecha_corte, max_links=max_notas_por_cand)
-
-            total = len(links)
-            logging.info("Voy a scrapear %s notas", total)
-
-            for i, (rel, fdt) in enumerate(links.items(), start=1):
-                if max_notas_por_cand and i > max_notas_por_cand:
-                    break
-                url_abs = urljoin(BASE_URL + "/", rel)
-                try:
-                    row, fecha_dt = scrap_articulo_requests(url_abs, filtrar_secciones=filtrar_secciones)
-                except Exception as e:
-                    logging.warning("Error en nota %s (%s/%s): %s", url_abs, i, total, e)
-                    continue
-
-                if row:
-                    row["keyword"] = kw
-                    resultados.append(row)
-
-                if i % 20 == 0 or i == total:
-                    logging.info("Notas procesadas: %s/%s", i, total)
+    frontera = collect_frontier_feed(fecha_corte, filtrar_secciones)
+    if frontera is None:
+        drv_scroll = setup_driver(headless=headless)
+        try:
+            frontera = collect_frontier(drv_scroll, candidatos, fecha_corte, max_notas_por_cand)
+        finally:
+            drv_scroll.quit()
+
+    # Fase 2: cada nota una sola vez, con todas sus keywords
+    total = len(frontera)
+    logging.info("Voy a scrapear %s notas", total)
+    # condicional sólo para las notas que ya están en out_path: un 304 no puede perder filas
+    # notas del feed: keywords = candidatos que menciona (palabra completa, sin tildes)
+    matcher = Matcher({kw: [kw] for kw in candidatos}, palabra_completa=True)
+    guardadas = AppendStore(out_path, key="id").contiene([make_hash(u) for u in frontera])
+    validadores = http_client.validadores(out_path)
+    for i, (url_abs, info) in enumerate(frontera.items(), start=1):
+        kws = KEYWORD_SEP.join(info["keywords"])
+        try:
+            row, fecha_dt, r = scrap_articulo_requests(
+                url_abs, filtrar_secciones=filtrar_secciones, keyword=kws,
+                validators=validadores if make_hash(url_abs) in guardadas else None)
+        except NotModified:
+            continue  # sin cambios desde la última corrida y ya en out_path
+        except Exception as e:
+            logging.warning("Error en nota %s (%s/%s): %s", url_abs, i, total, e)
+            continue
+
+        if row and not info["keywords"]:
+            # vino del feed (no de una búsqueda): keywords = candidatos que menciona la nota
+            menciona = matcher.entidades(f"{row['titulo']} {row['contenido']}")
+            info["keywords"] = [kw for kw in candidatos if kw in menciona]
+            if not info["keywords"] or (fecha_dt and fecha_dt < fecha_corte):
+                continue
+            kws = KEYWORD_SEP.join(info["keywords"])
+        if row:
+            row["keyword"] = kws
+            resultados.append(row)
+            validadores.remember(url_abs, r)
 
-    finally:
-        drv_scroll.quit()
+        if i % 20 == 0 or i == total:
+            logging.info("Notas procesadas: %s/%s", i, total)
 
     df = pd.DataFrame(resultados)
     if df.empty:
@@ -281,11 +291,32 @@ def run_full(candidatos, fecha_corte, out_path,
 
     df.drop_duplicates(subset=["id"], inplace=True)
     save_incremental(df, out_path)
+    validadores.save()  # recién con las filas en out_path
+    return df
+
+def replay(fecha_corte, out_path, filtrar_secciones=False):
+    """Re-parsea desde la caché las notas con fecha >= corte y reemplaza sus filas en out_path."""
+    resultados = []
+    for url_abs, html, meta in html_cache.iter_medio("elonce"):
+        row, fecha_dt = parse_articulo(html, url_abs, filtrar_secciones=filtrar_secciones)
+        if not row or (fecha_dt and fecha_dt < fecha_corte):
+            continue
+        row["keyword"] = meta.get("keyword")
+        resultados.append(row)
+    df = pd.DataFrame(resultados)
+    logging.info("Replay: %s notas re-parseadas desde caché", len(df))
+    if not df.empty:
+        df.drop_duplicates(subset=["id"], inplace=True)
+        save_incremental(df, out_path, reemplazar=True)
     return df
 
 # ---------- RUN ----------
 if __name__ == "__main__":
     fecha_corte = datetime.strptime(FECHA_CORTE_STR, "%Y-%m-%d")
+    if REPLAY:
+        df_new = replay(fecha_corte, OUT_PATH, filtrar_secciones=FILTRAR_SECCIONES)
+        print("Filas re-extraídas:", len(df_new))
+        sys.exit()
 
     df_new = run_full(
         candidatos=CANDIDATOS,
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Caché persistente de embeddings de SentenceTransformer.
+
+data/cache/embeddings/<modelo>[-norm]/
+   - vectors.npy     ← matriz (n, dim) float16, append-only, se lee con mmap
+   - index.sqlite    ← hash(modelo, texto) → fila de vectors.npy
+
+Sólo los textos nunca vistos pasan por el modelo (que se carga recién si hace
+falta). vectors.npy es un .npy válido (np.load(..., mmap_mode="r")) con un
+header de largo fijo: agregar filas es escribir al final y actualizar el shape
+del header, sin reescribir lo anterior. Si la corrida se corta entre ambos pasos
+quedan bytes sobrantes al final que el próximo append pisa.
+"""
+
+import os, re, ast, sqlite3
+from hashlib import md5
+from typing import List, Optional
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+EMB_DIR = os.path.join(ROOT_DIR, "data", "cache", "embeddings")
+DTYPE = np.float16
+HEADER_LEN = 128   # bytes totales del header .npy (magic + largo + dict + padding)
+LOOKUP_CHUNK = 500
+ENCODE_BATCH = 64
+
+_MAGIC = b"\x93NUMPY\x01\x00"
+
+def _header_bytes(n: int, dim: int, dtype) -> bytes:
+    d = {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)), "fortran_order": False, "shape": (n, dim)}
+    txt = repr(d).encode("latin1")
+    libre = HEADER_LEN - len(_MAGIC) - 2 - len(txt) - 1
+    if libre < 0:
+        raise ValueError("shape demasiado grande para el header fijo")
+    return _MAGIC + np.uint16(HEADER_LEN - len(_MAGIC) - 2).tobytes() + txt + b" " * libre + b"\n"
+
+def _leer_shape(path: str):
+    with open(path, "rb") as f:
+        f.seek(len(_MAGIC) + 2)
+        d = ast.literal_eval(f.read(HEADER_LEN - len(_MAGIC) - 2).decode("latin1").strip())
+    return d["shape"]
+
+class EmbeddingStore:
+    def __init__(self, model_name: str, normalize: bool = False, base_dir: str = EMB_DIR,
+                 dtype=DTYPE, device: Optional[str] = None):
+        self.model_name = model_name
+        self.normalize = normalize
+        self.dtype = np.dtype(dtype)
+        self.device = device
+        slug = re.sub(r"[^\w.-]+", "_", model_name) + ("-norm" if normalize else "")
+        self.dir = os.path.join(base_dir, slug)
+        os.makedirs(self.dir, exist_ok=True)
+        self.vec_path = os.path.join(self.dir, "vectors.npy")
+        self.con = sqlite3.connect(os.path.join(self.dir, "index.sqlite"))
+        self.con.execute("CREATE TABLE IF NOT EXISTS idx (k TEXT PRIMARY KEY, fila INTEGER)")
+        self._model = None
+
+    def key(self, texto: str) -> str:
+        return md5(f"{self.model_name}|{int(self.normalize)}\x1f{texto}".encode("utf-8")).hexdigest()
+
+    def _model_(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name, device=self.device)
+        return self._model
+
+    def _filas(self, claves: List[str]) -> dict:
+        out = {}
+        for i in range(0, len(claves), LOOKUP_CHUNK):
+            lote = claves[i:i+LOOKUP_CHUNK]
+            q = f"SELECT k, fila FROM idx WHERE k IN ({','.join('?' * len(lote))})"
+            out.update(self.con.execute(q, lote).fetchall())
+        return out
+
+    def _append(self, vecs: np.ndarray) -> int:
+        """Agrega filas al final de vectors.npy; devuelve la fila de la primera."""
+        vecs = np.ascontiguousarray(vecs, dtype=self.dtype)
+        if not os.path.exists(self.vec_path):
+            with open(self.vec_path, "wb") as f:
+                f.write(_header_bytes(0, vecs.shape[1], self.dtype))
+        n, dim = _leer_shape(self.vec_path)
+        if dim != vecs.shape[1]:
+            raise ValueError(f"dimensión {vecs.shape[1]} != {dim} en {self.vec_path}")
+        with open(self.vec_path, "r+b") as f:
+            f.seek(HEADER_LEN + n * dim * self.dtype.itemsize)
+            f.write(vecs.tobytes())
+            f.truncate()
+            f.flush(); os.fsync(f.fileno())
+            f.seek(0)
+            f.write(_header_bytes(n + len(vecs), dim, self.dtype))
+        return n
+
+    def encode(self, textos: List[str], show_progress_bar: bool = False) -> np.ndarray:
+        """Embeddings (float32) de `textos`, en orden. Codifica sólo los que faltan."""
+        textos = ["" if t is None else str(t) for t in textos]
+        claves = [self.key(t) for t in textos]
+        filas = self._filas(list(dict.fromkeys(claves)))
+        pend = {}
+        for k, t in zip(claves, textos):
+            if k not in filas:
+                pend.setdefault(k, t)
+        if pend:
+            nuevos = self._model_().encode(list(pend.values()), batch_size=ENCODE_BATCH,
+                                           show_progress_bar=show_progress_bar,
+                                           normalize_embeddings=self.normalize)
+            primera = self._append(np.asarray(nuevos))
+            idx = {k: primera + i for i, k in enumerate(pend)}
+            self.con.executemany("INSERT OR REPLACE INTO idx VALUES (?, ?)", idx.items())
+            self.con.commit()
+            filas.update(idx)
+        if not textos:
+            return np.zeros((0, 0), dtype=np.float32)
+        mat = np.load(self.vec_path, mmap_mode="r")
+        return np.asarray(mat[[filas[k] for k in claves]], dtype=np.float32)
+
+    def close(self):
+        self.con.close()
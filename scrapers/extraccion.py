@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+Extracción de notas de detalle: una especificación declarativa por medio y un solo motor.
+
+Cada medio se describe en SPECS (agregar un medio = agregar su spec):
+  titulo        selectores en orden de prioridad ("" si ninguno aparece: el scraper
+                usa el título del listado)
+  copete        idem; copete_todos=True junta todos los que aparezcan
+  fecha         fuentes en orden de prioridad, gana la primera que da una fecha:
+                  ("meta", css)                  atributo content (ISO o "4 de marzo de 2025")
+                  ("time", css)                  atributo datetime
+                  ("attr", css, attr, formato)   atributo con formato strptime
+                  ("visible", css)               texto visible en español
+                  ("body",)                      primera fecha en español del texto leído
+  cuerpo        contenedores en orden de prioridad: se usa el primero que aparezca
+  parrafos      selector de los párrafos dentro del contenedor
+  seccion       selector de la volanta de sección (opcional)
+
+Extractor(spec) compila todo una sola vez: XPath precompilados (lxml) para el
+camino rápido, selectores soupsieve precompilados para el de BeautifulSoup, y el
+recorte de html_parse (la unión de lo que lee la spec: del resto del documento
+no se construye nada). extraer(medio, html) devuelve una Nota con los campos
+crudos; cada scraper arma su fila.
+
+Motor: con html_parse.BACKEND "lxml" se evalúan los XPath sobre el árbol de lxml
+sin pasar por BeautifulSoup; con "selectolax" o "bs4" sobre la sopa de html_parse.sopa.
+bench_parsers.py compara los tres.
+"""
+
+import re, unicodedata
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+import soupsieve
+
+import html_parse
+
+if html_parse.LXML_OK:
+    from lxml import etree
+
+MESES = {
+    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6, "julio": 7,
+    "agosto": 8, "septiembre": 9, "setiembre": 9, "octubre": 10, "noviembre": 11, "diciembre": 12,
+}
+# "4 de marzo de 2025", "4 de marzo 2025", con hora opcional ("… de 2025 - 10:30")
+_FECHA_ES  = re.compile(r"(\d{1,2})\s+de\s+([a-z]+)\.?\s+(?:de\s+)?(\d{4})"
+                        r"(?:\s*[-,|]?\s*(?:a las\s+)?(\d{1,2}):(\d{2}))?")
+_FECHA_ISO = re.compile(r"(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2}))?")
+
+def _norm(s: str) -> str:
+    s = unicodedata.normalize("NFKD", s)
+    s = "".join(c for c in s if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", s.replace("\u200b", "")).lower()
+
+def fecha_es(texto: Optional[str]) -> Optional[datetime]:
+    """Primera fecha en español válida del texto (con hora si la trae), o None."""
+    if not texto:
+        return None
+    for m in _FECHA_ES.finditer(_norm(texto)):
+        mes = MESES.get(m.group(2))
+        if not mes:
+            continue
+        try:
+            return datetime(int(m.group(3)), mes, int(m.group(1)),
+                            int(m.group(4) or 0), int(m.group(5) or 0))
+        except ValueError:
+            continue
+    return None
+
+def fecha_iso(texto: Optional[str]) -> Optional[datetime]:
+    """Fecha ISO (YYYY-MM-DD[THH:MM]) y si no hay, en español."""
+    if not texto:
+        return None
+    m = _FECHA_ISO.search(texto)
+    if m:
+        try:
+            return datetime(*(int(g or 0) for g in m.groups()))
+        except ValueError:
+            pass
+    return fecha_es(texto)
+
+# ---------- specs ----------
+FECHA_META = [
+    ("meta", "meta[property='article:published_time']"),
+    ("meta", "meta[name='article:published_time']"),
+    ("meta", "meta[property='og:updated_time']"),
+    ("time", "time[datetime]"),
+]
+DATA_FECHA = ("attr", "[data-fecha]", "data-fecha", "%Y/%m/%d %H:%M:%S")
+
+SPECS: Dict[str, dict] = {
+    "analisisdigital": {
+        "titulo": ["h1"],
+        "fecha": FECHA_META + [("visible", "div[class*='field--name-node-post-date']"),
+                               ("visible", "div.grupo-fecha-autor"), ("visible", "div.submitted"),
+                               ("body",)],
+        "cuerpo": ["div[class*='body-noticia']", "div.note-body"],
+        "parrafos": "p",
+    },
+    "apfdigital": {
+        "titulo": ["h1.titulo-nota", "h1"],
+        "copete": ["div.noticia-copete", "h2.bajada"],
+        "fecha": FECHA_META + [("visible", "div.noticia-fecha"), DATA_FECHA,
+                               ("visible", "div[class*='fecha']"), ("visible", "span[class*='fecha']"),
+                               ("body",)],
+        "cuerpo": ["div.noticia-contenido", "div.cuerpo-nota", "div.texto", "div#cuerpo-nota"],
+        "parrafos": "p, h3",
+    },
+    "elargentino": {
+        "titulo": ["h1.titulo-nota", "h1"],
+        "copete": ["div.bajada"],
+        "fecha": FECHA_META + [("visible", "span.fecha-nota"),
+                               ("visible", "div.cont-cuerpo .timeline-date-time-up"), ("body",)],
+        "cuerpo": ["div.texto"],
+        "parrafos": "p",
+    },
+    "elonce": {
+        "titulo": ["h1.titulo-nota", "h1"],
+        "copete": ["h2.bajada"],
+        "seccion": "div.cont-volanta a.etiqueta",
+        "fecha": [("visible", "span.fecha-nota"), DATA_FECHA, ("visible", "div[class*='fecha']"),
+                  ("visible", "span[class*='fecha']"), ("visible", "time")],
+        "cuerpo": ["div.texto", "div.noticia-contenido", "div.cuerpo-nota"],
+        "parrafos": "p, h3",
+    },
+    "unodigital": {
+        "titulo": ["h1"],
+        "copete": ["p.ignore-parser"],
+        "copete_todos": True,
+        "fecha": [("visible", ".fecha-container .nota-fecha")],
+        "cuerpo": [".article-body"],
+        "parrafos": "p",
+    },
+}
+
+class Nota(NamedTuple):
+    titulo: str
+    copete: str
+    parrafos: List[str]
+    contenido: str                 # copete + párrafos, uno por línea
+    fecha: Optional[datetime]
+    fuente_fecha: str              # 'meta' | 'time' | 'attr:<attr>' | 'visible:<css>' | 'body' | 'none'
+    fecha_texto: str
+    seccion: Optional[str]
+
+# ---------- motor ----------
+class _Sel:
+    """Un selector CSS compilado para los dos caminos."""
+    __slots__ = ("css", "sv", "xp")
+
+    def __init__(self, css: str):
+        self.css = css
+        self.sv = soupsieve.compile(css)
+        self.xp = etree.XPath(html_parse.css_a_xpath(css, ".//")) if html_parse.LXML_OK else None
+
+if html_parse.LXML_OK:
+    _TEXTOS = etree.XPath(".//text()[not(parent::script or parent::style or parent::template)]")
+
+def _texto_lxml(n) -> str:
+    return " ".join(t.strip() for t in _TEXTOS(n) if t.strip())
+
+def _texto_bs4(n) -> str:
+    return n.get_text(" ", strip=True)
+
+def _attr_bs4(n, attr: str) -> str:
+    v = n.get(attr)
+    return " ".join(v) if isinstance(v, list) else (v or "")
+
+class _Lxml:
+    uno   = staticmethod(lambda raiz, sel: next(iter(sel.xp(raiz)), None))
+    todos = staticmethod(lambda raiz, sel: sel.xp(raiz))
+    texto = staticmethod(_texto_lxml)
+    attr  = staticmethod(lambda n, a: n.get(a) or "")
+
+class _Bs4:
+    uno   = staticmethod(lambda raiz, sel: sel.sv.select_one(raiz))
+    todos = staticmethod(lambda raiz, sel: sel.sv.select(raiz))
+    texto = staticmethod(_texto_bs4)
+    attr  = staticmethod(_attr_bs4)
+
+class Extractor:
+    def __init__(self, spec: dict):
+        self.titulo = [_Sel(c) for c in spec.get("titulo", [])]
+        self.copete = [_Sel(c) for c in spec.get("copete", [])]
+        self.copete_todos = spec.get("copete_todos", False)
+        self.fecha = [(f[0], _Sel(f[1]) if len(f) > 1 else None) + tuple(f[2:]) for f in spec.get("fecha", [])]
+        self.cuerpo = [_Sel(c) for c in spec.get("cuerpo", [])]
+        self.parrafos = _Sel(spec.get("parrafos", "p"))
+        self.seccion = _Sel(spec["seccion"]) if spec.get("seccion") else None
+        # recorte: cada selector leído; de los descendientes ("div.a .b") el ancestro,
+        # para que el selector completo siga valiendo dentro del fragmento
+        sels = self.titulo + self.copete + [f[1] for f in self.fecha if f[1]] + self.cuerpo + \
+               ([self.seccion] if self.seccion else [])
+        self.recorte = list(dict.fromkeys(s.css.split()[0] for s in sels))
+        if html_parse.LXML_OK:
+            self._recorte_xp = etree.XPath(html_parse.css_a_xpath(", ".join(self.recorte)))
+
+    def _texto_recorte(self, raiz, m) -> str:
+        """Texto de lo que lee la spec (lo mismo que el fragmento de html_parse.sopa)."""
+        if m is _Bs4:
+            return raiz.get_text(" ", strip=True)
+        nodos = self._recorte_xp(raiz)
+        ids = set(nodos)
+        textos = (_texto_lxml(n) for n in nodos if not any(a in ids for a in n.iterancestors()))
+        return " ".join(t for t in textos if t)
+
+    def _fecha(self, raiz, m):
+        for fuente in self.fecha:
+            tipo, sel = fuente[0], fuente[1]
+            if tipo == "body":
+                txt = self._texto_recorte(raiz, m)
+                f = fecha_es(txt)
+                if f:
+                    return f, "body", txt
+                continue
+            n = m.uno(raiz, sel)
+            if n is None:
+                continue
+            if tipo == "visible":
+                txt = m.texto(n)
+                f, etiqueta = fecha_es(txt), f"visible:{sel.css}"
+            elif tipo == "attr":
+                txt, etiqueta = m.attr(n, fuente[2]), f"attr:{fuente[2]}"
+                try:
+                    f = datetime.strptime(txt, fuente[3])
+                except ValueError:
+                    f = None
+            else:   # meta / time
+                txt = m.attr(n, "content" if tipo == "meta" else "datetime")
+                f, etiqueta = fecha_iso(txt), tipo
+            if f:
+                return f, etiqueta, txt
+        return None, "none", ""
+
+    def _primero(self, raiz, m, sels) -> str:
+        for sel in sels:
+            n = m.uno(raiz, sel)
+            if n is not None:
+                return m.texto(n)
+        return ""
+
+    def __call__(self, html: str) -> Nota:
+        raiz = None
+        if html_parse.BACKEND == "lxml" and html_parse.LXML_OK and html:
+            m, raiz = _Lxml, html_parse.documento_lxml(html)
+        if raiz is None:   # otro backend, o lxml no armó el documento (vacío, sólo comentarios)
+            m, raiz = _Bs4, html_parse.sopa(html, self.recorte)
+
+        titulo = self._primero(raiz, m, self.titulo)
+        if self.copete_todos:
+            copete = " ".join(t for sel in self.copete for t in map(m.texto, m.todos(raiz, sel)) if t)
+        else:
+            copete = self._primero(raiz, m, self.copete)
+        parrafos = []
+        for sel in self.cuerpo:
+            cont = m.uno(raiz, sel)
+            if cont is not None:
+                parrafos = [t for t in map(m.texto, m.todos(cont, self.parrafos)) if t]
+                break
+        if copete and parrafos and parrafos[0] == copete:
+            parrafos = parrafos[1:]   # hay medios que repiten el copete como primer párrafo
+        contenido = "\n".join(([copete] if copete else []) + parrafos)
+        fecha, fuente, fecha_texto = self._fecha(raiz, m)
+        seccion = None
+        if self.seccion:
+            n = m.uno(raiz, self.seccion)
+            seccion = m.texto(n) if n is not None else None
+        return Nota(titulo, copete, parrafos, contenido, fecha, fuente, fecha_texto, seccion)
+
+_COMPILADOS: Dict[str, Extractor] = {}
+
+def extractor(medio: str) -> Extractor:
+    """El Extractor compilado del medio (se compila una vez por proceso)."""
+    if medio not in _COMPILADOS:
+        _COMPILADOS[medio] = Extractor(SPECS[medio])
+    return _COMPILADOS[medio]
+
+def extraer(medio: str, html: str) -> Nota:
+    return extractor(medio)(html)
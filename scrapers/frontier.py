@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Frontera de URLs de un crawl de listado.
+
+- nuevas(cards): de las tarjetas de una página, sólo las que no se vieron antes en
+  la corrida (sin importar si el listado las repite o acumula).
+- marcar(url): la nota quedó procesada (su fila está en los resultados).
+
+La persistencia para retomar una corrida cortada vive en journal.py: al arrancar
+se marcan acá las URLs que la bitácora ya tiene hechas.
+"""
+
+from typing import Callable, Iterable, List
+
+class Frontier:
+    def __init__(self):
+        self.vistas = set()   # encoladas en esta corrida (incluye las hechas)
+        self.hechas = set()   # procesadas
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.vistas
+
+    def __len__(self) -> int:
+        return len(self.hechas)
+
+    def nuevas(self, items: Iterable, key: Callable = lambda x: x) -> List:
+        out = []
+        for it in items:
+            u = key(it)
+            if u in self.vistas:
+                continue
+            self.vistas.add(u)
+            out.append(it)
+        return out
+
+    def marcar(self, url: str):
+        self.vistas.add(url)
+        self.hechas.add(url)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Aristas de similitud coseno entre vectores, vectorizado y por bloques.
+
+Reemplaza los dobles for sobre pares (i, j) de los grafos de tópicos (BERTopic)
+y de palabras (pipeline_limpieza). La matriz de similitud se calcula de a
+`bloque` filas contra todas (memoria O(bloque · n)), se enmascara el triángulo
+superior y se filtra por umbral y/o top-k vecinos con argpartition.
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+BLOQUE = 1024
+
+def aristas_similitud(X, ids: Optional[Sequence] = None, umbral: Optional[float] = None,
+                      top_k: Optional[int] = None, bloque: int = BLOQUE) -> pd.DataFrame:
+    """
+    DataFrame (from, to, weight) con un par no dirigido por fila (from antes que to
+    en el orden de `ids`).
+    - umbral: sólo pares con similitud > umbral.
+    - top_k: sólo los k vecinos más similares de cada nodo (un par queda si está
+      en el top-k de alguno de los dos).
+    Sin umbral ni top_k devuelve todos los pares (i < j).
+    """
+    X = np.asarray(X, dtype=np.float32)
+    n = len(X)
+    ids = np.arange(n) if ids is None else np.asarray(ids)
+    vacio = pd.DataFrame({"from": ids[:0], "to": ids[:0], "weight": np.zeros(0, dtype=np.float32)})
+    if n < 2:
+        return vacio
+    X = X / np.maximum(np.linalg.norm(X, axis=1, keepdims=True), 1e-12)
+
+    desde, hasta, pesos = [], [], []
+    cols = np.arange(n)
+    for i0 in range(0, n, bloque):
+        filas = cols[i0:i0 + bloque]
+        S = X[filas] @ X.T                      # (b, n)
+        if top_k:
+            k = min(int(top_k), n - 1)
+            S[np.arange(len(filas)), filas] = -np.inf   # sin autoaristas
+            cand = np.argpartition(-S, k - 1, axis=1)[:, :k]
+            v = np.take_along_axis(S, cand, axis=1).ravel()
+            r = np.repeat(filas, k)
+            c = cand.ravel()
+            if umbral is not None:
+                ok = v > umbral
+                r, c, v = r[ok], c[ok], v[ok]
+            r, c = np.minimum(r, c), np.maximum(r, c)
+        else:
+            mask = cols[None, :] > filas[:, None]       # triángulo superior
+            if umbral is not None:
+                mask &= S > umbral
+            r, c = np.nonzero(mask)
+            v = S[r, c]
+            r = filas[r]
+        desde.append(r); hasta.append(c); pesos.append(v)
+
+    r, c, v = np.concatenate(desde), np.concatenate(hasta), np.concatenate(pesos)
+    if top_k:
+        # el mismo par puede venir de ambos extremos
+        _, unicos = np.unique(r.astype(np.int64) * n + c, return_index=True)
+        r, c, v = r[unicos], c[unicos], v[unicos]
+    if not len(r):
+        return vacio
+    return pd.DataFrame({"from": ids[r], "to": ids[c], "weight": v.astype(float)})
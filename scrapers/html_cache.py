@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Caché en disco del HTML de detalle, para re-parsear sin red (modo --replay).
+
+data/html_cache/<medio>/
+   - ab/abcdef....html.gz   ← HTML comprimido, nombre = make_hash(url) (md5, mismo esquema que 'id')
+   - index.jsonl            ← una línea por descarga: {"id", "url", "ts", "meta"} (gana la última)
+
+'meta' guarda lo que el parser toma del listado y no está en el detalle
+(p. ej. el título de la tarjeta o la sección), para que el replay produzca
+las mismas filas que la corrida original.
+"""
+
+import os, gzip, json, threading
+from datetime import datetime
+from hashlib import md5
+from typing import Dict, Iterator, Optional, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(ROOT_DIR, "data", "html_cache")
+
+_lock = threading.Lock()
+
+def make_hash(v: str) -> str:
+    return md5(v.encode("utf-8")).hexdigest()
+
+def _medio_dir(medio: str) -> str:
+    return os.path.join(CACHE_DIR, medio)
+
+def _html_path(medio: str, key: str) -> str:
+    return os.path.join(_medio_dir(medio), key[:2], f"{key}.html.gz")
+
+def put(medio: str, url: str, html: str, **meta):
+    """Guarda (o reemplaza) el HTML de `url` y registra la descarga en el índice del medio."""
+    key = make_hash(url)
+    path = _html_path(medio, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+        f.write(html)
+    os.replace(tmp, path)
+    rec = {"id": key, "url": url, "ts": datetime.now().isoformat(timespec="seconds"), "meta": meta}
+    with _lock:
+        with open(os.path.join(_medio_dir(medio), "index.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+def get(medio: str, url: str) -> Optional[str]:
+    path = _html_path(medio, make_hash(url))
+    if not os.path.exists(path):
+        return None
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return f.read()
+
+def index(medio: str) -> Dict[str, dict]:
+    """id → último registro del índice del medio."""
+    out: Dict[str, dict] = {}
+    path = os.path.join(_medio_dir(medio), "index.jsonl")
+    if not os.path.exists(path):
+        return out
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # línea truncada por un corte a mitad de escritura
+            out[rec["id"]] = rec
+    return out
+
+def iter_medio(medio: str) -> Iterator[Tuple[str, str, dict]]:
+    """Rinde (url, html, meta) de cada página cacheada del medio, en orden de primera descarga."""
+    for key, rec in index(medio).items():
+        path = _html_path(medio, key)
+        if not os.path.exists(path):
+            continue
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            yield rec["url"], f.read(), rec.get("meta") or {}
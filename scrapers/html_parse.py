@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Parseo de HTML para los extractores: backend intercambiable + recorte por selectores.
+
+sopa(html, recorte) devuelve un BeautifulSoup (los extractores no cambian), pero:
+- Con `recorte` (lista de selectores CSS simples: lo que el extractor de cada medio
+  lee, p. ej. título, copete, fecha y cuerpo), el documento se parsea con un
+  parser en C (selectolax/Lexbor o lxml), se toman sólo esos subárboles (en orden
+  de documento, sin repetir anidados) y BeautifulSoup arma el árbol únicamente con
+  ese fragmento: nav, comentarios y barras laterales ni se construyen.
+- Sin recorte, el documento completo se parsea con lxml si está, si no con html.parser.
+
+BACKEND: "lxml" | "selectolax" | "bs4" (= el camino de siempre: html.parser sobre
+todo el documento, ignora el recorte). Por defecto lxml si está: con lxml el motor
+de extraccion.py evalúa sus XPath precompilados directo sobre el árbol, sin
+BeautifulSoup. Se fuerza con la variable de entorno HTML_BACKEND. bench_parsers.py
+compara los backends por medio contra "bs4".
+
+Si lxml no puede armar el documento (vacío, sólo comentarios) se usa html.parser
+como siempre; una declaración <?xml ...?> inicial se descarta antes de parsear.
+
+Selectores admitidos en el recorte: tag, .clase, #id, [attr], [attr=v], [attr*=v],
+combinados (div.a[x*='y']) y con descendiente ("div.a p"); varios separados por coma.
+"""
+
+import os, re
+from typing import List, Optional, Sequence
+
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_OK = True
+except Exception:
+    SELECTOLAX_OK = False
+
+try:
+    import lxml.html
+    from lxml.etree import ParserError
+    LXML_OK = True
+except Exception:
+    LXML_OK = False
+
+BACKENDS = ["lxml", "selectolax", "bs4"]
+BACKEND = os.environ.get("HTML_BACKEND") or ("lxml" if LXML_OK else "selectolax" if SELECTOLAX_OK else "bs4")
+FRAG_PARSER = "lxml" if LXML_OK else "html.parser"   # para el fragmento recortado
+
+def disponibles() -> List[str]:
+    return [b for b in BACKENDS if b == "bs4" or (b == "selectolax" and SELECTOLAX_OK) or (b == "lxml" and LXML_OK)]
+
+# ---------- CSS simple → XPath (para lxml) ----------
+_COMPUESTO = re.compile(r"([\w-]+|\*)?((?:[.#][\w-]+|\[[\w:-]+(?:\*?=['\"]?[^\]'\"]*['\"]?)?\])*)$")
+_PARTE = re.compile(r"([.#])([\w-]+)|\[([\w:-]+)(?:(\*?=)['\"]?([^\]'\"]*)['\"]?)?\]")
+
+def _xpath_compuesto(sel: str) -> str:
+    m = _COMPUESTO.fullmatch(sel)
+    if not m or not sel:
+        raise ValueError(f"selector no soportado: {sel!r}")
+    conds = []
+    for pre, nombre, attr, op, val in _PARTE.findall(m.group(2) or ""):
+        if pre == ".":
+            conds.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {nombre} ')")
+        elif pre == "#":
+            conds.append(f"@id='{nombre}'")
+        elif not op:
+            conds.append(f"@{attr}")
+        elif op == "*=":
+            conds.append(f"contains(@{attr}, '{val}')")
+        else:
+            conds.append(f"@{attr}='{val}'")
+    return (m.group(1) or "*") + "".join(f"[{c}]" for c in conds)
+
+def css_a_xpath(css: str, prefijo: str = "//") -> str:
+    """prefijo "//" busca en todo el documento; ".//" debajo del nodo de contexto."""
+    grupos = []
+    for grupo in css.split(","):
+        partes = grupo.split()
+        if not partes:
+            continue
+        grupos.append(prefijo + "//".join(_xpath_compuesto(p) for p in partes))
+    return " | ".join(grupos)
+
+# ---------- recorte ----------
+_DECL_XML = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+def documento_lxml(html: str):
+    """Árbol lxml del documento, o None si lxml no lo puede armar (vacío, sólo comentarios)."""
+    try:
+        # con str, lxml rechaza la declaración de encoding de las páginas XHTML
+        return lxml.html.document_fromstring(_DECL_XML.sub("", html, count=1))
+    except (ParserError, ValueError):
+        return None
+
+def _fragmento_selectolax(html: str, css: str) -> str:
+    nodos = LexborHTMLParser(html).css(css)   # en orden de documento
+    ids = {n.mem_id for n in nodos}
+    out = []
+    for n in nodos:
+        p, anidado = n.parent, False
+        while p is not None:
+            if p.mem_id in ids:
+                anidado = True
+                break
+            p = p.parent
+        if not anidado:
+            out.append(n.html)
+    return "".join(out)
+
+def _fragmento_lxml(html: str, css: str) -> Optional[str]:
+    doc = documento_lxml(html)
+    if doc is None:
+        return None
+    nodos = doc.xpath(css_a_xpath(css))       # la unión de XPath vuelve en orden de documento
+    ids = set(nodos)
+    return "".join(lxml.html.tostring(n, encoding="unicode", with_tail=False)
+                   for n in nodos if not any(a in ids for a in n.iterancestors()))
+
+def sopa(html: str, recorte: Optional[Sequence[str]] = None, backend: Optional[str] = None) -> BeautifulSoup:
+    backend = backend or BACKEND
+    if backend == "bs4" or not html:
+        return BeautifulSoup(html or "", "html.parser")
+    if not recorte:
+        return BeautifulSoup(html, FRAG_PARSER)
+    css = ", ".join(recorte)
+    if backend == "selectolax" and SELECTOLAX_OK:
+        frag = _fragmento_selectolax(html, css)
+    elif LXML_OK:
+        frag = _fragmento_lxml(html, css)
+        if frag is None:
+            return BeautifulSoup(html, "html.parser")
+    else:
+        return BeautifulSoup(html, "html.parser")
+    return BeautifulSoup(frag, FRAG_PARSER)
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Cliente HTTP compartido por todos los scrapers.
+
+- Una única requests.Session con pool keep-alive por host (reusa TCP/TLS entre medios
+  y entre threads de fetch_pool).
+- Backoff unificado (urllib3 Retry): errores de conexión/lectura y 429/5xx, respetando
+  Retry-After.
+- GET condicional (If-None-Match / If-Modified-Since) con validadores persistidos por
+  salida: validadores(csv) → data/http/validators.<csv>.json. Un 304 se reporta como
+  NotModified para que el scraper saltee la nota (ya está en esa salida).
+
+Cada salida (el CSV que escribe un scraper) tiene su propio almacén: un 304 de una
+nota que guardó otro scraper no dice nada de la propia. Además el llamador sólo
+pasa `validators` para las notas que ya están en su índice de claves (store.py);
+el resto se baja completo, así un 304 siempre es "ya está en la salida".
+
+Los validadores sólo se guardan cuando el scraper confirma la nota con remember()
+(después de sumarla a su salida) y luego llama a save() tras escribirla: si la
+corrida se corta antes, la próxima vuelve a descargar en lugar de saltear notas
+nunca guardadas. scraper_semanal escribe al histórico recién en process_week, así
+que deja los validadores pendientes en la carpeta semanal (dump_pending) y
+process_week los confirma con commit_pending() después del merge a RAW.
+"""
+
+import os, json, threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter, Retry
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+VALIDATORS_DIR = os.path.join(ROOT_DIR, "data", "http")
+
+DEFAULT_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                   "AppleWebKit/537.36 (KHTML, like Gecko) "
+                   "Chrome/124.0.0.0 Safari/537.36")
+}
+DEFAULT_TIMEOUT = 25
+POOL_HOSTS = 16       # hosts distintos con pool propio
+POOL_PER_HOST = 8     # conexiones keep-alive por host (>= DETAIL_WORKERS)
+
+class NotModified(Exception):
+    """El servidor respondió 304: la página no cambió desde la última corrida."""
+    def __init__(self, url: str, meta: Optional[dict] = None):
+        super().__init__(f"304 Not Modified: {url}")
+        self.url = url
+        self.meta = meta or {}
+
+def build_session() -> requests.Session:
+    retries = Retry(total=3, connect=3, read=3, backoff_factor=0.6,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                    allowed_methods=["GET", "HEAD"],
+                    respect_retry_after_header=True,
+                    raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_PER_HOST,
+                          max_retries=retries)
+    s = requests.Session()
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update(DEFAULT_HEADERS)
+    return s
+
+def _read_json(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def _write_json(path: str, data: dict):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+class ValidatorStore:
+    """
+    url → {'etag', 'last_modified', ...meta}. Thread-safe, persistido en JSON.
+    put() deja el registro pendiente; sólo save() lo vuelve visible para get().
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data: Dict[str, dict] = _read_json(path)
+        self._pending: Dict[str, dict] = {}
+
+    def get(self, url: str) -> Optional[dict]:
+        with self._lock:
+            return self._data.get(url)
+
+    def put(self, url: str, rec: dict):
+        with self._lock:
+            self._pending[url] = rec
+
+    def remember(self, url: str, resp: requests.Response, **meta):
+        """Registra los validadores de `resp` (si el servidor los envía) más metadatos del scraper."""
+        etag = resp.headers.get("ETag")
+        last_mod = resp.headers.get("Last-Modified")
+        if not (etag or last_mod):
+            return
+        self.put(url, {"etag": etag, "last_modified": last_mod, **meta})
+
+    def dump_pending(self, path: str):
+        with self._lock:
+            pending = dict(self._pending)
+        _write_json(path, pending)
+
+    def load_pending(self, path: str):
+        pending = _read_json(path)
+        with self._lock:
+            self._pending.update(pending)
+
+    def save(self):
+        with self._lock:
+            if not self._pending:
+                return
+            self._data.update(self._pending)
+            self._pending.clear()
+            _write_json(self.path, self._data)
+
+    def commit_pending(self, path: str):
+        """Confirma un archivo de dump_pending() (una vez que sus notas están en la salida)."""
+        if not os.path.exists(path):
+            return
+        self.load_pending(path)
+        self.save()
+        os.remove(path)
+
+SESSION = build_session()
+_STORES: Dict[str, ValidatorStore] = {}
+_STORES_LOCK = threading.Lock()
+
+def validadores(salida: str) -> ValidatorStore:
+    """Almacén de validadores de una salida (ruta del CSV que escribe el scraper)."""
+    nombre = os.path.splitext(os.path.basename(salida))[0]
+    with _STORES_LOCK:
+        if nombre not in _STORES:
+            _STORES[nombre] = ValidatorStore(os.path.join(VALIDATORS_DIR, f"validators.{nombre}.json"))
+        return _STORES[nombre]
+
+def get(url: str, headers: Optional[dict] = None, timeout: int = DEFAULT_TIMEOUT,
+        validators: Optional[ValidatorStore] = None) -> requests.Response:
+    """
+    GET sobre la sesión compartida. Con `validators` envía los guardados para
+    `url` y lanza NotModified si la respuesta es 304.
+    """
+    h = dict(headers or {})
+    rec = validators.get(url) if validators is not None else None
+    if rec:
+        if rec.get("etag"):
+            h["If-None-Match"] = rec["etag"]
+        if rec.get("last_modified"):
+            h["If-Modified-Since"] = rec["last_modified"]
+    r = SESSION.get(url, headers=h, timeout=timeout)
+    if r.status_code == 304 and rec:
+        raise NotModified(url, rec)
+    return r
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Bitácora de checkpoint append-only (JSONL) para retomar un scraping cortado.
+
+Reemplaza a reescribir todo el CSV de resultados cada N notas (costo cuadrático
+en el largo de la corrida): cada nota procesada agrega una línea
+
+    {"url": ..., "fila": {...}}     ← fila None: procesada sin resultado (304, no relevante)
+
+y se hace fsync cada FSYNC_CADA registros (o FSYNC_SEG segundos). La primera
+línea guarda un encabezado {"_meta": {...}} (p. ej. la fecha de corte): al
+abrir, si coincide se re-lee la bitácora (urls hechas + filas) y se retoma; si
+no, se empieza de cero. Una última línea cortada a mitad por un corte se ignora.
+Al terminar bien, el scraper escribe su salida final con filas() y llama a clear().
+"""
+
+import os, json, time
+from typing import Dict, List, Optional, Set
+
+FSYNC_CADA = 20
+FSYNC_SEG  = 5.0
+
+class Journal:
+    def __init__(self, path: str, meta: Optional[dict] = None,
+                 fsync_cada: int = FSYNC_CADA, fsync_seg: float = FSYNC_SEG):
+        self.path = path
+        self.meta = meta or {}
+        self.fsync_cada = fsync_cada
+        self.fsync_seg = fsync_seg
+        self.hechas: Set[str] = set()
+        self._filas: Dict[str, dict] = {}   # url → fila (la última registrada)
+        self._sin_sync = 0
+        self._ultimo_sync = time.time()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        retomada = self._replay()
+        self._f = open(path, "a" if retomada else "w", encoding="utf-8")
+        if not retomada:
+            self._escribir({"_meta": self.meta})
+            self.sync()
+
+    def _replay(self) -> bool:
+        """Carga la bitácora existente si su encabezado coincide con meta."""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, encoding="utf-8") as f:
+            lineas = f.read().split("\n")
+        try:
+            if json.loads(lineas[0]).get("_meta") != self.meta:
+                return False
+        except ValueError:
+            return False
+        validas = 1
+        for ln in lineas[1:]:
+            try:
+                rec = json.loads(ln)
+            except ValueError:
+                break  # línea cortada (o vacía final): lo que sigue no cuenta
+            self.hechas.add(rec["url"])
+            if rec.get("fila") is not None:
+                self._filas[rec["url"]] = rec["fila"]
+            validas += 1
+        # descartar una cola cortada antes de seguir agregando
+        contenido = "\n".join(lineas[:validas]) + "\n"
+        if len(contenido.encode("utf-8")) != os.path.getsize(self.path):
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(contenido)
+        return True
+
+    def __len__(self) -> int:
+        return len(self.hechas)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.hechas
+
+    def _escribir(self, rec: dict):
+        self._f.write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+
+    def registrar(self, url: str, fila: Optional[dict] = None):
+        """Una nota procesada (con su fila, o None si no aportó resultado)."""
+        self._escribir({"url": url, "fila": fila})
+        self.hechas.add(url)
+        if fila is not None:
+            self._filas[url] = fila
+        self._sin_sync += 1
+        if self._sin_sync >= self.fsync_cada or time.time() - self._ultimo_sync >= self.fsync_seg:
+            self.sync()
+
+    def sync(self):
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._sin_sync = 0
+        self._ultimo_sync = time.time()
+
+    def filas(self) -> List[dict]:
+        """Filas registradas (incluidas las de corridas anteriores), en orden de registro."""
+        return list(self._filas.values())
+
+    def close(self):
+        if not self._f.closed:
+            self.sync()
+            self._f.close()
+
+    def clear(self):
+        """Corrida terminada y salida final escrita: la bitácora ya no hace falta."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
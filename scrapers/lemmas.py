@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Etapa única de lematización con spaCy, compartida por frecuencias, BERTopic y
+los bigramas de pipeline_limpieza.
+
+- Pipeline mínimo: sólo lo que necesita el lematizador (tok2vec, morphologizer,
+  attribute_ruler, lemmatizer); parser y NER ni se cargan.
+- nlp.pipe con n_process workers (el llamador debe estar bajo
+  `if __name__ == "__main__"` si usa más de uno en Windows).
+- Resultado por texto: tokens alfabéticos, su lemma y su offset en el texto.
+  Se persiste en data/cache/lemmas.sqlite con clave hash(modelo, texto): un
+  texto ya lematizado (en esta u otra etapa, en esta u otra corrida) no vuelve
+  a pasar por spaCy.
+"""
+
+import os, json, sqlite3
+from hashlib import md5
+from typing import List, NamedTuple, Optional
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+LEMMAS_PATH = os.path.join(ROOT_DIR, "data", "cache", "lemmas.sqlite")
+SPACY_MODEL = "es_core_news_sm"
+EXCLUDE = ["parser", "ner", "senter"]
+N_PROCESS = max(1, min(4, (os.cpu_count() or 2) - 1))
+BATCH_SIZE = 64
+LOOKUP_CHUNK = 500  # claves por consulta IN (...) (límite de parámetros de SQLite)
+
+class Lemas(NamedTuple):
+    tokens: List[str]   # sólo tokens is_alpha, en orden
+    lemmas: List[str]   # lemma_ de cada token (sin normalizar: cada consumidor normaliza)
+    offsets: List[int]  # posición del token en el texto (t.idx)
+
+_NLP = {}
+
+def load_nlp(model: str = SPACY_MODEL):
+    if model not in _NLP:
+        import spacy
+        _NLP[model] = spacy.load(model, exclude=EXCLUDE)
+    return _NLP[model]
+
+def version_modelo(model: str = SPACY_MODEL) -> str:
+    import spacy
+    nlp = load_nlp(model)
+    return f"{model}-{nlp.meta.get('version', '')}|spacy-{spacy.__version__}"
+
+class LemmaStore:
+    def __init__(self, path: str = LEMMAS_PATH, model: str = SPACY_MODEL):
+        self.path = path
+        self.model = model
+        self.version = version_modelo(model)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.con = sqlite3.connect(path)
+        self.con.execute("CREATE TABLE IF NOT EXISTS lemas (k TEXT PRIMARY KEY, tokens TEXT, lemmas TEXT, offsets TEXT)")
+
+    def key(self, texto: str) -> str:
+        return md5(f"{self.version}\x1f{texto}".encode("utf-8")).hexdigest()
+
+    def _get_many(self, claves: List[str]) -> dict:
+        out = {}
+        for i in range(0, len(claves), LOOKUP_CHUNK):
+            lote = claves[i:i+LOOKUP_CHUNK]
+            q = f"SELECT k, tokens, lemmas, offsets FROM lemas WHERE k IN ({','.join('?' * len(lote))})"
+            for k, tok, lem, off in self.con.execute(q, lote):
+                out[k] = Lemas(json.loads(tok), json.loads(lem), json.loads(off))
+        return out
+
+    def lematizar(self, textos: List[str], n_process: Optional[int] = None,
+                  batch_size: int = BATCH_SIZE) -> List[Lemas]:
+        """Lemas de cada texto (mismo orden). Sólo los textos no guardados pasan por spaCy."""
+        textos = ["" if t is None else str(t) for t in textos]
+        claves = [self.key(t) for t in textos]
+        hechos = self._get_many(list(dict.fromkeys(claves)))
+        pend = {}
+        for k, t in zip(claves, textos):
+            if k not in hechos:
+                pend.setdefault(k, t)
+
+        if pend:
+            nlp = load_nlp(self.model)
+            n = n_process or N_PROCESS
+            if len(pend) < batch_size * 2:
+                n = 1  # levantar procesos no compensa
+            filas = []
+            for k, doc in zip(pend, nlp.pipe(pend.values(), n_process=n, batch_size=batch_size)):
+                alfa = [t for t in doc if t.is_alpha]
+                lem = Lemas([t.text for t in alfa], [t.lemma_ for t in alfa], [t.idx for t in alfa])
+                hechos[k] = lem
+                filas.append((k, json.dumps(lem.tokens, ensure_ascii=False),
+                              json.dumps(lem.lemmas, ensure_ascii=False), json.dumps(lem.offsets)))
+                if len(filas) >= 1000:
+                    self._guardar(filas); filas = []
+            self._guardar(filas)
+        return [hechos[k] for k in claves]
+
+    def _guardar(self, filas):
+        if filas:
+            self.con.executemany("INSERT OR REPLACE INTO lemas VALUES (?, ?, ?, ?)", filas)
+            self.con.commit()
+
+    def close(self):
+        self.con.close()
+
+def lematizar(textos: List[str], path: str = LEMMAS_PATH, n_process: Optional[int] = None) -> List[Lemas]:
+    """Atajo: abre el store, lematiza y cierra."""
+    store = LemmaStore(path)
+    try:
+        return store.lematizar(textos, n_process=n_process)
+    finally:
+        store.close()
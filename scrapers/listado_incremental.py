@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Lectura incremental de listados "Ver más" con Selenium.
+
+Cada click agrega tarjetas al final del DOM. En vez de re-parsear
+driver.page_source completo después de cada click (trabajo que crece con las
+páginas cargadas), ListadoIncremental recuerda cuántas tarjetas ya leyó y pide
+por JS sólo el outerHTML de las siguientes. La espera tras el click es un
+conteo de elementos (querySelectorAll(...).length) en el navegador.
+
+No importa selenium: sólo usa driver.execute_script, así los módulos que lo
+tienen como opcional pueden importarlo igual.
+"""
+
+import time
+from typing import List
+
+from bs4 import BeautifulSoup
+
+JS_CONTAR  = "return document.querySelectorAll(arguments[0]).length;"
+JS_NUEVOS  = ("return Array.from(document.querySelectorAll(arguments[0]))"
+              ".slice(arguments[1]).map(function (e) { return e.outerHTML; });")
+POLL       = 0.25   # segundos entre conteos mientras se espera el click
+
+def contar(driver, selector: str) -> int:
+    return int(driver.execute_script(JS_CONTAR, selector) or 0)
+
+def esperar_mas(driver, selector: str, prev_count: int, timeout: float = 10) -> bool:
+    """Espera hasta que haya más de `prev_count` tarjetas. False si vence el timeout."""
+    limite = time.monotonic() + timeout
+    while True:
+        if contar(driver, selector) > prev_count:
+            return True
+        if time.monotonic() >= limite:
+            return False
+        time.sleep(POLL)
+
+class ListadoIncremental:
+    """Tarjetas que matchean `selector` agregadas desde la última llamada a nuevas()."""
+
+    def __init__(self, driver, selector: str):
+        self.driver = driver
+        self.selector = selector
+        self.offset = 0
+
+    def nuevas(self) -> List:
+        htmls = self.driver.execute_script(JS_NUEVOS, self.selector, self.offset) or []
+        if not htmls and contar(self.driver, self.selector) < self.offset:
+            # el DOM se recargó (navegación/refresh): se vuelve a leer desde el principio
+            self.offset = 0
+            htmls = self.driver.execute_script(JS_NUEVOS, self.selector, 0) or []
+        self.offset += len(htmls)
+        out = []
+        for h in htmls:
+            tag = BeautifulSoup(h, "html.parser").find()
+            if tag is not None:
+                out.append(tag)
+        return out
+
+    def esperar_mas(self, timeout: float = 10) -> bool:
+        return esperar_mas(self.driver, self.selector, self.offset, timeout)
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Búsqueda de muchas claves a la vez (Aho–Corasick) sobre texto normalizado.
+
+- El texto y las claves se normalizan igual: minúsculas, sin tildes/diéresis
+  ("Azcué" == "azcue"), cualquier espacio → " ". La normalización es carácter a
+  carácter, así las posiciones se traducen de vuelta al texto original.
+- Un solo recorrido del documento encuentra todas las claves (en vez de un
+  `clave in texto` por clave).
+- Las claves se agrupan por entidad: {"romero": ["rosario romero", "romero"], ...};
+  con una lista simple cada clave es su propia entidad.
+- palabra_completa=True exige límite de palabra a ambos lados (como \\b en regex).
+
+Si está instalado pyahocorasick se usa su autómata en C; si no, el de este módulo.
+"""
+
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+try:
+    import ahocorasick  # pyahocorasick (opcional)
+    AHOCORASICK_OK = True
+except Exception:
+    AHOCORASICK_OK = False
+
+class Mencion(NamedTuple):
+    entidad: str
+    clave: str      # clave normalizada que matcheó
+    inicio: int     # posiciones en el texto ORIGINAL (texto[inicio:fin])
+    fin: int
+
+@lru_cache(maxsize=4096)
+def _fold(c: str) -> str:
+    if c.isspace():
+        return " "
+    return "".join(d for d in unicodedata.normalize("NFD", c) if not unicodedata.combining(d)).lower()
+
+def normalizar(texto: str) -> Tuple[str, Optional[List[int]]]:
+    """(texto normalizado, mapa índice_normalizado → índice_original). Mapa None si es 1 a 1."""
+    partes = [_fold(c) for c in texto]
+    norm = "".join(partes)
+    if len(norm) == len(texto):
+        return norm, None
+    mapa = []
+    for i, p in enumerate(partes):
+        mapa.extend([i] * len(p))
+    return norm, mapa
+
+def _es_palabra(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+class _Automata:
+    """Aho–Corasick en Python puro: goto/fail/salidas sobre dicts."""
+
+    def __init__(self, claves: Dict[str, str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.salida: List[List[Tuple[str, str]]] = [[]]
+        for clave, entidad in claves.items():
+            s = 0
+            for c in clave:
+                if c not in self.goto[s]:
+                    self.goto.append({}); self.salida.append([])
+                    self.goto[s][c] = len(self.goto) - 1
+                s = self.goto[s][c]
+            self.salida[s].append((clave, entidad))
+        # fail links por BFS (los de profundidad 1 van a la raíz); las salidas del fail se heredan
+        self.fail = [0] * len(self.goto)
+        cola = deque(self.goto[0].values())
+        while cola:
+            r = cola.popleft()
+            for c, s in self.goto[r].items():
+                cola.append(s)
+                if r:
+                    f = self.fail[r]
+                    while f and c not in self.goto[f]:
+                        f = self.fail[f]
+                    self.fail[s] = self.goto[f].get(c, 0)
+                self.salida[s] = self.salida[s] + self.salida[self.fail[s]]
+
+    def iter(self, texto: str) -> Iterator[Tuple[int, Tuple[str, str]]]:
+        goto, fail, salida = self.goto, self.fail, self.salida
+        s = 0
+        for i, c in enumerate(texto):
+            while s and c not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(c, 0)
+            for out in salida[s]:
+                yield i, out
+
+class Matcher:
+    def __init__(self, claves: Union[Dict[str, Iterable[str]], Iterable[str]],
+                 palabra_completa: bool = False):
+        if not isinstance(claves, dict):
+            claves = {normalizar(k)[0]: [k] for k in claves}
+        self.palabra_completa = palabra_completa
+        self.claves: Dict[str, str] = {}   # clave normalizada → entidad
+        for entidad, variantes in claves.items():
+            for v in variantes:
+                k = " ".join(normalizar(v)[0].split())
+                if k:
+                    self.claves.setdefault(k, entidad)
+        if AHOCORASICK_OK:
+            self._ac = ahocorasick.Automaton()
+            for k, entidad in self.claves.items():
+                self._ac.add_word(k, (k, entidad))
+            self._ac.make_automaton()
+        else:
+            self._ac = _Automata(self.claves)
+
+    def _iter_norm(self, norm: str) -> Iterator[Tuple[int, int, str, str]]:
+        """(inicio, fin, clave, entidad) sobre el texto normalizado."""
+        it = self._ac.iter(norm) if norm and self.claves else ()
+        for fin_incl, (clave, entidad) in it:
+            ini, fin = fin_incl - len(clave) + 1, fin_incl + 1
+            if self.palabra_completa and (
+                (ini > 0 and _es_palabra(norm[ini - 1])) or (fin < len(norm) and _es_palabra(norm[fin]))
+            ):
+                continue
+            yield ini, fin, clave, entidad
+
+    def buscar(self, texto) -> List[Mencion]:
+        """Todas las menciones, con posiciones en el texto original."""
+        if not isinstance(texto, str):
+            return []
+        norm, mapa = normalizar(texto)
+        out = []
+        for ini, fin, clave, entidad in self._iter_norm(norm):
+            if mapa is not None:
+                ini, fin = mapa[ini], mapa[fin - 1] + 1
+            out.append(Mencion(entidad, clave, ini, fin))
+        return out
+
+    def entidades(self, texto) -> Set[str]:
+        if not isinstance(texto, str):
+            return set()
+        return {entidad for _, _, _, entidad in self._iter_norm(normalizar(texto)[0])}
+
+    def menciona(self, texto) -> bool:
+        """True apenas aparece alguna clave (corta en la primera)."""
+        if not isinstance(texto, str):
+            return False
+        for _ in self._iter_norm(normalizar(texto)[0]):
+            return True
+        return False
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Casi-duplicados entre medios (MinHash + LSH), incremental.
+
+Las gacetillas de los municipios y los cables salen casi textuales en varios
+medios con enlaces distintos, así que el dedupe por 'enlace' no los junta.
+
+- Shingles: n-gramas de SHINGLE palabras del texto normalizado (minúsculas, sin tildes).
+- Firma MinHash de NUM_PERM permutaciones (h(x) = (a·x + b) mod p sobre crc32).
+- LSH con BANDS bandas: dos textos son candidatos si coinciden en alguna banda;
+  se confirman si la similitud estimada (filas de firma iguales) >= UMBRAL.
+- Cada documento queda en un cluster; canonical = el primero indexado del cluster
+  (estable entre corridas). cluster_id = número de inserción del canónico.
+
+Todo vive en data/cache/near_dup.sqlite: agregar una semana sólo calcula las
+firmas de los documentos nuevos.
+"""
+
+import os, re, sqlite3, unicodedata, zlib
+from hashlib import md5
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+NEAR_DUP_PATH = os.path.join(ROOT_DIR, "data", "cache", "near_dup.sqlite")
+NUM_PERM   = 128
+BANDS      = 32          # 32 bandas × 4 filas: umbral efectivo ≈ (1/32)^(1/4) ≈ 0.42
+UMBRAL     = 0.8         # similitud estimada mínima para confirmar
+SHINGLE    = 5           # palabras por shingle
+MIN_TOKENS = 20          # textos más cortos quedan solos (no se comparan)
+LOOKUP_CHUNK = 500
+_PRIMO = np.uint64(4294967311)   # primo > 2^32: (a·x + b) entra en uint64
+
+_rng = np.random.RandomState(1)  # fijo: las firmas deben ser comparables entre corridas
+_A = _rng.randint(1, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+
+def _tokens(texto: str) -> List[str]:
+    t = unicodedata.normalize("NFKD", str(texto).lower()).encode("ascii", "ignore").decode("ascii")
+    return re.findall(r"[a-z0-9]+", t)
+
+def firma(texto: str):
+    """Firma MinHash (NUM_PERM uint64) o None si el texto es demasiado corto."""
+    toks = _tokens(texto)
+    if len(toks) < MIN_TOKENS:
+        return None
+    shingles = {" ".join(toks[i:i+SHINGLE]) for i in range(len(toks) - SHINGLE + 1)}
+    x = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    return ((_A[:, None] * x[None, :] + _B[:, None]) % _PRIMO).min(axis=1)
+
+def _bandas(sig) -> List[str]:
+    filas = NUM_PERM // BANDS
+    return [md5(bytes([b]) + sig[b*filas:(b+1)*filas].tobytes()).hexdigest() for b in range(BANDS)]
+
+class NearDupIndex:
+    def __init__(self, path: str = NEAR_DUP_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.con = sqlite3.connect(path)
+        self.con.execute("CREATE TABLE IF NOT EXISTS docs (n INTEGER PRIMARY KEY, k TEXT UNIQUE, "
+                         "sig BLOB, canonical INTEGER)")
+        self.con.execute("CREATE TABLE IF NOT EXISTS bandas (h TEXT, n INTEGER)")
+        self.con.execute("CREATE INDEX IF NOT EXISTS bandas_h ON bandas (h)")
+
+    def _conocidos(self, claves: List[str]) -> Dict[str, Tuple[int, int]]:
+        out = {}
+        for i in range(0, len(claves), LOOKUP_CHUNK):
+            lote = claves[i:i+LOOKUP_CHUNK]
+            q = f"SELECT k, n, canonical FROM docs WHERE k IN ({','.join('?' * len(lote))})"
+            out.update((k, (n, c)) for k, n, c in self.con.execute(q, lote))
+        return out
+
+    def _agregar(self, clave: str, texto: str) -> int:
+        sig = firma(texto)
+        cur = self.con.execute("INSERT INTO docs (k, sig, canonical) VALUES (?, ?, NULL)",
+                               (clave, None if sig is None else sig.tobytes()))
+        n = cur.lastrowid
+        canon = n
+        if sig is not None:
+            hs = _bandas(sig)
+            cand = {m for (m,) in self.con.execute(
+                f"SELECT DISTINCT n FROM bandas WHERE h IN ({','.join('?' * len(hs))})", hs)}
+            canonicos = set()
+            for m in cand:
+                row = self.con.execute("SELECT sig, canonical FROM docs WHERE n=?", (m,)).fetchone()
+                otra = np.frombuffer(row[0], dtype=np.uint64)
+                if float(np.mean(otra == sig)) >= UMBRAL:
+                    canonicos.add(row[1])
+            if canonicos:
+                canon = min(canonicos)
+                otros = sorted(canonicos - {canon})
+                if otros:  # el nuevo une clusters: todos pasan al canónico más viejo
+                    self.con.execute(f"UPDATE docs SET canonical=? WHERE canonical IN ({','.join('?' * len(otros))})",
+                                     [canon] + otros)
+            self.con.executemany("INSERT INTO bandas VALUES (?, ?)", ((h, n) for h in hs))
+        self.con.execute("UPDATE docs SET canonical=? WHERE n=?", (canon, n))
+        return n
+
+    def asignar(self, claves: List[str], textos: List[str]) -> Dict[str, Tuple[int, str]]:
+        """clave → (cluster_id, clave canónica). Indexa las claves que no estaban."""
+        conocidos = self._conocidos(list(dict.fromkeys(claves)))
+        nuevos = 0
+        for k, t in zip(claves, textos):
+            if k not in conocidos:
+                self._agregar(k, t)
+                conocidos[k] = None
+                nuevos += 1
+        self.con.commit()
+        # releer: una unión puede haber cambiado el canónico de documentos viejos
+        conocidos = self._conocidos(list(conocidos))
+        ids = sorted({c for _, c in conocidos.values()})
+        cano = {}
+        for i in range(0, len(ids), LOOKUP_CHUNK):
+            lote = ids[i:i+LOOKUP_CHUNK]
+            q = f"SELECT n, k FROM docs WHERE n IN ({','.join('?' * len(lote))})"
+            cano.update(self.con.execute(q, lote).fetchall())
+        self.nuevos = nuevos
+        return {k: (c, cano[c]) for k, (_, c) in conocidos.items()}
+
+    def close(self):
+        self.con.close()
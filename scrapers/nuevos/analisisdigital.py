@@ -18,7 +18,10 @@ import logging
 from datetime import datetime, timedelta
 from hashlib import md5
 import sys
-import re
+
+# el detalle se extrae con el motor compartido de scrapers/ (extraccion.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import extraccion
 
 # ------------ CONFIGURACIÓN -----------
 MEDIO             = "analisisdigital"
@@ -86,35 +89,6 @@ def robust_request(url, headers=None, timeout=15, max_retries=3, wait=2):
     log(f"ERROR persistente para {url} tras {max_retries} reintentos.", "error")
     return None
 
-def parse_fecha_analisis(fecha_str):
-    meses = {
-        'enero': '01', 'febrero': '02', 'marzo': '03',
-        'abril': '04', 'mayo': '05', 'junio': '06',
-        'julio': '07', 'agosto': '08', 'septiembre': '09',
-        'octubre': '10', 'noviembre': '11', 'diciembre': '12'
-    }
-    if not fecha_str or not isinstance(fecha_str, str):
-        return pd.NaT
-    try:
-        partes = fecha_str.lower().split(' de ')
-        dia = int(partes[0].strip())
-        mes = meses.get(partes[1].strip(), None)
-        anio_hora = partes[2].split(' - ')
-        anio = anio_hora[0].strip()
-        hora = anio_hora[1].strip() if len(anio_hora) > 1 else "00:00"
-        return datetime.strptime(f"{anio}-{mes}-{dia:02d} {hora}", "%Y-%m-%d %H:%M")
-    except Exception:
-        try:
-            m = re.search(r'(\d{1,2}) de ([a-záéíóú]+) de (\d{4})', fecha_str.lower())
-            if m:
-                dia, mes_str, anio = int(m.group(1)), m.group(2), int(m.group(3))
-                mes = meses.get(mes_str, None)
-                if mes:
-                    return datetime.strptime(f"{anio}-{mes}-{dia:02d} 00:00", "%Y-%m-%d %H:%M")
-        except Exception as e:
-            log(f"Error parseando fecha: {fecha_str} -> {e}", "warning")
-        return pd.NaT
-
 def scrapear_seccion(seccion, fecha_corte_dt, backup_path):
     log(f"Iniciando scraping: {MEDIO} - {seccion}")
     resultados = []
@@ -159,17 +133,9 @@ def scrapear_seccion(seccion, fecha_corte_dt, backup_path):
                     res_nota = robust_request(enlace, headers=HEADERS)
                     if res_nota is None:
                         continue
-                    soup_nota = BeautifulSoup(res_nota.text, "html.parser")
-                    fecha_tag = soup_nota.find('div', class_=lambda x: x and 'field--name-node-post-date' in x)
-                    fecha_raw = fecha_tag.get_text(strip=True) if fecha_tag else ''
-                    fecha_parseada = parse_fecha_analisis(fecha_raw)
-
-                    if not fecha_parseada or pd.isna(fecha_parseada):
-                        body_txt = soup_nota.get_text(separator=" ", strip=True)
-                        fecha_regex = re.search(r'(\d{1,2}) de ([a-záéíóú]+) de (\d{4})', body_txt, re.I)
-                        if fecha_regex:
-                            fecha_parseada = parse_fecha_analisis(fecha_regex.group(0))
-                    if not fecha_parseada or pd.isna(fecha_parseada):
+                    nota = extraccion.extraer(MEDIO, res_nota.text)
+                    fecha_parseada = nota.fecha
+                    if not fecha_parseada:
                         log(f"Nota omitida por no parsear fecha: {enlace}", "warning")
                         omitidas_sin_fecha += 1
                         continue
@@ -178,9 +144,7 @@ def scrapear_seccion(seccion, fecha_corte_dt, backup_path):
                         log(f"Corte por fecha: {fecha_parseada} < {fecha_corte_dt}", "info")
                         return resultados
 
-                    cuerpo_div = soup_nota.find('div', class_=lambda x: x and 'body-noticia' in x)
-                    parrafos = [p.get_text(strip=True) for p in cuerpo_div.find_all('p')] if cuerpo_div else []
-                    contenido = "\n".join(parrafos)
+                    contenido = nota.contenido
 
                     if not (menciona_relevante(titulo) or menciona_relevante(contenido)):
                         continue
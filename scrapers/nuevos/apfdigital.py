@@ -7,12 +7,16 @@
 # - Estandarización homogénea de salida
 # ===========================================
 
-import os, re, time, random, logging
+import os, time, random, logging
 from datetime import datetime, timedelta
 from hashlib import md5
 from urllib.parse import urljoin
 import sys
 
+# el detalle se extrae con el motor compartido de scrapers/ (extraccion.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import extraccion
+
 import requests
 from requests.adapters import HTTPAdapter, Retry
 import pandas as pd
@@ -83,19 +87,6 @@ def menciona_relevante(texto):
     texto_limpio = texto.lower()
     return any(clave in texto_limpio for clave in CLAVES_RELEVANTES)
 
-def parse_fecha_apf(txt):
-    meses = {
-        "enero":1,"febrero":2,"marzo":3,"abril":4,"mayo":5,"junio":6,
-        "julio":7,"agosto":8,"septiembre":9,"octubre":10,"noviembre":11,"diciembre":12
-    }
-    m = re.search(r'(\d{1,2})\s+de\s+([a-záéíóú]+)\s+de\s+(\d{4})', txt.lower())
-    if not m: return None
-    d, mes_str, y = int(m.group(1)), m.group(2), int(m.group(3))
-    mes = meses.get(mes_str.strip(" ."))
-    if not mes: return None
-    try: return datetime(y, mes, d)
-    except: return None
-
 def setup_driver(headless=True):
     opts = Options()
     if headless: opts.add_argument("--headless=new")
@@ -142,33 +133,9 @@ def click_next_page(driver, prev_count, timeout=10):
 def scrap_articulo_requests(url_abs, titulo_listado):
     r = session.get(url_abs, headers=HEADERS, timeout=25)
     r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
-
-    titulo = soup.select_one("h1.titulo-nota")
-    titulo = titulo.get_text(strip=True) if titulo else titulo_listado
-
-    copete = soup.select_one("h2.bajada")
-    copete = copete.get_text(strip=True) if copete else ""
-
-    fecha = None
-    tag_data = soup.select_one("[data-fecha]")
-    if tag_data and tag_data.get("data-fecha"):
-        try:
-            fecha = datetime.strptime(tag_data["data-fecha"], "%Y/%m/%d %H:%M:%S")
-        except Exception:
-            pass
-    if fecha is None:
-        tag_txt = soup.select_one("div[class*='fecha'], span[class*='fecha'], time")
-        fecha_txt = tag_txt.get_text(strip=True) if tag_txt else ""
-        fecha = parse_fecha_apf(fecha_txt)
-
-    cuerpo_div = soup.select_one("div.noticia-contenido, div.cuerpo-nota, div.texto, div#cuerpo-nota")
-    if cuerpo_div:
-        texto = " ".join(p.get_text(strip=True) for p in cuerpo_div.find_all(["p", "h3"]))
-    else:
-        texto = ""
-
-    contenido_completo = (copete + " " + texto).strip()
+    nota = extraccion.extraer(MEDIO, r.text)
+    titulo = nota.titulo or titulo_listado
+    copete, fecha, contenido_completo = nota.copete, nota.fecha, nota.contenido
 
     if not (menciona_relevante(titulo) or menciona_relevante(contenido_completo)):
         raise ValueError("nota no relevante")
@@ -7,7 +7,7 @@
 # - Corte por fecha, incremental CSV, dedupe por id
 # ================================
 
-import os, re, time, random, logging
+import os, time, random, logging
 from datetime import datetime, timedelta
 from collections import OrderedDict
 from hashlib import md5
@@ -26,6 +26,10 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import NoSuchElementException
 import sys
 
+# el detalle se extrae con el motor compartido de scrapers/ (extraccion.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import extraccion
+
 # ---------- FECHA CORTE ----------
 if len(sys.argv) > 1:
     FECHA_CORTE_STR = sys.argv[1]
@@ -76,26 +80,6 @@ console.setFormatter(logging.Formatter("%(levelname)s - %(message)s"))
 logging.getLogger().addHandler(console)
 
 # ---------- FUNCIONES AUXILIARES ----------
-MESES_ES = {
-    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6,
-    "julio": 7, "agosto": 8, "septiembre": 9, "octubre": 10, "noviembre": 11, "diciembre": 12
-}
-def parse_fecha_es(fecha_str: str):
-    if not fecha_str:
-        return None
-    f = fecha_str.lower().strip()
-    m = re.search(r"(\d{1,2})\s+de\s+([a-záéíóú]+)\s+de\s+(\d{4})", f)
-    if not m:
-        return None
-    d, mes_str, y = int(m.group(1)), m.group(2), int(m.group(3))
-    mes = MESES_ES.get(mes_str.strip(" ."))
-    if not mes:
-        return None
-    try:
-        return datetime(y, mes, d)
-    except Exception:
-        return None
-
 def make_hash(value: str) -> str:
     return md5(value.encode("utf-8")).hexdigest()
 
@@ -173,53 +157,20 @@ def scroll_and_collect_links(driver, fecha_corte: datetime, max_links=None):
 def scrap_articulo_requests(url_abs: str, filtrar_secciones=False):
     r = requests.get(url_abs, headers=HEADERS, timeout=25)
     r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
-
-    seccion_tag = soup.select_one("div.cont-volanta a.etiqueta")
-    seccion = seccion_tag.get_text(strip=True).lower() if seccion_tag else None
+    nota = extraccion.extraer("elonce", r.text)
+    seccion = nota.seccion.lower() if nota.seccion else None
     if filtrar_secciones and seccion not in SECCIONES_OK:
         return None, None
-
-    h1 = soup.select_one("h1.titulo-nota") or soup.select_one("h1")
-    titulo = h1.get_text(strip=True) if h1 else "Sin título"
-    bajada_tag = soup.select_one("h2.bajada")
-    copete = bajada_tag.get_text(strip=True) if bajada_tag else ""
-
-    fecha_dt = None
-    fecha_tag = soup.select_one("span.fecha-nota")
-    if fecha_tag:
-        txt = fecha_tag.get_text(strip=True)
-        fecha_dt = parse_fecha_es(txt)
-
-    if not fecha_dt:
-        tag_data = soup.select_one("[data-fecha]")
-        if tag_data and tag_data.get("data-fecha"):
-            try:
-                fecha_dt = datetime.strptime(tag_data["data-fecha"], "%Y/%m/%d %H:%M:%S")
-            except:
-                pass
-
-    if not fecha_dt:
-        tag_txt = soup.select_one("div[class*='fecha'], span[class*='fecha'], time")
-        txt = tag_txt.get_text(strip=True) if tag_txt else ""
-        fecha_dt = parse_fecha_es(txt)
-
-    cuerpo_div = (soup.select_one("div.texto")
-                  or soup.select_one("div.noticia-contenido")
-                  or soup.select_one("div.cuerpo-nota"))
-    if cuerpo_div:
-        texto = "\n".join(p.get_text(strip=True) for p in cuerpo_div.find_all(["p","h3"]) if p.get_text(strip=True))
-    else:
-        texto = ""
+    fecha_dt = nota.fecha
 
     row = {
         "id": make_hash(url_abs),
         "medio": "elonce",
         "fecha": fecha_dt.strftime("%Y-%m-%d") if fecha_dt else None,
         "seccion": seccion,
-        "titulo": titulo,
+        "titulo": nota.titulo or "Sin título",
         "url": url_abs,
-        "contenido": (copete + " " + texto).strip()
+        "contenido": nota.contenido
     }
     return row, fecha_dt
 
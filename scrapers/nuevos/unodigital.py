@@ -6,7 +6,7 @@
 # - Incremental + deduplicación
 # =====================================
 
-import os, re, time, logging, random
+import os, time, logging, random
 from datetime import datetime, timedelta
 from hashlib import md5
 from urllib.parse import urljoin
@@ -16,6 +16,10 @@ import pandas as pd
 from bs4 import BeautifulSoup
 import sys
 
+# el detalle se extrae con el motor compartido de scrapers/ (extraccion.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import extraccion
+
 # -------- CONFIG GLOBAL --------
 MEDIO = "unodigital"
 SECCIONES = {
@@ -61,29 +65,10 @@ logging.basicConfig(filename=LOG_PATH, level=logging.INFO, format="%(asctime)s -
 SEL_CARD = "article.standard-entry-box, article.big-entry-box"
 SEL_TITLE = ".entry-data h2.entry-title"
 SEL_LINK = "a.cover-link"
-SEL_FECHA_DET = ".fecha-container .nota-fecha"
-SEL_COPETE = "p.ignore-parser"
-SEL_CONTENIDO = ".article-body p"
 EXCLUIR_SMALL = ".small-entry"
 
 # -------- FUNCIONES AUX --------
 HEADERS = {"User-Agent": "Mozilla/5.0"}
-MESES_ES = {
-    "enero":"01","febrero":"02","marzo":"03","abril":"04","mayo":"05","junio":"06",
-    "julio":"07","agosto":"08","septiembre":"09","octubre":"10","noviembre":"11","diciembre":"12"
-}
-def parse_fecha_es(txt):
-    if not txt:
-        return None
-    m = re.search(r'(\d{1,2})\s+de\s+([a-záéíóú]+)\s+(\d{4})', txt.lower())
-    if not m:
-        return None
-    d, mes_str, y = int(m.group(1)), m.group(2), int(m.group(3))
-    mes = MESES_ES.get(mes_str.strip(" ."))
-    if not mes:
-        return None
-    return datetime(y, int(mes), d)
-
 def make_hash(v):
     return md5(v.encode("utf-8")).hexdigest()
 
@@ -93,16 +78,10 @@ def get_soup(url):
     return BeautifulSoup(r.text, "html.parser")
 
 def scrape_detalle(url):
-    soup = get_soup(url)
-    fecha_txt = soup.select_one(SEL_FECHA_DET)
-    fecha = parse_fecha_es(fecha_txt.get_text(strip=True)) if fecha_txt else None
-
-    h1 = soup.find("h1")
-    titulo = h1.get_text(strip=True) if h1 else ""
-
-    copete = " ".join(p.get_text(strip=True) for p in soup.select(SEL_COPETE))
-    contenido = " ".join(p.get_text(strip=True) for p in soup.select(SEL_CONTENIDO))
-    texto = f"{copete} {contenido}".strip()
+    r = requests.get(url, headers=HEADERS, timeout=20)
+    r.raise_for_status()
+    nota = extraccion.extraer(MEDIO, r.text)
+    fecha, titulo, texto = nota.fecha, nota.titulo, nota.contenido
 
     if not (menciona_relevante(titulo) or menciona_relevante(texto)):
         return None, fecha  # no relevante
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Búsqueda de la página de corte en listados paginados (más nuevas primero).
+
+En vez de recorrer ?page=1, 2, 3… hasta dar con una nota anterior a la fecha de
+corte, se sondea la paginación: galope (páginas 1, 2, 4, 8, …) hasta pasarse y
+después búsqueda binaria en el último tramo. Cuesta O(log P) sondas para
+encontrar P = primera página cuya nota MÁS VIEJA ya es anterior al corte; las
+páginas 1..P cubren [corte, hoy] y se pueden descargar todas en paralelo.
+
+La sonda de cada medio (fecha_pagina) devuelve la fecha de la última nota de la
+página (del listado si la muestra, si no la del detalle de esa nota), date.min si
+la página está vacía o no existe, o None si no se pudo fechar (cuenta como "no
+vieja": ante la duda se recorre de más). Se usa la última nota y no la primera
+porque los destacados fijos suelen ir arriba.
+"""
+
+from datetime import date
+from typing import Callable, Dict, Optional
+
+def primera_pagina_vieja(fecha_pagina: Callable[[int], Optional[date]], corte: date,
+                         max_pag: int, inicio: int = 1, log: Callable[[str], None] = None) -> int:
+    """
+    Menor p en [inicio, max_pag] cuya última nota es anterior a `corte` (o que está
+    vacía); max_pag si no hay ninguna. Supone el listado ordenado de más nueva a
+    más vieja (la condición es monótona en p).
+    """
+    sondas: Dict[int, bool] = {}
+
+    def vieja(p: int) -> bool:
+        if p not in sondas:
+            f = fecha_pagina(p)
+            sondas[p] = f is not None and f < corte
+            if log:
+                log(f"[SEEK] página {p}: {f or 'sin fecha'} → {'vieja' if sondas[p] else 'dentro'}")
+        return sondas[p]
+
+    # galope: inicio, inicio+1, inicio+3, inicio+7, …
+    lo, salto, p = inicio - 1, 1, inicio   # lo = última página sondeada "dentro"
+    while True:
+        p = min(p, max_pag)
+        if vieja(p):
+            hi = p
+            break
+        lo = p
+        if p == max_pag:
+            return max_pag
+        p = inicio + 2 * salto - 1
+        salto *= 2
+
+    # binaria en (lo, hi]
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if vieja(mid):
+            hi = mid
+        else:
+            lo = mid
+    if log:
+        log(f"[SEEK] corte {corte} en la página {hi} ({len(sondas)} sondas)")
+    return hi
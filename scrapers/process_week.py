@@ -4,25 +4,37 @@ Consolidación semanal:
 - Lee la última carpeta data/tmp/week_YYYY-MM-DD/ (o --week-dir)
 - Valida columnas mínimas y fechas ISO (cuando existen)
 - Mergea cada medio a data/raw/*.csv con dedupe por 'enlace'
+  (+ <csv>.manifest.json: máxima fecha y centinelas para scraper_semanal, watermark.py)
 - Construye data/noticias_unidas.csv (histórico completo)
+  con cluster_id / canonical_id de casi-duplicados entre medios (near_dup.py)
 - Genera insumos para Shiny en data/tablas/
-    * frecuencias_por_dia.csv
+    * frecuencias_por_dia.csv  ← incremental (sólo lematiza artículos nuevos; --full reconstruye)
+    * term_cooc.csv, terms.csv ← explorador por palabra (co-ocurrencias + NPMI, incremental)
     * sentimiento_diario_largo.csv
     * sentimiento_titulos_semana.csv
+    * .parquet de las tablas anteriores (lemma/medio como diccionario) + frecuencias
+      acumuladas por fecha (columnar.py; requiere pyarrow)
     * (opc) bertopic_nodes.csv, bertopic_edges.csv  [--bertopic]  ← siempre sobre el ÚLTIMO TRIMESTRE (90 días)
+      (modelo persistido en data/modelos/bertopic/; semanalmente sólo transform de docs nuevos)
 """
 
-import os, re, argparse, sys
+import os, re, argparse, sys, json, unicodedata
 from datetime import datetime
 from glob import glob
+from hashlib import md5
 
 import pandas as pd
 
-# -------- Opcionales pesados (se cargan sólo si se usan) ----------
-def _lazy_import_spacy():
-    import spacy, unicodedata
-    return spacy, unicodedata
+import http_client
+from store import AppendStore, KeySet
+from result_cache import ResultCache, normalizar_texto
+import lemmas
+import columnar
+import watermark
+from grafo import aristas_similitud
+from near_dup import NearDupIndex, NEAR_DUP_PATH
 
+# -------- Opcionales pesados (se cargan sólo si se usan) ----------
 def _lazy_import_pysentimiento():
     from pysentimiento import create_analyzer
     return create_analyzer
@@ -30,10 +42,9 @@ def _lazy_import_pysentimiento():
 def _lazy_import_bertopic():
     from bertopic import BERTopic
     from sentence_transformers import SentenceTransformer
-    from sklearn.metrics.pairwise import cosine_similarity
     import numpy as np
     from sklearn.cluster import KMeans
-    return BERTopic, SentenceTransformer, cosine_similarity, np, KMeans
+    return BERTopic, SentenceTransformer, np, KMeans
 
 # ---------------- Paths ----------------
 ROOT = os.path.dirname(os.path.abspath(__file__))
@@ -46,12 +57,16 @@ os.makedirs(TAB, exist_ok=True)
 
 HOY = datetime.now().strftime("%Y-%m-%d")
 RANDOM_STATE = 42  # estabilidad entre corridas
+SBERT_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
 
 # -------------- Utilidades --------------
 def log(m): print(f"[{datetime.now().strftime('%H:%M:%S')}] {m}", flush=True)
 
 REQ_COLS = ["medio","fecha","titulo","enlace"]  # 'contenido' puede faltar (fallback a titulo en frec.)
 OUT_UNIFICADO = os.path.join(DATA, "noticias_unidas.csv")
+VALIDATORS_PENDING = "http_validators.{medio}.pending.json"  # los deja scraper_semanal en la carpeta semanal
+SENT_CACHE = os.path.join(DATA, "cache", "sentimiento_titulos.sqlite")  # hash(título, modelo) → etiqueta
+SENT_BATCH = 64  # títulos por llamada a analyzer.predict
 
 MEDIOS = {
     "analisisdigital": ("analisisdigital_provinciales.tmp.csv", "analisisdigital_provinciales.csv"),
@@ -103,25 +118,34 @@ def load_week(week_dir):
     return per_medio
 
 # -------------- 2) Merge → RAW (histórico) --------------
-def merge_into_raw(per_medio):
+def merge_into_raw(per_medio, replace=False):
+    """
+    Append-only por 'enlace' (ver store.py): sólo se escriben las filas nuevas.
+    replace=True: las filas de la carpeta pisan a las del histórico (re-extracción con --replay).
+    Actualiza además el manifiesto del medio (watermark.py) que lee scraper_semanal al arrancar.
+    """
     added_stats = {}
     for medio, (_, raw_name) in MEDIOS.items():
         tmp_df = per_medio.get(medio, pd.DataFrame())
         raw_path = os.path.join(RAW, raw_name)
+        store = AppendStore(raw_path, key="enlace", encoding="utf-8-sig")
+        previo = watermark.leer(raw_path)
+        before, after = store.save_incremental(tmp_df, reemplazar=replace)
+        added = max(0, after - before)
+        added_stats[medio] = {"agregadas": added, "total": after}
+        log(f"[RAW] {medio}: +{added} (total={after}) → {raw_path}")
         if os.path.exists(raw_path):
-            base = read_csv_safe(raw_path)
-        else:
-            base = pd.DataFrame(columns=tmp_df.columns if not tmp_df.empty else ["medio","fecha","fecha_texto","fuente_fecha","titulo","contenido","enlace","seccion","fecha_de_extraccion"])
-        uni = pd.concat([base, tmp_df], ignore_index=True)
-        uni = dedupe_by_enlace(uni)
-        write_csv_safe(uni, raw_path)
-        added = max(0, len(uni) - len(base))
-        added_stats[medio] = {"agregadas": added, "total": len(uni)}
-        log(f"[RAW] {medio}: +{added} (total={len(uni)}) → {raw_path}")
+            man = watermark.actualizar(raw_path, previo, agregado=not store.reescrito)
+            log(f"[RAW] {medio}: marca {man['max_fecha'] or '-'} ({len(man['sentinels'])} centinelas)")
     return added_stats
 
 # -------------- 3) Unificado global --------------
-def build_unificado():
+def build_unificado(full=False):
+    """
+    Concatena los históricos y marca casi-duplicados (misma gacetilla en varios
+    medios): cluster_id y canonical_id (clave del representante). El índice
+    MinHash es incremental; full=True lo reconstruye.
+    """
     dfs = []
     for _, (_, raw_name) in MEDIOS.items():
         path = os.path.join(RAW, raw_name)
@@ -135,65 +159,291 @@ def build_unificado():
     if "titulo" not in cols: uni["titulo"] = ""
     if "contenido" not in cols and "titulo" in cols:
         uni["contenido"] = uni["titulo"]
+    marcar_duplicados(uni, full=full)
     write_csv_safe(uni, OUT_UNIFICADO)
     d = pd.to_datetime(uni.get("fecha"), errors="coerce")
     fmin, fmax = (str(d.min().date()) if d.notna().any() else "-"), (str(d.max().date()) if d.notna().any() else "-")
     log(f"[UNI] {OUT_UNIFICADO} | filas={len(uni)} | rango={fmin} → {fmax}")
     return OUT_UNIFICADO
 
+def marcar_duplicados(uni, full=False):
+    """Agrega cluster_id y canonical_id a `uni` (in place) con el índice de near_dup."""
+    if full and os.path.exists(NEAR_DUP_PATH):
+        os.remove(NEAR_DUP_PATH)
+    claves = _clave_articulo(uni)
+    textos = uni["contenido"].where(uni["contenido"].notna(), uni["titulo"]).fillna("").astype(str)
+    idx = NearDupIndex(NEAR_DUP_PATH)
+    try:
+        asign = idx.asignar(claves.tolist(), textos.tolist())
+        nuevos = idx.nuevos
+    finally:
+        idx.close()
+    uni["cluster_id"] = [asign[k][0] for k in claves]
+    uni["canonical_id"] = [asign[k][1] for k in claves]
+    dups = int((claves != uni["canonical_id"]).sum())
+    log(f"[DUP] indexados nuevos={nuevos} | clusters={uni['cluster_id'].nunique()} | casi-duplicados={dups}")
+
+def _representantes(df):
+    """
+    Una fila por cluster de casi-duplicados (la canónica si está en df), para que
+    una gacetilla replicada en varios medios no cuente N veces. Requiere '_clave'.
+    """
+    if "cluster_id" not in df.columns:
+        return df
+    canon = (df["_clave"] == df["canonical_id"].astype(str)).astype(int)
+    orden = canon.sort_values(ascending=False, kind="stable").index
+    return df.loc[orden].drop_duplicates(subset=["cluster_id"]).sort_index()
+
 # -------------- 4) Frecuencia de palabras --------------
-def gen_frecuencias_por_dia(path_unificado, out_path):
-    spacy, unicodedata = _lazy_import_spacy()
-    nlp = spacy.load("es_core_news_sm", disable=["ner"])
+FREQ_ESTADO = os.path.join(DATA, "cache", "frecuencias_contadas.sqlite")  # artículos ya sumados
+
+def _clave_articulo(df):
+    """'enlace' (o medio|fecha|titulo si falta): identifica al artículo entre corridas."""
+    col = lambda c: df[c].astype(str) if c in df.columns else pd.Series("", index=df.index)
+    alt = col("medio") + "|" + col("fecha") + "|" + col("titulo")
+    if "enlace" not in df.columns:
+        return alt
+    return df["enlace"].astype(str).where(df["enlace"].notna(), alt)
+
+STOP_EXTRA = {
+    "año","años","día","días","mes","meses","entre","ser","estar","haber",
+    "a","ante","bajo","con","contra","de","desde","en","hacia","hasta",
+    "para","por","segun","sin","sobre","tras","un","una","unos","unas",
+    "el","la","los","las","lo","y","o","u","e","que","como","mas","menos",
+    "no","si","tambien","pero","porque","provincia","rio","río"
+}
+
+def _norm_lemma(s: str) -> str:
+    s = (s or "").lower().strip()
+    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+    return s
+
+def _stopwords_lemas(nlp):
+    return {_norm_lemma(w) for w in (nlp.Defaults.stop_words | STOP_EXTRA)}
+
+def _lemas_utiles(doc, stop):
+    """Lemas normalizados de un documento (lemmas.Lemas), sin stopwords ni cortos."""
+    out = []
+    for lem in doc.lemmas:
+        lem = _norm_lemma(lem)
+        if len(lem) <= 2 or lem in stop: continue
+        out.append(lem)
+    return out
+
+def _firma_lemas(stop):
+    return md5("|".join([lemmas.version_modelo(), ",".join(sorted(stop))]).encode("utf-8")).hexdigest()
+
+def gen_frecuencias_por_dia(path_unificado, out_path, full=False):
+    """
+    Incremental: sólo se lematizan los artículos que no están en FREQ_ESTADO y sus
+    conteos (fecha, lemma) se suman a la tabla existente. Si cambia el modelo de spaCy
+    o las stopwords (firma), falta la tabla o full=True, se reconstruye desde cero.
+    """
+    nlp = lemmas.load_nlp()
     df = read_csv_safe(path_unificado)
     df.columns = [c.lower().strip() for c in df.columns]
     if "contenido" not in df.columns and "titulo" in df.columns:
         df["contenido"] = df["titulo"]
     df["fecha"] = pd.to_datetime(df.get("fecha"), errors="coerce").dt.floor("D")
     df = df.dropna(subset=["fecha"]).copy()
+    df["_clave"] = _clave_articulo(df)
+    df = _representantes(df.drop_duplicates(subset=["_clave"]))
 
-    def _norm(s: str) -> str:
-        s = (s or "").lower().strip()
-        s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
-        return s
-
-    stop_extra = {
-        "año","años","día","días","mes","meses","entre","ser","estar","haber",
-        "a","ante","bajo","con","contra","de","desde","en","hacia","hasta",
-        "para","por","segun","sin","sobre","tras","un","una","unos","unas",
-        "el","la","los","las","lo","y","o","u","e","que","como","mas","menos",
-        "no","si","tambien","pero","porque","provincia","rio","río"
-    }
-    stop = {_norm(w) for w in (nlp.Defaults.stop_words | stop_extra)}
-
-    from collections import Counter
-    registros = []
-    texts = df["contenido"].astype(str).tolist()
-    fechas = df["fecha"].tolist()
-    for fecha, doc in zip(fechas, nlp.pipe(texts, batch_size=50)):
-        lemmas = []
-        for t in doc:
-            if not t.is_alpha: continue
-            lem = _norm(t.lemma_)
-            if len(lem) <= 2 or lem in stop: continue
-            lemmas.append(lem)
-        if lemmas:
-            c = Counter(lemmas)
-            for lem, freq in c.items():
-                registros.append((fecha, lem, freq))
-
-    if registros:
-        out = pd.DataFrame(registros, columns=["fecha","lemma","frecuencia"])
-        out = (out.groupby(["fecha","lemma"], as_index=False)["frecuencia"].sum()
-                   .sort_values(["fecha","frecuencia"], ascending=[True, False]))
-        out["fecha"] = pd.to_datetime(out["fecha"]).dt.strftime("%Y-%m-%d")
-    else:
-        out = pd.DataFrame(columns=["fecha","lemma","frecuencia"])
+    stop = _stopwords_lemas(nlp)
+    firma = _firma_lemas(stop)
+    estado = KeySet(FREQ_ESTADO)
+    try:
+        previo = None
+        if not full and estado.firma() == firma and os.path.exists(out_path):
+            previo = read_csv_safe(out_path)
+            vistas = estado.vistas(df["_clave"].tolist())
+            df = df[~df["_clave"].isin(vistas)]
+            log(f"[FREQ] incremental: {len(vistas)} artículos ya contados, {len(df)} nuevos")
+        else:
+            estado.reset(firma)
+            log(f"[FREQ] reconstrucción completa: {len(df)} artículos")
+
+        from collections import Counter
+        registros = []
+        fechas = df["fecha"].tolist()
+        docs = lemmas.lematizar(df["contenido"].astype(str).tolist())
+        for fecha, doc in zip(fechas, docs):
+            lems = _lemas_utiles(doc, stop)
+            if lems:
+                c = Counter(lems)
+                for lem, freq in c.items():
+                    registros.append((fecha.strftime("%Y-%m-%d"), lem, freq))
+
+        partes = [pd.DataFrame(registros, columns=["fecha","lemma","frecuencia"])]
+        if previo is not None:
+            partes.append(previo[["fecha","lemma","frecuencia"]].astype({"fecha": str}))
+        out = pd.concat(partes, ignore_index=True)
+        if not out.empty:
+            out = (out.groupby(["fecha","lemma"], as_index=False)["frecuencia"].sum()
+                      .sort_values(["fecha","frecuencia"], ascending=[True, False]))
+
+        write_csv_safe(out, out_path)
+        columnar.escribir_frecuencias(out, os.path.dirname(out_path))
+        estado.agregar(df["_clave"].tolist())
+        estado.commit()
+    finally:
+        estado.close()
+    log(f"[TAB] frecuencias_por_dia.csv → filas={len(out)}"
+        + ("" if columnar.ARROW_OK else " (sin pyarrow: no se generan los .parquet)"))
+
+# -------------- 4b) Co-ocurrencias (explorador por palabra clave) --------------
+COOC_DIR    = os.path.join(DATA, "cache", "cooc")   # matriz doc-término binaria acumulada
+COOC_MIN_DF = 3     # términos en al menos N documentos
+COOC_MAX_V  = 8000  # vocabulario máximo (por df) para X^T·X
+COOC_MIN_CO = 2     # pares que co-ocurren en al menos N documentos
+COOC_TOP_K  = 30    # vecinos por término (por NPMI)
+
+def _cooc_cargar(firma):
+    """(X csr binaria docs×vocab, vocab, claves) acumulados, o vacíos si cambió la firma."""
+    from scipy import sparse
+    est_path = os.path.join(COOC_DIR, "estado.json")
+    mat_path = os.path.join(COOC_DIR, "dtm.npz")
+    if os.path.exists(est_path) and os.path.exists(mat_path):
+        with open(est_path, encoding="utf-8") as f:
+            est = json.load(f)
+        X = sparse.load_npz(mat_path).tocsr()
+        if est.get("firma") == firma and X.shape[0] == len(est["claves"]):
+            return X, est["vocab"], est["claves"]
+    return sparse.csr_matrix((0, 0), dtype="int8"), [], []
+
+def _cooc_guardar(X, vocab, claves, firma):
+    from scipy import sparse
+    os.makedirs(COOC_DIR, exist_ok=True)
+    mat_path = os.path.join(COOC_DIR, "dtm.npz")
+    est_path = os.path.join(COOC_DIR, "estado.json")
+    sparse.save_npz(mat_path + ".tmp.npz", X)
+    os.replace(mat_path + ".tmp.npz", mat_path)
+    with open(est_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"firma": firma, "vocab": vocab, "claves": claves}, f, ensure_ascii=False)
+    os.replace(est_path + ".tmp", est_path)
+
+def gen_coocurrencias(path_unificado, out_cooc, out_terms, full=False):
+    """
+    term_cooc.csv (t1, t2, co, npmi) y terms.csv (term, df) para el explorador por
+    palabra de la app. Documento = artículo; término = lema normalizado (mismos
+    lemas y stopwords que frecuencias_por_dia).
+
+    La matriz documento-término binaria se acumula en COOC_DIR: cada semana sólo
+    se agregan filas para los artículos nuevos (y columnas para términos nuevos).
+    Co-ocurrencias = X^T·X sobre el vocabulario con df >= COOC_MIN_DF; se quedan
+    los COOC_TOP_K vecinos por NPMI de cada término.
+    """
+    import numpy as np
+    from scipy import sparse
+
+    nlp = lemmas.load_nlp()
+    stop = _stopwords_lemas(nlp)
+    firma = _firma_lemas(stop)
+
+    df = read_csv_safe(path_unificado)
+    df.columns = [c.lower().strip() for c in df.columns]
+    if "contenido" not in df.columns and "titulo" in df.columns:
+        df["contenido"] = df["titulo"]
+    df = df.dropna(subset=["contenido"]).copy()
+    df["_clave"] = _clave_articulo(df)
+    df = _representantes(df.drop_duplicates(subset=["_clave"]))
 
-    write_csv_safe(out, out_path)
-    log(f"[TAB] frecuencias_por_dia.csv → filas={len(out)}")
+    if full:
+        X, vocab, claves = sparse.csr_matrix((0, 0), dtype="int8"), [], []
+    else:
+        X, vocab, claves = _cooc_cargar(firma)
+    nuevos = df[~df["_clave"].isin(set(claves))]
+    log(f"[COOC] docs acumulados={len(claves)} | nuevos={len(nuevos)}")
+
+    if len(nuevos):
+        col = {t: i for i, t in enumerate(vocab)}
+        filas, cols = [], []
+        for r, doc in enumerate(lemmas.lematizar(nuevos["contenido"].astype(str).tolist())):
+            for t in set(_lemas_utiles(doc, stop)):
+                if t not in col:
+                    col[t] = len(vocab); vocab.append(t)
+                filas.append(r); cols.append(col[t])
+        delta = sparse.csr_matrix((np.ones(len(filas), dtype="int8"), (filas, cols)),
+                                  shape=(len(nuevos), len(vocab)))
+        X.resize((X.shape[0], len(vocab)))
+        X = sparse.vstack([X, delta], format="csr")
+        claves = claves + nuevos["_clave"].tolist()
+        _cooc_guardar(X, vocab, claves, firma)
+
+    n_docs = X.shape[0]
+    dfreq = np.asarray(X.sum(axis=0)).ravel() if n_docs else np.zeros(len(vocab))
+    keep = np.flatnonzero(dfreq >= COOC_MIN_DF)
+    keep = keep[np.argsort(-dfreq[keep], kind="stable")][:COOC_MAX_V]
+    terms = pd.DataFrame({"term": [vocab[i] for i in keep], "df": dfreq[keep].astype(int)})
+
+    if len(keep) < 2:
+        cooc = pd.DataFrame(columns=["t1","t2","co","npmi"])
+    else:
+        Xv = X[:, keep].astype(np.int32)
+        C = sparse.triu(Xv.T @ Xv, k=1).tocoo()     # pares i < j, co = docs en común
+        ok = C.data >= COOC_MIN_CO
+        i, j, co = C.row[ok], C.col[ok], C.data[ok].astype(float)
+        p_i, p_j, p_ij = dfreq[keep][i] / n_docs, dfreq[keep][j] / n_docs, co / n_docs
+        with np.errstate(divide="ignore", invalid="ignore"):
+            npmi = np.log(p_ij / (p_i * p_j)) / -np.log(p_ij)
+        npmi[p_ij >= 1] = 1.0
+        pares = pd.DataFrame({"i": i, "j": j, "co": co.astype(int), "npmi": npmi})
+
+        # top-k por término: el par queda si está entre los k mejores de cualquiera de los dos
+        ambos = pd.concat([pares.assign(t=pares["i"]), pares.assign(t=pares["j"])], ignore_index=True)
+        ambos = ambos.sort_values(["t","npmi","co"], ascending=[True, False, False])
+        top = ambos.groupby("t", sort=False).head(COOC_TOP_K).drop_duplicates(subset=["i","j"])
+        cooc = pd.DataFrame({
+            "t1": [vocab[keep[x]] for x in top["i"]],
+            "t2": [vocab[keep[x]] for x in top["j"]],
+            "co": top["co"].values,
+            "npmi": top["npmi"].round(4).values,
+        }).sort_values(["npmi","co"], ascending=False)
+
+    write_csv_safe(cooc, out_cooc)
+    write_csv_safe(terms, out_terms)
+    log(f"[TAB] term_cooc.csv → pares={len(cooc)} | terms.csv → términos={len(terms)}")
 
 # -------------- 5) Sentimiento --------------
+def _version_modelo(analyzer):
+    import pysentimiento
+    nombre = getattr(getattr(analyzer, "model", None), "name_or_path", "") or type(analyzer).__name__
+    return f"{nombre}|pysentimiento-{getattr(pysentimiento, '__version__', '?')}"
+
+def puntuar_sentimientos(titulos, analyzer, cache_path=SENT_CACHE, batch=SENT_BATCH):
+    """
+    'POS'|'NEG'|'NEU' (o 'error') por título. Sólo pasan por el modelo los títulos
+    que no están en la caché, en lotes ordenados por largo (menos padding).
+    """
+    cache = ResultCache(cache_path, _version_modelo(analyzer))
+    try:
+        claves = [cache.key(t) for t in titulos]
+        hechos = cache.get_many(claves)
+        pend = {}
+        for k, t in zip(claves, titulos):
+            if k not in hechos:
+                pend.setdefault(k, normalizar_texto(t))
+        orden = sorted(pend, key=lambda k: len(pend[k]))
+        log(f"[SENT] títulos={len(titulos)} | únicos en caché={len(hechos)} | a puntuar={len(orden)}")
+
+        for i in range(0, len(orden), batch):
+            lote = orden[i:i+batch]
+            textos = [pend[k] for k in lote]
+            try:
+                salidas = [r.output for r in analyzer.predict(textos)]
+            except Exception:
+                salidas = []
+                for t in textos:  # el lote falló: de a uno, para no perder los demás
+                    try:
+                        salidas.append(analyzer.predict(t).output)
+                    except Exception:
+                        salidas.append("error")
+            cache.put_many({k: v for k, v in zip(lote, salidas) if v != "error"})
+            hechos.update(zip(lote, salidas))
+    finally:
+        cache.close()
+    return [hechos.get(k, "error") for k in claves]
+
 def gen_sentimientos(path_unificado, out_dia, out_tit):
     create_analyzer = _lazy_import_pysentimiento()
     df = read_csv_safe(path_unificado)
@@ -204,14 +454,7 @@ def gen_sentimientos(path_unificado, out_dia, out_tit):
     df = df.dropna(subset=["fecha","titulo"]).reset_index(drop=True)
 
     analyzer = create_analyzer(task="sentiment", lang="es")
-    def get_sentiment(texto):
-        try:
-            r = analyzer.predict(str(texto))
-            return r.output  # 'POS'|'NEG'|'NEU'
-        except Exception:
-            return "error"
-
-    df["sentimiento"] = df["titulo"].astype(str).apply(get_sentiment)
+    df["sentimiento"] = puntuar_sentimientos(df["titulo"].astype(str).tolist(), analyzer)
     df = df[df["sentimiento"].isin(["NEG","NEU","POS"])].copy()
 
     diario = (df.groupby([df["fecha"].dt.date, "sentimiento"], as_index=False)
@@ -219,6 +462,8 @@ def gen_sentimientos(path_unificado, out_dia, out_tit):
     diario["fecha"] = pd.to_datetime(diario["fecha"]).dt.strftime("%Y-%m-%d")
     diario = diario.sort_values(["fecha","sentimiento"])
     write_csv_safe(diario, out_dia)
+    columnar.escribir_parquet(diario.assign(fecha=pd.to_datetime(diario["fecha"]).dt.date),
+                              os.path.splitext(out_dia)[0] + ".parquet", ["sentimiento"])
     log(f"[TAB] sentimiento_diario_largo.csv → filas={len(diario)}")
 
     df["semana_inicio"] = df["fecha"].dt.to_period("W-MON").apply(lambda p: p.start_time.normalize())
@@ -243,72 +488,32 @@ def gen_sentimientos(path_unificado, out_dia, out_tit):
     tit = tit.sort_values(["fecha"], ascending=False)
 
     write_csv_safe(tit, out_tit)
+    fechas = {c: pd.to_datetime(tit[c]).dt.date for c in ["fecha","semana_inicio","semana_fin"]}
+    columnar.escribir_parquet(tit.assign(**fechas), os.path.splitext(out_tit)[0] + ".parquet",
+                              ["sentimiento","medio"])
     log(f"[TAB] sentimiento_titulos_semana.csv → filas={len(tit)}")
 
 # -------------- 6) BERTopic (trimestral) --------------
-def gen_bertopic(path_unificado, out_nodes, out_edges):
-    """
-    Entrena BERTopic sólo con el ÚLTIMO TRIMESTRE (90 días) de noticias_unidas.csv.
-    Si no hay fechas parseables, sigue sin filtrar. Exporta nodes/edges.
-    """
-    BERTopic, SentenceTransformer, cosine_similarity, np, KMeans = _lazy_import_bertopic()
-
-    df = read_csv_safe(path_unificado)
-    df.columns = [c.lower().strip() for c in df.columns]
-    if "contenido" not in df.columns:
-        if "titulo" in df.columns:
-            df["contenido"] = df["titulo"]
-        else:
-            raise ValueError("No hay columnas 'contenido' ni 'titulo' en noticias_unidas.csv")
-    df = df.dropna(subset=["contenido"]).reset_index(drop=True)
-
-    # --- Ventana: último trimestre (90 días) ---
-    tri_label = "SIN_FECHA"
-    if "fecha" in df.columns:
-        fecha_dt = pd.to_datetime(df["fecha"], errors="coerce")
-        if fecha_dt.notna().any():
-            tri_end = fecha_dt.max().normalize()
-            tri_start = tri_end - pd.Timedelta(days=89)
-            mask = (fecha_dt >= tri_start) & (fecha_dt <= tri_end)
-            df = df.loc[mask].copy()
-            tri_label = f"{tri_start.date()} – {tri_end.date()}"
-    log(f"[BERTopic] Ventana aplicada: {tri_label} | filas={len(df)}")
-
-    # Preprocesado simple
-    import spacy, re
-    nlp = spacy.load("es_core_news_sm", disable=["ner"])
-    mis_stop = {"provincia","rio","río","entre","ríos","rios"}
-    stop = nlp.Defaults.stop_words | mis_stop
-
-    def limpiar_texto(txt):
-        txt = str(txt).lower()
-        txt = re.sub(r"http\S+|www\.\S+", " ", txt)
-        txt = re.sub(r"\s+", " ", txt).strip()
-        return txt
-
-    def to_lemmas(txt):
-        doc = nlp(txt)
-        lemas = []
-        for t in doc:
-            if not t.is_alpha: continue
-            lem = t.lemma_.strip()
-            if len(lem) <= 2 or lem in stop: continue
-            lemas.append(lem)
-        return " ".join(lemas)
-
-    df["contenido_proc"] = df["contenido"].astype(str).apply(limpiar_texto).apply(to_lemmas)
-    docs = df["contenido_proc"].tolist()
-
-    if not docs:
-        # Exportar vacíos pero con columnas correctas
-        pd.DataFrame(columns=["id","label","size","keywords","community","community_rank"]).to_csv(out_nodes, index=False, encoding="utf-8-sig")
-        pd.DataFrame(columns=["from","to","weight"]).to_csv(out_edges, index=False, encoding="utf-8-sig")
-        log("[BERTopic] Sin documentos en ventana. Archivos vacíos exportados.")
-        return
-
-    sbert = SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
-    emb = sbert.encode(docs, show_progress_bar=True, normalize_embeddings=True)
-
+BERTOPIC_DIR          = os.path.join(DATA, "modelos", "bertopic")  # v_YYYY-MM-DD/ + actual.json
+BERTOPIC_REFIT_DIAS   = 28     # reentrenar si el modelo vigente tiene más de N días
+BERTOPIC_MAX_OUTLIERS = 0.35   # ... o si la proporción de docs nuevos en el tópico -1 supera esto
+BERTOPIC_MIN_NUEVOS   = 30     # docs nuevos mínimos para evaluar el drift
+NODE_COLS = ["id","label","size","keywords","community","community_rank"]
+
+def _bertopic_vigente():
+    """(ruta de la versión vigente, estado) o (None, None)."""
+    path = os.path.join(BERTOPIC_DIR, "actual.json")
+    if not os.path.exists(path):
+        return None, None
+    with open(path, encoding="utf-8") as f:
+        estado = json.load(f)
+    vdir = os.path.join(BERTOPIC_DIR, estado["version"])
+    if not os.path.exists(os.path.join(vdir, "modelo")):
+        return None, None
+    return vdir, estado
+
+def _bertopic_fit(df, docs, emb, BERTopic, np, KMeans):
+    """Entrena sobre la ventana y guarda una versión nueva: modelo, nodos base, aristas y asignaciones."""
     model = BERTopic(language="multilingual",
                      calculate_probabilities=True,
                      verbose=True,
@@ -331,7 +536,6 @@ def gen_bertopic(path_unificado, out_nodes, out_edges):
     if emb_topics is None or (isinstance(emb_topics, list) and len(emb_topics) == 0):
         edges = pd.DataFrame(columns=["from","to","weight"])
         nodes["community"] = -1
-        nodes["community_rank"] = -1
     else:
         freq = model.get_topic_freq().sort_values("Topic")
         freq = freq[freq["Topic"] != -1]
@@ -339,29 +543,157 @@ def gen_bertopic(path_unificado, out_nodes, out_edges):
         topic_ids = nodes["id"].tolist()
         emb_mat = np.vstack([emb_topics[emb_ids.index(t)] for t in topic_ids])
 
-        sim = cosine_similarity(emb_mat)
-        rows = []
-        for i in range(len(topic_ids)):
-            for j in range(i+1, len(topic_ids)):
-                rows.append((topic_ids[i], topic_ids[j], float(sim[i, j])))
-        edges = pd.DataFrame(rows, columns=["from","to","weight"])
+        edges = aristas_similitud(emb_mat, ids=topic_ids)   # todos los pares i < j
 
         kmeans = KMeans(n_clusters=4, random_state=RANDOM_STATE, n_init="auto")
-        comm = kmeans.fit_predict(emb_mat)
-        nodes["community"] = comm
+        nodes["community"] = kmeans.fit_predict(emb_mat)
+
+    version = f"v_{HOY}"
+    vdir = os.path.join(BERTOPIC_DIR, version)
+    os.makedirs(vdir, exist_ok=True)
+    model.save(os.path.join(vdir, "modelo"), serialization="pickle")
+    nodes[["id","label","keywords","community"]].to_csv(os.path.join(vdir, "nodos.csv"), index=False, encoding="utf-8")
+    edges.to_csv(os.path.join(vdir, "aristas.csv"), index=False, encoding="utf-8")
+    asign = pd.DataFrame({"clave": df["_clave"].values, "fecha": df["fecha"].values, "topic": topics})
+    asign.to_csv(os.path.join(vdir, "asignaciones.csv"), index=False, encoding="utf-8")
+
+    estado = {"version": version, "fit_fecha": HOY, "docs": len(docs),
+              "outliers": float((asign["topic"] == -1).mean()) if len(asign) else 0.0}
+    with open(os.path.join(BERTOPIC_DIR, "actual.json"), "w", encoding="utf-8") as f:
+        json.dump(estado, f, ensure_ascii=False, indent=1)
+    log(f"[BERTopic] Modelo {version} entrenado ({len(nodes)} tópicos, outliers={estado['outliers']:.1%})")
+    return vdir
+
+def _bertopic_export(vdir, df, out_nodes, out_edges):
+    """Tamaños = asignaciones de la versión vigente dentro de la ventana actual."""
+    nodes = pd.read_csv(os.path.join(vdir, "nodos.csv"), encoding="utf-8")
+    edges = pd.read_csv(os.path.join(vdir, "aristas.csv"), encoding="utf-8")
+    asign = pd.read_csv(os.path.join(vdir, "asignaciones.csv"), encoding="utf-8", dtype={"clave": str})
+    asign = asign[asign["clave"].isin(set(df["_clave"]))]
+    size = asign[asign["topic"] != -1].groupby("topic").size()
+    nodes["size"] = nodes["id"].map(size).fillna(0).astype(int)
+    nodes = nodes.sort_values("size", ascending=False)
+    if (nodes["community"] == -1).all():
+        nodes["community_rank"] = -1
+    else:
         peso = nodes.groupby("community")["size"].sum().sort_values(ascending=False)
         rank_map = {c: r+1 for r, c in enumerate(peso.index)}
         nodes["community_rank"] = nodes["community"].map(rank_map)
 
-    nodes[["id","label","size","keywords","community","community_rank"]].to_csv(out_nodes, index=False, encoding="utf-8-sig")
+    nodes[NODE_COLS].to_csv(out_nodes, index=False, encoding="utf-8-sig")
     edges.to_csv(out_edges, index=False, encoding="utf-8-sig")
     log(f"[TAB] bertopic_nodes.csv ({len(nodes)}) / bertopic_edges.csv ({len(edges)})")
 
+def gen_bertopic(path_unificado, out_nodes, out_edges, refit=False):
+    """
+    BERTopic sobre el ÚLTIMO TRIMESTRE (90 días) de noticias_unidas.csv.
+    Si no hay fechas parseables, sigue sin filtrar. Exporta nodes/edges.
+
+    El modelo entrenado se guarda versionado en BERTOPIC_DIR. Las corridas
+    siguientes sólo asignan (transform) los documentos nuevos y recalculan los
+    tamaños; se reentrena con refit=True, si no hay modelo, si tiene más de
+    BERTOPIC_REFIT_DIAS días o si los nuevos caen en el tópico -1 por encima de
+    BERTOPIC_MAX_OUTLIERS (drift).
+    """
+    BERTopic, SentenceTransformer, np, KMeans = _lazy_import_bertopic()
+
+    df = read_csv_safe(path_unificado)
+    df.columns = [c.lower().strip() for c in df.columns]
+    if "contenido" not in df.columns:
+        if "titulo" in df.columns:
+            df["contenido"] = df["titulo"]
+        else:
+            raise ValueError("No hay columnas 'contenido' ni 'titulo' en noticias_unidas.csv")
+    df = df.dropna(subset=["contenido"]).reset_index(drop=True)
+
+    # --- Ventana: último trimestre (90 días) ---
+    tri_label = "SIN_FECHA"
+    if "fecha" in df.columns:
+        fecha_dt = pd.to_datetime(df["fecha"], errors="coerce")
+        if fecha_dt.notna().any():
+            tri_end = fecha_dt.max().normalize()
+            tri_start = tri_end - pd.Timedelta(days=89)
+            mask = (fecha_dt >= tri_start) & (fecha_dt <= tri_end)
+            df = df.loc[mask].copy()
+            tri_label = f"{tri_start.date()} – {tri_end.date()}"
+    else:
+        df["fecha"] = pd.NA
+    df["_clave"] = _clave_articulo(df)
+    df = _representantes(df.drop_duplicates(subset=["_clave"])).reset_index(drop=True)
+    log(f"[BERTopic] Ventana aplicada: {tri_label} | filas={len(df)}")
+
+    if df.empty:
+        # Exportar vacíos pero con columnas correctas
+        pd.DataFrame(columns=NODE_COLS).to_csv(out_nodes, index=False, encoding="utf-8-sig")
+        pd.DataFrame(columns=["from","to","weight"]).to_csv(out_edges, index=False, encoding="utf-8-sig")
+        log("[BERTopic] Sin documentos en ventana. Archivos vacíos exportados.")
+        return
+
+    # Preprocesado simple: lemas de la etapa compartida (los mismos que usa frecuencias)
+    nlp = lemmas.load_nlp()
+    mis_stop = {"provincia","rio","río","entre","ríos","rios"}
+    stop = nlp.Defaults.stop_words | mis_stop
+
+    def to_lemmas(doc):
+        lemas = []
+        for lem in doc.lemmas:
+            lem = lem.lower().strip()
+            if len(lem) <= 2 or lem in stop: continue
+            lemas.append(lem)
+        return " ".join(lemas)
+
+    def preparar(sub):
+        docs = [to_lemmas(d) for d in lemmas.lematizar(sub["contenido"].astype(str).tolist())]
+        from embeddings import EmbeddingStore
+        store = EmbeddingStore(SBERT_MODEL, normalize=True)   # sólo codifica docs nunca vistos
+        try:
+            return docs, store.encode(docs, show_progress_bar=True)
+        finally:
+            store.close()
+
+    vdir, estado = _bertopic_vigente()
+    motivo = ("--bertopic-refit" if refit else
+              "sin modelo previo" if vdir is None else
+              f"modelo de más de {BERTOPIC_REFIT_DIAS} días"
+              if (pd.Timestamp(HOY) - pd.Timestamp(estado["fit_fecha"])).days > BERTOPIC_REFIT_DIAS else None)
+
+    if motivo is None:
+        asign_path = os.path.join(vdir, "asignaciones.csv")
+        asign = pd.read_csv(asign_path, encoding="utf-8", dtype={"clave": str})
+        nuevos = df[~df["_clave"].isin(set(asign["clave"]))]
+        if not nuevos.empty:
+            docs, emb = preparar(nuevos)
+            model = BERTopic.load(os.path.join(vdir, "modelo"))
+            topics, _ = model.transform(docs, emb)
+            out = float((pd.Series(topics) == -1).mean())
+            log(f"[BERTopic] {len(nuevos)} docs nuevos asignados con {estado['version']} (outliers={out:.1%})")
+            if len(nuevos) >= BERTOPIC_MIN_NUEVOS and out > BERTOPIC_MAX_OUTLIERS:
+                motivo = f"drift: {out:.1%} de docs nuevos en el tópico -1"
+            else:
+                nuevas = pd.DataFrame({"clave": nuevos["_clave"].values, "fecha": nuevos["fecha"].values,
+                                       "topic": topics})
+                nuevas.to_csv(asign_path, mode="a", header=False, index=False, encoding="utf-8")
+        else:
+            log(f"[BERTopic] Sin docs nuevos; se reusan las asignaciones de {estado['version']}")
+
+    if motivo is not None:
+        log(f"[BERTopic] Reentrenando ({motivo})")
+        docs, emb = preparar(df)
+        vdir = _bertopic_fit(df, docs, emb, BERTopic, np, KMeans)
+
+    _bertopic_export(vdir, df, out_nodes, out_edges)
+
 # -------------- Main --------------
 def main():
     ap = argparse.ArgumentParser(description="Consolidar semana → histórico + tablas Shiny")
     ap.add_argument("--week-dir", default="", help="Ruta a data/tmp/week_YYYY-MM-DD/ (si se omite, usa la última)")
     ap.add_argument("--bertopic", action="store_true", help="Recalcular BERTopic (último trimestre).")
+    ap.add_argument("--bertopic-refit", action="store_true",
+                    help="Forzar el reentrenamiento de BERTopic (si no, sólo se asignan los docs nuevos).")
+    ap.add_argument("--replace", action="store_true",
+                    help="Las filas de la carpeta reemplazan a las del histórico (para carpetas replay_*).")
+    ap.add_argument("--full", action="store_true",
+                    help="Recalcular las tablas incrementales desde cero (casi-duplicados, frecuencias, co-ocurrencias).")
     args = ap.parse_args()
 
     week_dir = args.week_dir or latest_week_dir()
@@ -374,13 +706,22 @@ def main():
     per_medio = load_week(week_dir)
 
     # 2) Merge a RAW
-    stats = merge_into_raw(per_medio)
+    stats = merge_into_raw(per_medio, replace=args.replace)
+    # Recién con la semana en RAW, el scraper puede saltear esas notas con 304
+    for medio, (_, raw_name) in MEDIOS.items():
+        http_client.validadores(raw_name).commit_pending(
+            os.path.join(week_dir, VALIDATORS_PENDING.format(medio=medio)))
 
     # 3) Unificado global
-    path_unificado = build_unificado()
+    path_unificado = build_unificado(full=args.replace or args.full)
 
     # 4) Tablas Shiny
-    gen_frecuencias_por_dia(path_unificado, os.path.join(TAB, "frecuencias_por_dia.csv"))
+    gen_frecuencias_por_dia(path_unificado, os.path.join(TAB, "frecuencias_por_dia.csv"),
+                            full=args.replace or args.full)
+    gen_coocurrencias(path_unificado,
+                      os.path.join(TAB, "term_cooc.csv"),
+                      os.path.join(TAB, "terms.csv"),
+                      full=args.replace or args.full)
     gen_sentimientos(path_unificado,
                      os.path.join(TAB, "sentimiento_diario_largo.csv"),
                      os.path.join(TAB, "sentimiento_titulos_semana.csv"))
@@ -388,7 +729,8 @@ def main():
     if args.bertopic:
         gen_bertopic(path_unificado,
                      os.path.join(TAB, "bertopic_nodes.csv"),
-                     os.path.join(TAB, "bertopic_edges.csv"))
+                     os.path.join(TAB, "bertopic_edges.csv"),
+                     refit=args.bertopic_refit)
 
     # Resumen
     log("--- Resumen ---")
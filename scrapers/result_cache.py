@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Caché persistente de resultados de modelos (clave → valor texto) en SQLite.
+
+La clave es un hash del texto normalizado junto con la versión del modelo, así
+un cambio de modelo no reutiliza resultados viejos: simplemente no hay hit.
+Lo usa process_week para no volver a puntuar títulos ya vistos.
+"""
+
+import os, sqlite3, unicodedata
+from hashlib import md5
+from typing import Dict, Iterable
+
+LOOKUP_CHUNK = 500  # claves por consulta IN (...) (límite de parámetros de SQLite)
+
+def normalizar_texto(s: str) -> str:
+    """NFC + espacios colapsados: variantes triviales del mismo título comparten clave."""
+    return " ".join(unicodedata.normalize("NFC", str(s)).split())
+
+class ResultCache:
+    def __init__(self, path: str, version: str):
+        self.path = path
+        self.version = version
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.con = sqlite3.connect(path)
+        self.con.execute("CREATE TABLE IF NOT EXISTS resultados (k TEXT PRIMARY KEY, v TEXT)")
+
+    def key(self, texto: str) -> str:
+        return md5(f"{self.version}\x1f{normalizar_texto(texto)}".encode("utf-8")).hexdigest()
+
+    def get_many(self, claves: Iterable[str]) -> Dict[str, str]:
+        claves = list(dict.fromkeys(claves))
+        out = {}
+        for i in range(0, len(claves), LOOKUP_CHUNK):
+            lote = claves[i:i+LOOKUP_CHUNK]
+            q = f"SELECT k, v FROM resultados WHERE k IN ({','.join('?' * len(lote))})"
+            out.update(self.con.execute(q, lote).fetchall())
+        return out
+
+    def put_many(self, items: Dict[str, str]):
+        self.con.executemany("INSERT OR REPLACE INTO resultados VALUES (?, ?)", items.items())
+        self.con.commit()
+
+    def close(self):
+        self.con.close()
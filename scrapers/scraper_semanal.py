@@ -11,17 +11,39 @@ Salidas (solo de esta semana):
    - apfdigital_provinciales.tmp.csv
    - elargentino_provincia.tmp.csv
    - unificado_semana.tmp.csv
+
+Cada medio corre en su propio proceso (timeout por medio, --secuencial para
+depurar); el unificado se escribe cuando terminan todos.
+
+Las notas nuevas se descubren por sitemap/RSS desde la marca del histórico
+(descubrimiento.py); si el medio no tiene uno que llegue hasta ahí, se recorre el
+listado como siempre.
+
+Cada detalle descargado queda en data/html_cache/ (ver html_cache.py). Con --replay
+se re-parsea todo lo cacheado sin red y se escribe en data/tmp/replay_YYYY-MM-DD/.
 """
 
-import os, re, time, random, unicodedata, argparse, sys
+import os, time, random, argparse, sys
 from datetime import datetime, date, timedelta
 from typing import List, Tuple, Optional, Set
 
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 
-# ----- Selenium opcional (solo para APF) -----
+import apf_listado
+import descubrimiento
+import http_client
+import html_cache
+import extraccion
+import watermark
+from html_parse import sopa
+from listado_incremental import ListadoIncremental
+from http_client import NotModified
+from store import AppendStore
+from fetch_pool import HostTokenBucket, fetch_in_order
+from page_seek import primera_pagina_vieja
+
+# ----- Selenium opcional (solo respaldo del listado de APF) -----
 try:
     from selenium import webdriver
     from selenium.webdriver.chrome.options import Options
@@ -38,6 +60,11 @@ except Exception:
 MODE = "window"           # "window" (recomendado) | "sentinel"
 OVERLAP_DAYS = 7          # solo aplica a MODE="window"
 DEFAULT_DRY_PAGES = 0     # 0 = sin límite
+DETAIL_WORKERS = 4        # descargas de detalle simultáneas por medio
+LISTADO_WORKERS = 2       # páginas de listado descargadas por adelantado (AD, tras el seek)
+VALIDATORS_PENDING = "http_validators.{medio}.pending.json"  # los confirma process_week tras el merge
+MEDIO_TIMEOUT_S = 3 * 3600  # por medio (cada uno corre en su propio proceso)
+PROGRESO_S = 60           # cada cuánto informar qué medios siguen corriendo
 
 # =========================
 # Paths y constantes
@@ -60,95 +87,22 @@ HEADERS = {
                    "Chrome/124.0.0.0 Safari/537.36")
 }
 
-MESES = {
-    "enero":"01","febrero":"02","marzo":"03","abril":"04","mayo":"05","junio":"06",
-    "julio":"07","agosto":"08","septiembre":"09","setiembre":"09","octubre":"10",
-    "noviembre":"11","diciembre":"12"
-}
-SPANISH_DATE_RE = re.compile(r"(\d{1,2})\s+de\s+([a-záéíóú]+)\s+de\s+(\d{4})", re.I)
-
 def log(msg: str):
     print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
 
-def _norm(s: str) -> str:
-    if s is None: return ""
-    s = s.strip()
-    s = unicodedata.normalize("NFKD", s)
-    s = "".join(c for c in s if not unicodedata.combining(c))
-    s = s.replace("\u00a0"," ").replace("\u202f"," ").replace("\u200b","")
-    return re.sub(r"\s+", " ", s)
-
-def parse_spanish_date(text: str) -> Optional[str]:
-    if not text: return None
-    m = SPANISH_DATE_RE.search(_norm(text).lower())
-    if not m: return None
-    d, mes_txt, a = m.groups()
-    mes = MESES.get(mes_txt)
-    if not mes: return None
-    try:
-        return f"{int(a):04d}-{mes}-{int(d):02d}"
-    except Exception:
-        return None
-
-def extract_date_generic(soup: BeautifulSoup, visibles_css: List[str]) -> Tuple[str, str, str]:
-    """
-    Devuelve (fecha_iso, fuente, fecha_texto)
-    fecha_iso: 'YYYY-MM-DD' o ''
-    fuente: 'meta' | 'time' | 'visible:<css>' | 'body' | 'none'
-    fecha_texto: texto crudo informativo
-    """
-    meta = soup.find("meta", attrs={"property": "article:published_time"}) or \
-           soup.find("meta", attrs={"name": "article:published_time"}) or \
-           soup.find("meta", attrs={"property": "og:updated_time"})
-    if meta and meta.get("content"):
-        raw = meta["content"]
-        m = re.search(r"(\d{4}-\d{2}-\d{2})", raw)
-        return (m.group(1) if m else (parse_spanish_date(raw) or "")), "meta", raw
-
-    t = soup.find("time", datetime=True)
-    if t and t.get("datetime"):
-        raw = t["datetime"]
-        m = re.search(r"(\d{4}-\d{2}-\d{2})", raw)
-        return (m.group(1) if m else (parse_spanish_date(raw) or "")), "time", raw
-
-    for css in visibles_css:
-        tag = soup.select_one(css)
-        if tag:
-            raw = tag.get_text(" ", strip=True)
-            parsed = parse_spanish_date(raw) or ""
-            if parsed:
-                return parsed, f"visible:{css}", raw
-            if " de " in _norm(raw).lower():
-                return "", f"visible:{css}", raw
-
-    body = soup.get_text(" ", strip=True)
-    parsed = parse_spanish_date(body) or ""
-    if parsed:
-        return parsed, "body", body
-    return "", "none", ""
-
 # =========================
 # Inferencia desde RAW
 # =========================
 def infer_last_from_raw(raw_path: str) -> Tuple[Optional[date], Set[str]]:
     """
-    Lee el histórico del medio:
+    Del histórico del medio:
       - max_fecha_raw: máxima fecha (date) en columna 'fecha'
       - sentinel_links: enlaces presentes en esa max_fecha_raw (para MODE='sentinel')
-    Si no hay archivo o no hay fechas, devuelve (None, set()).
+    Sale del manifiesto que mantiene process_week (watermark.py); sólo si falta o
+    quedó viejo se escanea el CSV. Si no hay archivo o no hay fechas, (None, set()).
     """
-    if not os.path.exists(raw_path):
-        return None, set()
     try:
-        df = pd.read_csv(raw_path)
-        if "fecha" not in df.columns: return None, set()
-        s = pd.to_datetime(df["fecha"], errors="coerce").dt.date.dropna()
-        if not len(s): return None, set()
-        max_fecha = max(s)
-        sentinels = set()
-        if "enlace" in df.columns:
-            sentinels = set(df.loc[pd.to_datetime(df["fecha"], errors="coerce").dt.date == max_fecha, "enlace"].dropna().astype(str))
-        return max_fecha, sentinels
+        return watermark.ultimo(raw_path)
     except Exception:
         return None, set()
 
@@ -172,8 +126,8 @@ def dedupe_by_enlace(df: pd.DataFrame) -> pd.DataFrame:
     keys = [c for c in ["titulo","medio","fecha"] if c in df.columns]
     return df.drop_duplicates(subset=keys).reset_index(drop=True)
 
-def save_tmp(df: pd.DataFrame, medio_tag: str, filename: str) -> str:
-    path = os.path.join(WEEK_DIR, filename)
+def save_tmp(df: pd.DataFrame, medio_tag: str, filename: str, out_dir: str = WEEK_DIR) -> str:
+    path = os.path.join(out_dir, filename)
     if not df.empty:
         df = dedupe_by_enlace(df)
         df.to_csv(path, index=False, encoding="utf-8-sig")
@@ -184,35 +138,151 @@ def save_tmp(df: pd.DataFrame, medio_tag: str, filename: str) -> str:
     log(f"[{medio_tag}] Guardado TMP → {path} ({len(df)} filas)")
     return path
 
+# =========================
+# GET condicional de detalles
+# =========================
+def validadores(medio: str) -> http_client.ValidatorStore:
+    """Validadores HTTP del histórico del medio (no se comparten con los scrapers por medio)."""
+    return http_client.validadores(RAW_FILES[medio])
+
+def fetch_detalle(medio: str, enlaces: List[str]):
+    """
+    fetch(url) para los detalles: condicional sólo para las notas que ya están en
+    el CSV de RAW del medio (índice de store.py). Las demás se bajan completas, así
+    un 304 siempre quiere decir "ya está en RAW".
+    """
+    en_raw = AppendStore(os.path.join(RAW_DIR, RAW_FILES[medio]), key="enlace").contiene(enlaces)
+    val = validadores(medio)
+    return lambda u: http_client.get(u, headers=HEADERS, validators=val if u in en_raw else None)
+
+# =========================
+# Descubrimiento por sitemap / RSS (ver descubrimiento.py)
+# =========================
+def descubrir_feed(medio: str, tag: str, max_fecha_raw: Optional[date]):
+    """Entradas del sitemap/feed desde la marca, o None → se recorre el listado."""
+    if max_fecha_raw is None:
+        return None  # primera corrida: el histórico sale del listado
+    desde = max_fecha_raw - timedelta(days=OVERLAP_DAYS - 1) if MODE == "window" else max_fecha_raw
+    entradas = descubrimiento.descubrir(medio, desde, log=lambda m: log(f"[{tag}] {m}"))
+    if entradas is None:
+        log(f"[{tag}] Sin sitemap/feed que llegue a {desde} → listado")
+    return entradas
+
+def scrape_desde_feed(medio: str, tag: str, seccion: str, entradas, parse, max_fecha_raw: Optional[date],
+                      sentinel_links: Set[str], throttle: HostTokenBucket) -> pd.DataFrame:
+    """
+    Detalles de las URLs descubiertas. El feed ya viene filtrado por lastmod, así
+    que no hay corte por orden: cada nota se queda si su fecha cae en la ventana.
+    """
+    registros = []
+    titulos = {e.url: e.titulo for e in entradas if e.url not in sentinel_links}
+    fetch = fetch_detalle(medio, list(titulos))
+    for i, (enlace, r2) in enumerate(fetch_in_order(fetch, list(titulos), throttle,
+                                                     max_workers=DETAIL_WORKERS), 1):
+        if isinstance(r2, NotModified):
+            log(f"[{tag}]   [{i}] 304 sin cambios → skip")
+            continue
+        if isinstance(r2, Exception) or r2 is None:
+            log(f"[{tag}]   [{i}] Detalle error {r2} → skip")
+            continue
+        if not r2.ok:
+            log(f"[{tag}]   [{i}] Detalle HTTP {r2.status_code} → skip")
+            continue
+        html_cache.put(medio, enlace, r2.text, titulo=titulos[enlace], seccion=seccion)
+        row = parse(r2.text, enlace, titulos[enlace])
+        if MODE == "window" and not in_window(row["fecha"], max_fecha_raw):
+            continue
+        registros.append(row)
+        validadores(medio).remember(enlace, r2, fecha=row["fecha"])
+        log(f"[{tag}]   [{i}] OK | {row['fecha'] or row['fecha_texto']} ({row['fuente_fecha']})")
+    log(f"[{tag}] Feed: {len(registros)} notas de {len(titulos)} descubiertas")
+    return pd.DataFrame(registros)
+
 # =========================
 # Scraper: AnalisisDigital
 # =========================
+def parse_detalle(medio: str, seccion: str, html: str, enlace: str, titulo: str) -> dict:
+    """Fila de una nota a partir del HTML de detalle (spec del medio en extraccion.py)."""
+    nota = extraccion.extraer(medio, html)
+    return {
+        "medio": medio, "fecha": nota.fecha.strftime("%Y-%m-%d") if nota.fecha else "",
+        "fecha_texto": nota.fecha_texto, "fuente_fecha": nota.fuente_fecha,
+        "titulo": titulo or nota.titulo, "contenido": nota.contenido, "enlace": enlace,
+        "seccion": seccion, "fecha_de_extraccion": HOY.isoformat()
+    }
+
+def parse_ad_detalle(html: str, enlace: str, titulo: str) -> dict:
+    return parse_detalle("analisisdigital", "provinciales", html, enlace, titulo)
+
 def scrape_analisisdigital(max_fecha_raw: Optional[date], sentinel_links: Set[str], dry_pages: Optional[int]) -> pd.DataFrame:
     MEDIO = "analisisdigital"
-    SECCION = "provinciales"
     URL_BASE = "https://www.analisisdigital.com.ar"
     SECCION_URL = f"{URL_BASE}/provinciales"
     MAX_PAGINAS = 200
 
-    sess = requests.Session()
+    # ~2.5 pedidos/seg por host: mismo presupuesto que el sleep 0.25–0.55s por nota
+    throttle = HostTokenBucket(rate=2.5, burst=2)
     registros = []
     collected_any = False
 
     log(f"[AD] mode={MODE} | max_fecha={max_fecha_raw or 'None'} | dry_pages={dry_pages or '-'}")
-    page_iter = range(1, (dry_pages or MAX_PAGINAS)+1)
-
-    for n_pag in page_iter:
-        url = SECCION_URL if n_pag == 1 else f"{SECCION_URL}?page={n_pag-1}"
-        r = sess.get(url, headers=HEADERS, timeout=25)
-        if not r.ok:
-            log(f"[AD] Página {n_pag} HTTP {r.status_code} → fin.")
+    entradas = descubrir_feed(MEDIO, "AD", max_fecha_raw)
+    if entradas is not None:
+        return scrape_desde_feed(MEDIO, "AD", "provinciales", entradas, parse_ad_detalle,
+                                 max_fecha_raw, sentinel_links, throttle)
+    url_pagina = lambda n: SECCION_URL if n == 1 else f"{SECCION_URL}?page={n-1}"
+    listados = {}  # n → respuesta; las sondas del seek se reusan en el recorrido
+
+    def items_de(r):
+        main_content = sopa(r.text, ["div.body"]).find("div", class_="body")
+        return main_content.find_all("div", class_="views-row") if main_content else []
+
+    def fecha_pagina(n: int) -> Optional[date]:
+        """Sonda del seek: fecha (del detalle) de la última nota de la página n."""
+        r = listados[n] = http_client.get(url_pagina(n), headers=HEADERS)
+        links = [it.find("a", href=True) for it in (items_de(r) if r.ok else [])]
+        links = [a["href"] for a in links if a]
+        if not links:
+            return date.min
+        enlace = links[-1] if links[-1].startswith("http") else URL_BASE + links[-1]
+        r2 = http_client.get(enlace, headers=HEADERS)
+        f = parse_ad_detalle(r2.text, enlace, "")["fecha"] if r2.ok else ""
+        return datetime.strptime(f, "%Y-%m-%d").date() if f else None
+
+    ultima = dry_pages or MAX_PAGINAS
+    if max_fecha_raw is not None:
+        # rango de páginas que cubre [corte, hoy] en O(log páginas) pedidos (ver page_seek.py)
+        corte = max_fecha_raw - timedelta(days=OVERLAP_DAYS - 1) if MODE == "window" else max_fecha_raw
+        try:
+            ultima = primera_pagina_vieja(fecha_pagina, corte, ultima, log=lambda m: log(f"[AD] {m}"))
+        except Exception as e:
+            log(f"[AD] Seek falló ({e}); recorro hasta {ultima} páginas")
+
+    def paginas():
+        """
+        Listados 1..ultima en orden; los que no sondeó el seek se bajan en paralelo,
+        a lo sumo LISTADO_WORKERS por delante (cortar en la fecha no baja el resto).
+        """
+        faltan = [url_pagina(n) for n in range(1, ultima + 1) if n not in listados]
+        descargas = fetch_in_order(lambda u: http_client.get(u, headers=HEADERS), faltan, throttle,
+                                   max_workers=LISTADO_WORKERS, adelanto=LISTADO_WORKERS)
+        try:
+            for n in range(1, ultima + 1):
+                yield n, (listados.pop(n) if n in listados else next(descargas)[1])
+        finally:
+            descargas.close()
+
+    for n_pag, r in paginas():
+        if r is None or isinstance(r, Exception) or not r.ok:
+            log(f"[AD] Página {n_pag} {getattr(r, 'status_code', r)} → fin.")
             break
-        soup = BeautifulSoup(r.text, "html.parser")
-        main_content = soup.find("div", class_="body")
-        items = main_content.find_all("div", class_="views-row") if main_content else []
+        items = items_de(r)
         log(f"[AD] Página {n_pag}: {len(items)} items")
         if not items: break
 
+        # Listado → candidatos (hasta el sentinela, si aparece)
+        candidatos = []
+        sentinela = None
         for i, item in enumerate(items, 1):
             a_tag = item.find("a", href=True)
             if not a_tag: continue
@@ -221,62 +291,69 @@ def scrape_analisisdigital(max_fecha_raw: Optional[date], sentinel_links: Set[st
                 enlace = URL_BASE + enlace
 
             if MODE == "sentinel" and enlace in sentinel_links:
-                log(f"[AD]   [{i}] Encontrado sentinela → corte inmediato")
-                return pd.DataFrame(registros)  # no incluimos el ya visto
+                sentinela = i
+                break
 
             titulo_tag = item.find(["h2","h3"])
             titulo = titulo_tag.get_text(strip=True) if titulo_tag else ""
-
-            r2 = sess.get(enlace, headers=HEADERS, timeout=25)
+            candidatos.append((i, enlace, titulo))
+
+        # Detalles en paralelo, procesados en orden de listado
+        info = {enlace: (i, titulo) for i, enlace, titulo in candidatos}
+        fetch = fetch_detalle(MEDIO, list(info))
+        for enlace, r2 in fetch_in_order(fetch, list(info), throttle, max_workers=DETAIL_WORKERS):
+            i, titulo = info[enlace]
+            if isinstance(r2, NotModified):
+                # Sin cambios desde la última corrida: ya está en RAW, sólo cuenta para el corte
+                fecha_iso = r2.meta.get("fecha", "")
+                if MODE == "window" and not in_window(fecha_iso, max_fecha_raw):
+                    if collected_any:
+                        log(f"[AD]   [{i}] {enlace} (304) fuera de ventana → corte medio")
+                        return pd.DataFrame(registros)
+                    continue
+                collected_any = True
+                log(f"[AD]   [{i}] 304 sin cambios → skip")
+                continue
+            if isinstance(r2, Exception) or r2 is None:
+                log(f"[AD]   [{i}] Detalle error {r2} → skip")
+                continue
             if not r2.ok:
                 log(f"[AD]   [{i}] Detalle HTTP {r2.status_code} → skip")
                 continue
-            soup2 = BeautifulSoup(r2.text, "html.parser")
-
-            fecha_iso, fuente, fecha_texto = extract_date_generic(
-                soup2, ["div.field--name-node-post-date", "div.grupo-fecha-autor", "div.submitted"]
-            )
+            html_cache.put(MEDIO, enlace, r2.text, titulo=titulo, seccion="provinciales")
+            row = parse_ad_detalle(r2.text, enlace, titulo)
 
             # Filtro según modo
-            keep = in_window(fecha_iso, max_fecha_raw) if MODE == "window" else True
+            keep = in_window(row["fecha"], max_fecha_raw) if MODE == "window" else True
             if not keep:
                 if collected_any:
                     log(f"[AD]   [{i}] {enlace} fuera de ventana → corte medio")
-                    return pd.DataFrame(registros)
+                    return pd.DataFrame(registros)  # al salir se cancelan los pendientes
                 else:
                     continue
 
-            # Contenido
-            cuerpo_div = soup2.find("div", class_=lambda x: x and "body-noticia" in x) \
-                         or soup2.find("div", class_="note-body") or soup2
-            parrafos = [p.get_text(" ", strip=True) for p in (cuerpo_div.find_all("p") if cuerpo_div else [])]
-            contenido = "\n".join([p for p in parrafos if p]) if parrafos else ""
-
-            registros.append({
-                "medio": MEDIO, "fecha": fecha_iso, "fecha_texto": fecha_texto, "fuente_fecha": fuente,
-                "titulo": titulo, "contenido": contenido, "enlace": enlace,
-                "seccion": SECCION, "fecha_de_extraccion": HOY.isoformat()
-            })
+            registros.append(row)
+            validadores(MEDIO).remember(enlace, r2, fecha=row["fecha"])
             collected_any = True
-            log(f"[AD]   [{i}] OK | {fecha_iso or fecha_texto} ({fuente})")
-            time.sleep(random.uniform(0.25, 0.55))
+            log(f"[AD]   [{i}] OK | {row['fecha'] or row['fecha_texto']} ({row['fuente_fecha']})")
 
-        time.sleep(random.uniform(0.7, 1.0))
+        if sentinela is not None:
+            log(f"[AD]   [{sentinela}] Encontrado sentinela → corte inmediato")
+            return pd.DataFrame(registros)  # no incluimos el ya visto
 
     return pd.DataFrame(registros)
 
 # =========================
-# Scraper: APF (Selenium)
+# Scraper: APF (HTTP; Selenium de respaldo)
 # =========================
-def scrape_apf(max_fecha_raw: Optional[date], sentinel_links: Set[str], dry_pages: Optional[int]) -> pd.DataFrame:
-    MEDIO = "apfdigital"
-    SECCION = "provinciales"
-    URL = "https://www.apfdigital.com.ar/provinciales"
+def parse_apf_detalle(html: str, enlace: str, titulo: str) -> dict:
+    return parse_detalle("apfdigital", "provinciales", html, enlace, titulo)
 
+def paginas_apf_selenium(url: str, dry_pages: Optional[int]):
+    """Respaldo del listado con Chrome: rinde sólo las tarjetas nuevas de cada 'Ver más'."""
     if not SELENIUM_OK:
         log("[APF] Selenium no disponible. Saltando medio.")
-        return pd.DataFrame(columns=["medio","fecha","fecha_texto","fuente_fecha","titulo",
-                                     "contenido","enlace","seccion","fecha_de_extraccion"])
+        return
 
     options = Options()
     options.add_argument("--headless=new")
@@ -285,103 +362,139 @@ def scrape_apf(max_fecha_raw: Optional[date], sentinel_links: Set[str], dry_page
 
     driver = webdriver.Chrome(options=options)
     wait = WebDriverWait(driver, 8)
-
-    registros = []
-    collected_any = False
+    listado = ListadoIncremental(driver, "article.listado-noticias-relacionadas")
     pagina = 1
-    vistos = set()
-
-    log(f"[APF] mode={MODE} | max_fecha={max_fecha_raw or 'None'} | dry_pages={dry_pages or '-'}")
     try:
-        driver.get(URL)
+        driver.get(url)
         time.sleep(2.0)
-
         while True:
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            cards = soup.find_all("article", class_="listado-noticias-relacionadas")
-            log(f"[APF] Página {pagina}: {len(cards)} items")
-            if not cards: break
-
-            for idx, art in enumerate(cards, 1):
-                link_tag = art.find("a", class_="div-image")
-                if not link_tag or not link_tag.get("href"): continue
-                enlace = "https://www.apfdigital.com.ar" + link_tag["href"]
-                if enlace in vistos: continue
-                vistos.add(enlace)
-
-                if MODE == "sentinel" and enlace in sentinel_links:
-                    log(f"[APF]   [{idx}] Encontrado sentinela → corte inmediato")
-                    return pd.DataFrame(registros)
-
-                tit_tag = art.find("h2", class_="text-noticia-simple-titulo")
-                titulo = tit_tag.get_text(strip=True) if tit_tag else ""
-
-                # abrir detalle en la misma pestaña
-                driver.execute_script("window.open(arguments[0], '_self');", enlace)
-                time.sleep(1.1)
-                s2 = BeautifulSoup(driver.page_source, "html.parser")
-
-                fecha_iso, fuente, fecha_texto = extract_date_generic(
-                    s2, ["div.noticia-fecha", "div.fecha"]
-                )
-
-                keep = in_window(fecha_iso, max_fecha_raw) if MODE == "window" else True
-                if not keep:
-                    if collected_any:
-                        log(f"[APF]   [{idx}] fuera de ventana → corte medio")
-                        return pd.DataFrame(registros)
-                    else:
-                        driver.execute_script("window.history.go(-1)")
-                        time.sleep(0.8)
-                        continue
-
-                copete_tag = s2.find("div", class_="noticia-copete")
-                copete = copete_tag.get_text(" ", strip=True) if copete_tag else ""
-                cont_tag = s2.find("div", class_="noticia-contenido")
-                parrafos = [p.get_text(" ", strip=True) for p in (cont_tag.find_all("p") if cont_tag else [])]
-                if copete and parrafos and copete.strip() == parrafos[0].strip():
-                    parrafos = parrafos[1:]
-                contenido = (copete + ("\n" if copete else "") + "\n".join(parrafos)).strip()
-
-                registros.append({
-                    "medio": MEDIO, "fecha": fecha_iso, "fecha_texto": fecha_texto, "fuente_fecha": fuente,
-                    "titulo": titulo, "contenido": contenido, "enlace": enlace,
-                    "seccion": SECCION, "fecha_de_extraccion": HOY.isoformat()
-                })
-                collected_any = True
-                log(f"[APF]   [{idx}] OK | {fecha_iso or fecha_texto} ({fuente})")
-
-                driver.execute_script("window.history.go(-1)")
-                time.sleep(0.9)
+            cards = apf_listado.parse_cards_tags(listado.nuevas())
+            if not cards: return
+            yield cards
 
             # Ver más noticias / paginación
             if dry_pages and pagina >= dry_pages:
-                break
+                return
             try:
                 boton = wait.until(EC.element_to_be_clickable(
                     (By.XPATH, "//span[contains(.,'Ver más noticias')]|//button[contains(.,'Ver más noticias')]")
                 ))
                 driver.execute_script("arguments[0].click();", boton)
-                pagina += 1
-                time.sleep(1.4)
             except Exception as e:
                 log(f"[APF] Fin de listado o botón no disponible: {e}")
-                break
-
+                return
+            if not listado.esperar_mas(timeout=10):
+                log("[APF] No cargaron tarjetas nuevas tras 'Ver más'.")
+                return
+            pagina += 1
     finally:
         try: driver.quit()
         except Exception: pass
 
+def paginas_apf(url: str, dry_pages: Optional[int]):
+    """
+    Listado por HTTP (apf_listado). La primera página siempre sale por HTTP; lo que
+    se adivina es el endpoint de "Ver más". Si el listado se corta con error o no
+    llega a la página 2, se sigue con Selenium (las tarjetas repetidas las
+    descarta scrape_apf).
+    """
+    paginas = 0
+    try:
+        for cards in apf_listado.iter_paginas(url, headers=HEADERS, max_paginas=dry_pages):
+            paginas += 1
+            yield cards
+        if paginas >= min(2, dry_pages or 2):
+            return
+        log(f"[APF] Listado HTTP: {paginas} página(s), el 'Ver más' no devolvió tarjetas.")
+    except Exception as e:
+        log(f"[APF] Listado HTTP interrumpido en la página {paginas + 1}: {e}")
+    log("[APF] Respaldo con Selenium.")
+    yield from paginas_apf_selenium(url, dry_pages)
+
+def scrape_apf(max_fecha_raw: Optional[date], sentinel_links: Set[str], dry_pages: Optional[int]) -> pd.DataFrame:
+    """
+    Notas del sitemap/feed si llega a la marca; si no, listado por el endpoint de
+    "Ver más" (ver paginas_apf) y detalles por HTTP en paralelo; Chrome sólo si
+    hace falta para el listado.
+    """
+    MEDIO = "apfdigital"
+    URL = "https://www.apfdigital.com.ar/provinciales"
+    throttle = HostTokenBucket(rate=2.0, burst=2)
+    registros = []
+    collected_any = False
+    vistos = set()
+    pagina = 0
+
+    log(f"[APF] mode={MODE} | max_fecha={max_fecha_raw or 'None'} | dry_pages={dry_pages or '-'}")
+    entradas = descubrir_feed(MEDIO, "APF", max_fecha_raw)
+    if entradas is not None:
+        return scrape_desde_feed(MEDIO, "APF", "provinciales", entradas, parse_apf_detalle,
+                                 max_fecha_raw, sentinel_links, throttle)
+    for cards in paginas_apf(URL, dry_pages):
+        pagina += 1
+        log(f"[APF] Página {pagina}: {len(cards)} items")
+
+        candidatos = []
+        sentinela = None
+        for idx, card in enumerate(cards, 1):
+            enlace = card["url"]
+            if enlace in vistos: continue
+            vistos.add(enlace)
+            if MODE == "sentinel" and enlace in sentinel_links:
+                sentinela = idx
+                break
+            candidatos.append((idx, enlace, card["titulo"]))
+
+        info = {enlace: (idx, titulo) for idx, enlace, titulo in candidatos}
+        fetch = fetch_detalle(MEDIO, list(info))
+        for enlace, r2 in fetch_in_order(fetch, list(info), throttle, max_workers=DETAIL_WORKERS):
+            idx, titulo = info[enlace]
+            if isinstance(r2, NotModified):
+                fecha_iso = r2.meta.get("fecha", "")
+                if MODE == "window" and not in_window(fecha_iso, max_fecha_raw):
+                    if collected_any:
+                        log(f"[APF]   [{idx}] {enlace} (304) fuera de ventana → corte medio")
+                        return pd.DataFrame(registros)
+                    continue
+                collected_any = True
+                log(f"[APF]   [{idx}] 304 sin cambios → skip")
+                continue
+            if isinstance(r2, Exception) or r2 is None:
+                log(f"[APF]   [{idx}] Detalle error {r2} → skip")
+                continue
+            if not r2.ok:
+                log(f"[APF]   [{idx}] Detalle HTTP {r2.status_code} → skip")
+                continue
+            html_cache.put(MEDIO, enlace, r2.text, titulo=titulo, seccion="provinciales")
+            row = parse_apf_detalle(r2.text, enlace, titulo)
+
+            keep = in_window(row["fecha"], max_fecha_raw) if MODE == "window" else True
+            if not keep:
+                if collected_any:
+                    log(f"[APF]   [{idx}] fuera de ventana → corte medio")
+                    return pd.DataFrame(registros)
+                continue
+
+            registros.append(row)
+            validadores(MEDIO).remember(enlace, r2, fecha=row["fecha"])
+            collected_any = True
+            log(f"[APF]   [{idx}] OK | {row['fecha'] or row['fecha_texto']} ({row['fuente_fecha']})")
+
+        if sentinela is not None:
+            log(f"[APF]   [{sentinela}] Encontrado sentinela → corte inmediato")
+            return pd.DataFrame(registros)
     return pd.DataFrame(registros)
 
 # =========================
 # Scraper: El Argentino
 # =========================
+def parse_elarg_detalle(html: str, enlace: str, titulo: str) -> dict:
+    return parse_detalle("elargentino", "provincia", html, enlace, titulo)
+
 def scrape_elargentino(max_fecha_raw: Optional[date], sentinel_links: Set[str], dry_pages: Optional[int]) -> pd.DataFrame:
     MEDIO = "elargentino"
     SECCION = "provincia"
     BASE_URL = "https://diarioelargentino.com"
-    sess = requests.Session()
 
     def recolectar_links(soup: BeautifulSoup):
         noticias = []
@@ -397,63 +510,79 @@ def scrape_elargentino(max_fecha_raw: Optional[date], sentinel_links: Set[str],
                 if a and a.get("href"): noticias.append((a.get_text(strip=True), a["href"]))
         return noticias
 
+    # ~2 pedidos/seg por host: mismo presupuesto que el sleep 0.35–0.6s por nota
+    throttle = HostTokenBucket(rate=2.0, burst=2)
     registros = []
     collected_any = False
     pagina = 0
     max_pages = dry_pages if dry_pages else 9999
 
     log(f"[ELARG] mode={MODE} | max_fecha={max_fecha_raw or 'None'} | dry_pages={dry_pages or '-'}")
+    entradas = descubrir_feed(MEDIO, "ELARG", max_fecha_raw)
+    if entradas is not None:
+        return scrape_desde_feed(MEDIO, "ELARG", SECCION, entradas, parse_elarg_detalle,
+                                 max_fecha_raw, sentinel_links, throttle)
 
     while pagina < max_pages:
         url_list = f"{BASE_URL}/{SECCION}" + (f"/{pagina}" if pagina > 0 else "")
-        r = sess.get(url_list, headers=HEADERS, timeout=25)
+        r = http_client.get(url_list, headers=HEADERS)
         if not r.ok:
             log(f"[ELARG] HTTP {r.status_code} en listado → fin.")
             break
-        s = BeautifulSoup(r.text, "html.parser")
+        s = sopa(r.text)
         links = recolectar_links(s)
         log(f"[ELARG] Página {pagina}: {len(links)} items")
         if not links: break
 
+        candidatos = []
+        sentinela = None
         for idx, (titulo, href) in enumerate(links, 1):
             enlace = BASE_URL + href
-
             if MODE == "sentinel" and enlace in sentinel_links:
-                log(f"[ELARG]   [{idx}] Encontrado sentinela → corte inmediato")
-                return pd.DataFrame(registros)
-
-            r2 = sess.get(enlace, headers=HEADERS, timeout=25)
+                sentinela = idx
+                break
+            candidatos.append((idx, enlace, titulo))
+
+        info = {enlace: (idx, titulo) for idx, enlace, titulo in candidatos}
+        fetch = fetch_detalle(MEDIO, list(info))
+        for enlace, r2 in fetch_in_order(fetch, list(info), throttle, max_workers=DETAIL_WORKERS):
+            idx, titulo = info[enlace]
+            if isinstance(r2, NotModified):
+                # Sin cambios desde la última corrida: ya está en RAW, sólo cuenta para el corte
+                fecha_iso = r2.meta.get("fecha", "")
+                if MODE == "window" and not in_window(fecha_iso, max_fecha_raw):
+                    if collected_any:
+                        log(f"[ELARG]   [{idx}] {enlace} (304) fuera de ventana → corte medio")
+                        return pd.DataFrame(registros)
+                    continue
+                collected_any = True
+                log(f"[ELARG]   [{idx}] 304 sin cambios → skip")
+                continue
+            if isinstance(r2, Exception) or r2 is None:
+                log(f"[ELARG]   [{idx}] Detalle error {r2} → skip")
+                continue
             if not r2.ok:
                 log(f"[ELARG]   [{idx}] Detalle HTTP {r2.status_code} → skip")
                 continue
-            s2 = BeautifulSoup(r2.text, "html.parser")
+            html_cache.put(MEDIO, enlace, r2.text, titulo=titulo, seccion="provincia")
+            row = parse_elarg_detalle(r2.text, enlace, titulo)
 
-            fecha_iso, fuente, fecha_texto = extract_date_generic(
-                s2, ["span.fecha-nota", "div.cont-cuerpo .timeline-date-time-up"]
-            )
-
-            keep = in_window(fecha_iso, max_fecha_raw) if MODE == "window" else True
+            keep = in_window(row["fecha"], max_fecha_raw) if MODE == "window" else True
             if not keep:
                 if collected_any:
                     log(f"[ELARG]   [{idx}] fuera de ventana → corte medio")
-                    return pd.DataFrame(registros)
+                    return pd.DataFrame(registros)  # al salir se cancelan los pendientes
                 else:
                     continue
 
-            copete_tag = s2.find("div", class_="bajada")
-            copete = copete_tag.get_text(" ", strip=True) if copete_tag else ""
-            cuerpo_tag = s2.find("div", class_="texto")
-            parrafos = [p.get_text(" ", strip=True) for p in (cuerpo_tag.find_all("p") if cuerpo_tag else [])]
-            contenido = (copete + ("\n" if copete else "") + "\n".join([p for p in parrafos if p])).strip()
-
-            registros.append({
-                "medio": MEDIO, "fecha": fecha_iso, "fecha_texto": fecha_texto, "fuente_fecha": fuente,
-                "titulo": titulo, "contenido": contenido, "enlace": enlace,
-                "seccion": SECCION, "fecha_de_extraccion": HOY.isoformat()
-            })
+            registros.append(row)
+            validadores(MEDIO).remember(enlace, r2, fecha=row["fecha"])
             collected_any = True
-            log(f"[ELARG]   [{idx}] OK | {fecha_iso or fecha_texto} ({fuente})")
-            time.sleep(random.uniform(0.35, 0.6))
+            log(f"[ELARG]   [{idx}] OK | {row['fecha'] or row['fecha_texto']} ({row['fuente_fecha']})")
+
+        if sentinela is not None:
+            log(f"[ELARG]   [{sentinela}] Encontrado sentinela → corte inmediato")
+            return pd.DataFrame(registros)
 
         pagina += 1
         time.sleep(random.uniform(0.8, 1.1))
@@ -461,40 +590,120 @@ def scrape_elargentino(max_fecha_raw: Optional[date], sentinel_links: Set[str],
     return pd.DataFrame(registros)
 
 # =========================
-# Runner
+# Replay (sin red)
 # =========================
-def main():
-    parser = argparse.ArgumentParser(description="Scrapper semanal incremental (sin state/, con ventana o sentinela).")
-    parser.add_argument("--medio", choices=["analisisdigital","apfdigital","elargentino","all"],
-                        default="all", help="Qué medio scrapear")
-    parser.add_argument("--dry", type=int, default=DEFAULT_DRY_PAGES,
-                        help="Limitar páginas por medio para prueba (0 = sin límite)")
-    args = parser.parse_args()
+TMP_FILES = {
+    "analisisdigital": ("AD",    "analisisdigital_provinciales.tmp.csv"),
+    "apfdigital":      ("APF",   "apfdigital_provinciales.tmp.csv"),
+    "elargentino":     ("ELARG", "elargentino_provincia.tmp.csv"),
+}
+PARSERS_DETALLE = {  # medio → (parser, sección que scrapea este script)
+    "analisisdigital": (parse_ad_detalle,    "provinciales"),
+    "apfdigital":      (parse_apf_detalle,   "provinciales"),
+    "elargentino":     (parse_elarg_detalle, "provincia"),
+}
 
-    medios = [args.medio] if args.medio != "all" else ["analisisdigital","apfdigital","elargentino"]
-    tmp_paths = []
+def replay_medio(medio: str) -> pd.DataFrame:
+    """Re-parsea las notas del medio guardadas en data/html_cache/ (sin ventana ni red)."""
+    parse, seccion = PARSERS_DETALLE[medio]
+    # la caché es compartida con los scrapers por medio: sólo las páginas de nuestra sección
+    registros = [parse(html, url, meta.get("titulo", ""))
+                 for url, html, meta in html_cache.iter_medio(medio)
+                 if meta.get("seccion") == seccion]
+    log(f"[REPLAY] {medio}: {len(registros)} notas re-parseadas desde caché")
+    return pd.DataFrame(registros)
 
-    # Inferir desde RAW (por medio)
-    ad_max, ad_sentinels = infer_last_from_raw(os.path.join(RAW_DIR, "analisisdigital_provinciales.csv"))
-    apf_max, apf_sentinels = infer_last_from_raw(os.path.join(RAW_DIR, "apfdigital_provinciales.csv"))
-    el_max, el_sentinels = infer_last_from_raw(os.path.join(RAW_DIR, "elargentino_provincia.csv"))
+# =========================
+# Runner
+# =========================
+RAW_FILES = {
+    "analisisdigital": "analisisdigital_provinciales.csv",
+    "apfdigital":      "apfdigital_provinciales.csv",
+    "elargentino":     "elargentino_provincia.csv",
+}
+SCRAPERS = {
+    "analisisdigital": scrape_analisisdigital,
+    "apfdigital":      scrape_apf,
+    "elargentino":     scrape_elargentino,
+}
 
-    if "analisisdigital" in medios:
-        df_ad = scrape_analisisdigital(ad_max, ad_sentinels, (args.dry or None))
-        p = save_tmp(df_ad, "AD", "analisisdigital_provinciales.tmp.csv")
-        tmp_paths.append(p)
+def scrape_un_medio(medio: str, dry_pages: Optional[int], out_dir: str) -> Tuple[str, str]:
+    """Scrapea un medio y guarda su TMP y sus validadores HTTP; devuelve (tmp, pendientes)."""
+    max_raw, sentinels = infer_last_from_raw(os.path.join(RAW_DIR, RAW_FILES[medio]))
+    df = SCRAPERS[medio](max_raw, sentinels, dry_pages)
+    tag, tmp_name = TMP_FILES[medio]
+    path = save_tmp(df, tag, tmp_name, out_dir)
+    # validadores pendientes hasta que process_week mergee la semana a RAW
+    pendientes = os.path.join(out_dir, VALIDATORS_PENDING.format(medio=medio))
+    validadores(medio).dump_pending(pendientes)
+    return path, pendientes
+
+def _worker(medio: str, dry_pages: Optional[int], out_dir: str, cola):
+    """Proceso hijo: un medio. Cualquier error vuelve como mensaje, no mata a los demás."""
+    try:
+        cola.put((medio, "ok", scrape_un_medio(medio, dry_pages, out_dir)))
+    except BaseException:
+        import traceback
+        cola.put((medio, "error", traceback.format_exc()))
 
-    if "apfdigital" in medios:
-        df_apf = scrape_apf(apf_max, apf_sentinels, (args.dry or None))
-        p = save_tmp(df_apf, "APF", "apfdigital_provinciales.tmp.csv")
-        tmp_paths.append(p)
+def scrape_medios(medios: List[str], dry_pages: Optional[int], timeout: Optional[float] = MEDIO_TIMEOUT_S,
+                  secuencial: bool = False) -> List[str]:
+    """
+    Un proceso por medio (hosts distintos, sin estado compartido salvo WEEK_DIR):
+    el tiempo total es el del medio más lento. Un medio que falla o supera
+    `timeout` segundos se descarta sin afectar a los otros. Cada hijo deja sus
+    validadores HTTP pendientes en la carpeta semanal (uno por medio).
+    """
+    resultados = {}
+    if secuencial:
+        for m in medios:
+            resultados[m] = scrape_un_medio(m, dry_pages, WEEK_DIR)
+    else:
+        import multiprocessing as mp
+        ctx = mp.get_context("spawn")  # hijos limpios: nada de sesiones/hilos heredados
+        cola = ctx.Queue()
+        procs = {m: ctx.Process(target=_worker, args=(m, dry_pages, WEEK_DIR, cola), name=m, daemon=True)
+                 for m in medios}
+        inicio = time.time()
+        for p in procs.values():
+            p.start()
+        log(f"[RUN] {len(procs)} medios en paralelo (timeout={timeout or '-'}s)")
+        pendientes, ultimo_aviso, muertos = set(medios), time.time(), {}
+        while pendientes:
+            try:
+                medio, estado, dato = cola.get(timeout=1)
+            except Exception:
+                medio = None
+            if medio is not None:
+                pendientes.discard(medio)
+                if estado == "ok":
+                    resultados[medio] = dato
+                    log(f"[RUN] {medio}: terminado en {time.time() - inicio:.0f}s")
+                else:
+                    log(f"[RUN] {medio}: FALLÓ, se descarta esta semana\n{dato}")
+                procs[medio].join(timeout=10)
+            transcurrido = time.time() - inicio
+            for m in list(pendientes):
+                p = procs[m]
+                if timeout and transcurrido > timeout:
+                    p.terminate()  # ojo: un Chrome de Selenium puede quedar huérfano
+                    log(f"[RUN] {m}: superó {timeout:.0f}s → cancelado")
+                elif not p.is_alive() and time.time() - muertos.setdefault(m, time.time()) > 5:
+                    # el hijo murió sin avisar (p.ej. crash nativo); los 5s dan margen
+                    # a que llegue un mensaje encolado justo antes de salir
+                    log(f"[RUN] {m}: terminó sin resultado (exitcode={p.exitcode})")
+                else:
+                    continue
+                pendientes.discard(m)
+                p.join(timeout=10)
+            if pendientes and time.time() - ultimo_aviso >= PROGRESO_S:
+                log(f"[RUN] {transcurrido:.0f}s | en curso: {', '.join(sorted(pendientes))}")
+                ultimo_aviso = time.time()
 
-    if "elargentino" in medios:
-        df_el = scrape_elargentino(el_max, el_sentinels, (args.dry or None))
-        p = save_tmp(df_el, "ELARG", "elargentino_provincia.tmp.csv")
-        tmp_paths.append(p)
+    # orden estable para el unificado
+    return [resultados[m][0] for m in medios if m in resultados]
 
-    # Unificado semanal TMP
+def write_unificado(tmp_paths: List[str], out_dir: str):
     dfs = []
     for p in tmp_paths:
         try:
@@ -508,9 +717,40 @@ def main():
                 "contenido","enlace","seccion","fecha_de_extraccion"]
         df_week = pd.DataFrame(columns=cols)
 
-    week_unified_path = os.path.join(WEEK_DIR, "unificado_semana.tmp.csv")
+    week_unified_path = os.path.join(out_dir, "unificado_semana.tmp.csv")
     df_week.to_csv(week_unified_path, index=False, encoding="utf-8-sig")
     log(f"[UNIFICADO] Guardado → {week_unified_path} ({len(df_week)} filas)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrapper semanal incremental (sin state/, con ventana o sentinela).")
+    parser.add_argument("--medio", choices=["analisisdigital","apfdigital","elargentino","all"],
+                        default="all", help="Qué medio scrapear")
+    parser.add_argument("--dry", type=int, default=DEFAULT_DRY_PAGES,
+                        help="Limitar páginas por medio para prueba (0 = sin límite)")
+    parser.add_argument("--replay", action="store_true",
+                        help="Re-parsear desde data/html_cache/ sin red → data/tmp/replay_YYYY-MM-DD/ "
+                             "(consolidar con process_week.py --week-dir <carpeta> --replace)")
+    parser.add_argument("--timeout", type=float, default=MEDIO_TIMEOUT_S,
+                        help="Segundos máximos por medio (0 = sin límite)")
+    parser.add_argument("--secuencial", action="store_true",
+                        help="Correr los medios uno tras otro en este proceso (depuración)")
+    args = parser.parse_args()
+
+    medios = [args.medio] if args.medio != "all" else ["analisisdigital","apfdigital","elargentino"]
+
+    if args.replay:
+        out_dir = os.path.join(TMP_DIR, f"replay_{WEEK_STAMP}")
+        os.makedirs(out_dir, exist_ok=True)
+        tmp_paths = [save_tmp(replay_medio(m), TMP_FILES[m][0], TMP_FILES[m][1], out_dir) for m in medios]
+        write_unificado(tmp_paths, out_dir)
+        log(f"Listo. Consolidá con: process_week.py --week-dir {out_dir} --replace")
+        return
+
+    tmp_paths = scrape_medios(medios, (args.dry or None), timeout=(args.timeout or None),
+                              secuencial=args.secuencial)
+
+    # Unificado semanal TMP
+    write_unificado(tmp_paths, WEEK_DIR)
     log("Listo. Ahora corré process_week.py para validar y consolidar el histórico y generar las tablas del Shiny.")
 
 if __name__ == "__main__":
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Histórico append-only con índice persistente de claves.
+
+Los CSV de data/raw/ siguen siendo el formato de salida (los leen process_week,
+pipeline_limpieza, los notebooks y la app), pero ya no se reescriben en cada
+corrida: save_incremental() sólo agrega al final las filas cuya clave ('id' o
+'enlace') no está en el índice <csv>.idx.sqlite (PRIMARY KEY → lookup por índice,
+sin leer el CSV).
+
+El índice guarda tamaño y mtime del CSV tras la última escritura; si no coinciden
+(alguien editó el archivo a mano) o falta, se reconstruye leyendo sólo la columna
+clave. Si las filas nuevas traen columnas que el CSV no tiene, o se pide
+reemplazar filas existentes (replay), se cae a la reescritura completa de siempre.
+contiene() consulta el mismo índice (p. ej. para decidir un GET condicional).
+
+KeySet es el mismo índice sin CSV: claves ya procesadas por una etapa
+incremental (p. ej. frecuencias), con una firma de configuración.
+"""
+
+import os, csv, sqlite3
+from typing import List, Set, Tuple
+
+import pandas as pd
+
+LOOKUP_CHUNK = 500  # claves por consulta IN (...) (límite de parámetros de SQLite)
+
+class AppendStore:
+    def __init__(self, csv_path: str, key: str = "id", encoding: str = "utf-8"):
+        self.path = csv_path
+        self.key = key
+        self.encoding = encoding
+        self.idx_path = csv_path + ".idx.sqlite"
+        self.reescrito = False   # la última escritura reescribió el CSV (no sólo agregó al final)
+
+    # ---------- índice ----------
+    def _connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self.idx_path)
+        con.execute("CREATE TABLE IF NOT EXISTS claves (k TEXT PRIMARY KEY)")
+        con.execute("CREATE TABLE IF NOT EXISTS meta (nombre TEXT PRIMARY KEY, valor TEXT)")
+        return con
+
+    def _firma_csv(self) -> str:
+        st = os.stat(self.path)
+        return f"{self.key}|{st.st_size}|{st.st_mtime_ns}"
+
+    def _meta(self, con, nombre, default=None):
+        row = con.execute("SELECT valor FROM meta WHERE nombre=?", (nombre,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, con, **vals):
+        con.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [(k, str(v)) for k, v in vals.items()])
+
+    def _rebuild(self, con):
+        con.execute("DELETE FROM claves")
+        n = 0
+        if os.path.exists(self.path):
+            if os.path.getsize(self.path) > 0:   # 0 bytes (primera escritura cortada): sin claves
+                col = pd.read_csv(self.path, usecols=[self.key], dtype=str)[self.key]
+                con.executemany("INSERT OR IGNORE INTO claves VALUES (?)", ((k,) for k in col.dropna()))
+                n = len(col)
+            self._set_meta(con, firma=self._firma_csv())
+        self._set_meta(con, filas=n)
+
+    def _open_index(self) -> sqlite3.Connection:
+        con = self._connect()
+        if not os.path.exists(self.path):
+            if self._meta(con, "filas", "0") != "0":
+                self._rebuild(con)
+        elif self._meta(con, "firma") != self._firma_csv():
+            self._rebuild(con)
+        con.commit()
+        return con
+
+    def _vistas(self, con, claves: List[str]) -> Set[str]:
+        out = set()
+        for i in range(0, len(claves), LOOKUP_CHUNK):
+            lote = claves[i:i+LOOKUP_CHUNK]
+            q = f"SELECT k FROM claves WHERE k IN ({','.join('?' * len(lote))})"
+            out.update(k for (k,) in con.execute(q, lote))
+        return out
+
+    def contiene(self, claves: List[str]) -> Set[str]:
+        """Las `claves` que ya están en el CSV (consulta al índice, sin leerlo)."""
+        if not claves or not os.path.exists(self.path):
+            return set()
+        con = self._open_index()
+        try:
+            return self._vistas(con, [str(k) for k in claves])
+        finally:
+            con.close()
+
+    # ---------- escritura ----------
+    def _header(self) -> List[str]:
+        with open(self.path, encoding="utf-8-sig", newline="") as f:
+            return next(csv.reader(f), [])
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) in (b"\n", b"\r")
+
+    def save_incremental(self, df: pd.DataFrame, reemplazar: bool = False) -> Tuple[int, int]:
+        """
+        Agrega al CSV las filas de `df` con clave nueva. Devuelve (filas_antes, filas_después).
+        reemplazar=True: las filas de `df` pisan a las existentes con la misma clave.
+        """
+        df = df[df[self.key].notna()].drop_duplicates(subset=[self.key], keep="last" if reemplazar else "first")
+        self.reescrito = False
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        con = self._open_index()
+        try:
+            antes = int(self._meta(con, "filas", "0"))
+            if df.empty:
+                return antes, antes
+            existe = os.path.exists(self.path) and os.path.getsize(self.path) > 0
+            header = self._header() if existe else []
+            if reemplazar or (existe and set(df.columns) - set(header)):
+                return antes, self._rewrite(con, df, reemplazar)
+
+            claves = df[self.key].astype(str)
+            vistas = self._vistas(con, claves.tolist())
+            nuevas = df.loc[~claves.isin(vistas).values]
+            if nuevas.empty:
+                return antes, antes
+
+            if existe:
+                if not self._ends_with_newline():
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write("\n")
+                # sin BOM al agregar: el BOM (si lo hay) sólo va al inicio del archivo
+                nuevas.reindex(columns=header).to_csv(self.path, mode="a", header=False,
+                                                       index=False, encoding="utf-8")
+            else:
+                nuevas.to_csv(self.path, index=False, encoding=self.encoding)
+            con.executemany("INSERT OR IGNORE INTO claves VALUES (?)",
+                            ((k,) for k in nuevas[self.key].astype(str)))
+            despues = antes + len(nuevas)
+            self._set_meta(con, filas=despues, firma=self._firma_csv())
+            con.commit()
+            return antes, despues
+        finally:
+            con.close()
+
+    def _rewrite(self, con, df: pd.DataFrame, reemplazar: bool) -> int:
+        hay_csv = os.path.exists(self.path) and os.path.getsize(self.path) > 0
+        prev = pd.read_csv(self.path) if hay_csv else pd.DataFrame(columns=df.columns)
+        uni = pd.concat([prev, df], ignore_index=True)
+        uni = uni.drop_duplicates(subset=[self.key], keep="last" if reemplazar else "first")
+        uni.to_csv(self.path, index=False, encoding=self.encoding)
+        self.reescrito = True
+        self._rebuild(con)
+        con.commit()
+        return len(uni)
+
+class KeySet:
+    """
+    Conjunto persistente de claves ya procesadas (SQLite) con una firma de
+    configuración: si la firma cambia, el llamador debe reconstruir desde cero.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.con = sqlite3.connect(path)
+        self.con.execute("CREATE TABLE IF NOT EXISTS claves (k TEXT PRIMARY KEY)")
+        self.con.execute("CREATE TABLE IF NOT EXISTS meta (nombre TEXT PRIMARY KEY, valor TEXT)")
+
+    def firma(self):
+        row = self.con.execute("SELECT valor FROM meta WHERE nombre='firma'").fetchone()
+        return row[0] if row else None
+
+    def reset(self, firma: str):
+        self.con.execute("DELETE FROM claves")
+        self.con.execute("INSERT OR REPLACE INTO meta VALUES ('firma', ?)", (firma,))
+
+    def vistas(self, claves: List[str]) -> Set[str]:
+        out = set()
+        for i in range(0, len(claves), LOOKUP_CHUNK):
+            lote = claves[i:i+LOOKUP_CHUNK]
+            q = f"SELECT k FROM claves WHERE k IN ({','.join('?' * len(lote))})"
+            out.update(k for (k,) in self.con.execute(q, lote))
+        return out
+
+    def agregar(self, claves):
+        self.con.executemany("INSERT OR IGNORE INTO claves VALUES (?)", ((k,) for k in claves))
+
+    def commit(self):
+        self.con.commit()
+
+    def close(self):
+        self.con.close()
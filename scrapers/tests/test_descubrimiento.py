@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+descubrimiento.py contra un servidor local (http.server): sitemap de noticias,
+sitemap índice con un hijo .xml.gz y un RSS corto que no llega a la marca.
+
+    python -m pytest scrapers/tests
+"""
+
+import gzip, os, sys, threading
+from datetime import date
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import descubrimiento
+
+MARCA = date(2025, 3, 1)
+SITIO = "https://www.analisisdigital.com.ar"   # FEEDS["analisisdigital"] sólo incluye /provinciales/
+
+NEWS = f"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:news="http://www.google.com/schemas/sitemap-news/0.9">
+  <url><loc>{SITIO}/provinciales/vieja</loc>
+    <news:news><news:publication_date>2025-02-20T09:00:00-03:00</news:publication_date>
+    <news:title>Vieja</news:title></news:news></url>
+  <url><loc>{SITIO}/provinciales/marzo-5</loc>
+    <news:news><news:publication_date>2025-03-05T09:00:00-03:00</news:publication_date>
+    <news:title>Cinco</news:title></news:news></url>
+  <url><loc>{SITIO}/deportes/marzo-8</loc>
+    <news:news><news:publication_date>2025-03-08T09:00:00-03:00</news:publication_date>
+    <news:title>Otra sección</news:title></news:news></url>
+  <url><loc>{SITIO}/provinciales/marzo-10</loc>
+    <news:news><news:publication_date>2025-03-10T09:00:00-03:00</news:publication_date>
+    <news:title>Diez</news:title></news:news></url>
+  <url><loc>{SITIO}/provinciales/marca</loc><lastmod>2025-03-01</lastmod></url>
+</urlset>
+"""
+
+INDICE = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>{base}/sitemap-2.xml.gz</loc><lastmod>2025-03-09</lastmod></sitemap>
+  <sitemap><loc>{base}/sitemap-1.xml</loc><lastmod>2025-01-15</lastmod></sitemap>
+</sitemapindex>
+"""
+
+HIJO = f"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>{SITIO}/provinciales/hijo-vieja</loc><lastmod>2025-02-27</lastmod></url>
+  <url><loc>{SITIO}/provinciales/hijo-nueva</loc><lastmod>2025-03-09T12:00:00Z</lastmod></url>
+</urlset>
+"""
+
+RSS_CORTO = f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>AD</title>
+  <item><title>Hoy</title><link>{SITIO}/provinciales/rss-hoy</link>
+    <pubDate>Mon, 10 Mar 2025 10:00:00 -0300</pubDate></item>
+  <item><title>Ayer</title><link>{SITIO}/provinciales/rss-ayer</link>
+    <pubDate>Sun, 09 Mar 2025 10:00:00 -0300</pubDate></item>
+</channel></rss>
+"""
+
+class _Silencioso(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(scope="module")
+def servidor(tmp_path_factory):
+    """Sirve una carpeta con los XML; devuelve la URL base."""
+    raiz = tmp_path_factory.mktemp("feeds")
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), partial(_Silencioso, directory=str(raiz)))
+    base = f"http://127.0.0.1:{srv.server_address[1]}"
+    (raiz / "news.xml").write_text(NEWS, encoding="utf-8")
+    (raiz / "index.xml").write_text(INDICE.format(base=base), encoding="utf-8")
+    (raiz / "sitemap-2.xml.gz").write_bytes(gzip.compress(HIJO.encode("utf-8")))
+    # sitemap-1.xml no existe: es anterior a la marca y no se tiene que pedir
+    (raiz / "rss.xml").write_text(RSS_CORTO, encoding="utf-8")
+    hijos = "".join(f"<sitemap><loc>{base}/sitemap-2.xml.gz</loc><lastmod>2025-03-0{d}</lastmod></sitemap>"
+                    for d in (7, 8, 9))
+    (raiz / "index-grande.xml").write_text(
+        f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{hijos}</sitemapindex>',
+        encoding="utf-8")
+    hilo = threading.Thread(target=srv.serve_forever, daemon=True)
+    hilo.start()
+    yield base
+    srv.shutdown()
+    srv.server_close()
+
+def _descubrir(urls, **kw):
+    return descubrimiento.descubrir("analisisdigital", MARCA, urls=urls, log=lambda m: None, **kw)
+
+def test_news_sitemap_filtra_por_lastmod_y_seccion(servidor):
+    res = _descubrir([f"{servidor}/news.xml"])
+    assert [e.url for e in res] == [f"{SITIO}/provinciales/marzo-10", f"{SITIO}/provinciales/marzo-5",
+                                    f"{SITIO}/provinciales/marca"]
+    assert res[0].titulo == "Diez"
+    assert all(e.lastmod.date() >= MARCA for e in res)
+
+def test_patron_reemplaza_al_de_feeds(servidor):
+    res = _descubrir([f"{servidor}/news.xml"], patron=r"/deportes/")
+    assert [e.url for e in res] == [f"{SITIO}/deportes/marzo-8"]
+
+def test_indice_con_hijo_gzip(servidor):
+    res = _descubrir([f"{servidor}/index.xml"])
+    assert [e.url for e in res] == [f"{SITIO}/provinciales/hijo-nueva"]
+
+def test_indice_truncado_no_sirve(servidor, monkeypatch):
+    # 3 hijos desde la marca con tope 2: aunque un hijo leído tenga una nota vieja,
+    # el que queda afuera tendría notas nuevas → None (el llamador recorre el listado)
+    monkeypatch.setattr(descubrimiento, "MAX_SITEMAPS", 2)
+    assert _descubrir([f"{servidor}/index-grande.xml"]) is None
+
+def test_rss_corto_no_llega_a_la_marca(servidor):
+    assert _descubrir([f"{servidor}/rss.xml"]) is None
+    # con un endpoint detrás que sí llega, se usa ése
+    res = _descubrir([f"{servidor}/rss.xml", f"{servidor}/news.xml"])
+    assert res[0].url == f"{SITIO}/provinciales/marzo-10"
+
+def test_sin_endpoint_devuelve_none(servidor):
+    assert _descubrir([f"{servidor}/no-existe.xml"]) is None
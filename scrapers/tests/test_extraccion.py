@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Páginas de detalle que lxml no parsea como str (vacías, sólo comentarios,
+declaración <?xml ...?>): el motor no tiene que lanzar, como con html.parser.
+
+    python -m pytest scrapers/tests
+"""
+
+import os, sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import extraccion
+import html_parse
+
+XHTML = ('<?xml version="1.0" encoding="utf-8"?>\n'
+         '<html><body><h1 class="titulo-nota">Título</h1>'
+         '<div class="texto"><p>Primer párrafo.</p></div></body></html>')
+
+@pytest.fixture(params=html_parse.disponibles())
+def backend(request, monkeypatch):
+    monkeypatch.setattr(html_parse, "BACKEND", request.param)
+    return request.param
+
+@pytest.mark.parametrize("html", ["", "   \n\t ", "<!-- sin contenido -->"])
+def test_documento_vacio_da_nota_vacia(backend, html):
+    nota = extraccion.extraer("elargentino", html)
+    assert (nota.titulo, nota.contenido, nota.fecha, nota.fuente_fecha) == ("", "", None, "none")
+    html_parse.sopa(html, extraccion.extractor("elargentino").recorte)
+
+def test_declaracion_xml(backend):
+    nota = extraccion.extraer("elargentino", XHTML)
+    assert nota.titulo == "Título"
+    assert nota.parrafos == ["Primer párrafo."]
+    assert html_parse.sopa(XHTML, ["h1"]).h1.get_text() == "Título"
@@ -2,20 +2,28 @@
 # Scraper UNO Digital (intendentes y ciudades)
 # =====================================
 # - Busca solo notas que mencionan personas o localidades clave
-# - Paginación sin Selenium
+# - Paginación sin Selenium: seek de la página de corte + descarga en paralelo
 # - Incremental + deduplicación
 # =====================================
 
-import os, re, time, logging, random
-from datetime import datetime, timedelta
+import os, logging
+from datetime import date, datetime, timedelta
 from hashlib import md5
 from urllib.parse import urljoin
 
-import requests
 import pandas as pd
-from bs4 import BeautifulSoup
 import sys
 
+import http_client
+from matcher import Matcher
+import html_cache
+import extraccion
+from html_parse import sopa
+from store import AppendStore
+from fetch_pool import HostTokenBucket, fetch_in_order
+from page_seek import primera_pagina_vieja
+from http_client import NotModified
+
 # -------- CONFIG GLOBAL --------
 MEDIO = "unodigital"
 SECCIONES = {
@@ -26,26 +34,39 @@ OUT_PATH = "../data/raw/unodigital_municipales.csv"
 TMP_DIR = "tmp"
 BACKUP_LISTADO = f"{TMP_DIR}/tmp_listado_{MEDIO}.csv"
 BACKUP_DETALLE = f"{TMP_DIR}/tmp_detalle_{MEDIO}.csv"
+MAX_PAGINAS = 399
+RATE = 1.5      # pedidos/seg al host (reemplaza el sleep de 0.7–1.4s por página)
+WORKERS = 4
+VALIDADORES = http_client.validadores(OUT_PATH)   # GET condicional: sólo notas ya guardadas en OUT_PATH
 
 # -------- FILTRO RELEVANTE --------
-CLAVES_RELEVANTES = [
-    "rosario romero", "romero",
-    "francisco azcué", "azcue", "azcué",
-    "mauricio davico", "davico",
-    "jose eduardo lauritto", "lauritto",
-    "dora bogdan", "bogdan",
-    "claudia monjo", "monjo",
-    "paraná", "concordia", "gualeguaychú", "gualeguaychu",
-    "concepción del uruguay", "concepcion del uruguay",
-    "gualeguay", "villaguay"
-]
+CLAVES_RELEVANTES = {
+    # Intendentes
+    "rosario romero":         ["rosario romero", "romero"],
+    "francisco azcué":        ["francisco azcué", "azcué"],
+    "mauricio davico":        ["mauricio davico", "davico"],
+    "jose eduardo lauritto":  ["jose eduardo lauritto", "jose lauritto", "lauritto"],
+    "dora bogdan":            ["dora bogdan", "bogdan"],
+    "claudia monjo":          ["claudia monjo", "monjo"],
+    # Localidades
+    "paraná":                 ["paraná"],
+    "concordia":              ["concordia"],
+    "gualeguaychú":           ["gualeguaychú"],
+    "concepción del uruguay": ["concepción del uruguay"],
+    "gualeguay":              ["gualeguay"],
+    "villaguay":              ["villaguay"],
+}
+MATCHER = Matcher(CLAVES_RELEVANTES)   # sin tildes: "azcue" == "azcué"
+
 def menciona_relevante(texto):
-    texto = texto.lower()
-    return any(k in texto for k in CLAVES_RELEVANTES)
+    return MATCHER.menciona(texto)
 
 # -------- FECHA CORTE --------
-if len(sys.argv) > 1:
-    FECHA_CORTE_STR = sys.argv[1]
+# uso: python <script>.py [YYYY-MM-DD] [--replay]
+ARGS   = [a for a in sys.argv[1:] if not a.startswith("--")]
+REPLAY = "--replay" in sys.argv   # re-parsear desde data/html_cache/ sin red
+if ARGS:
+    FECHA_CORTE_STR = ARGS[0]
     FECHA_CORTE_DT = datetime.strptime(FECHA_CORTE_STR, "%Y-%m-%d")
 else:
     FECHA_CORTE_DT = datetime.today() - timedelta(days=7)
@@ -61,48 +82,34 @@ logging.basicConfig(filename=LOG_PATH, level=logging.INFO, format="%(asctime)s -
 SEL_CARD = "article.standard-entry-box, article.big-entry-box"
 SEL_TITLE = ".entry-data h2.entry-title"
 SEL_LINK = "a.cover-link"
-SEL_FECHA_DET = ".fecha-container .nota-fecha"
-SEL_COPETE = "p.ignore-parser"
-SEL_CONTENIDO = ".article-body p"
 EXCLUIR_SMALL = ".small-entry"
+# el detalle (fecha, título, copete, cuerpo) se lee con la spec "unodigital" de extraccion.py
 
 # -------- FUNCIONES AUX --------
 HEADERS = {"User-Agent": "Mozilla/5.0"}
-MESES_ES = {
-    "enero":"01","febrero":"02","marzo":"03","abril":"04","mayo":"05","junio":"06",
-    "julio":"07","agosto":"08","septiembre":"09","octubre":"10","noviembre":"11","diciembre":"12"
-}
-def parse_fecha_es(txt):
-    if not txt:
-        return None
-    m = re.search(r'(\d{1,2})\s+de\s+([a-záéíóú]+)\s+(\d{4})', txt.lower())
-    if not m:
-        return None
-    d, mes_str, y = int(m.group(1)), m.group(2), int(m.group(3))
-    mes = MESES_ES.get(mes_str.strip(" ."))
-    if not mes:
-        return None
-    return datetime(y, int(mes), d)
-
 def make_hash(v):
     return md5(v.encode("utf-8")).hexdigest()
 
 def get_soup(url):
-    r = requests.get(url, headers=HEADERS, timeout=20)
+    r = http_client.get(url, headers=HEADERS, timeout=20)
     r.raise_for_status()
-    return BeautifulSoup(r.text, "html.parser")
-
-def scrape_detalle(url):
-    soup = get_soup(url)
-    fecha_txt = soup.select_one(SEL_FECHA_DET)
-    fecha = parse_fecha_es(fecha_txt.get_text(strip=True)) if fecha_txt else None
-
-    h1 = soup.find("h1")
-    titulo = h1.get_text(strip=True) if h1 else ""
+    return sopa(r.text)
+
+def scrape_detalle(url, seccion=None, guardada=False):
+    """
+    (nota, fecha, respuesta). guardada=True: la nota ya está en OUT_PATH y se pide
+    condicional (304 → NotModified, que scrape_notas saltea). Los validadores se
+    registran recién al sumar la nota.
+    """
+    r = http_client.get(url, headers=HEADERS, timeout=20, validators=VALIDADORES if guardada else None)
+    r.raise_for_status()
+    html_cache.put(MEDIO, url, r.text, seccion=seccion)
+    nota, fecha = parse_detalle(r.text, url)
+    return nota, fecha, r
 
-    copete = " ".join(p.get_text(strip=True) for p in soup.select(SEL_COPETE))
-    contenido = " ".join(p.get_text(strip=True) for p in soup.select(SEL_CONTENIDO))
-    texto = f"{copete} {contenido}".strip()
+def parse_detalle(html, url):
+    nota = extraccion.extraer(MEDIO, html)
+    fecha, titulo, texto = nota.fecha, nota.titulo, nota.contenido
 
     if not (menciona_relevante(titulo) or menciona_relevante(texto)):
         return None, fecha  # no relevante
@@ -116,45 +123,95 @@ def scrape_detalle(url):
         "medio": MEDIO
     }, fecha
 
-def run():
+def replay_notas():
+    """Re-parsea desde data/html_cache/ las notas relevantes con fecha >= corte (sin red)."""
+    noticias = []
+    for url, html, meta in html_cache.iter_medio(MEDIO):
+        nota, fecha = parse_detalle(html, url)
+        if nota and (not fecha or fecha >= FECHA_CORTE_DT):
+            nota["seccion"] = meta.get("seccion")
+            noticias.append(nota)
+    print(f"Replay: {len(noticias)} notas re-parseadas desde caché")
+    return noticias
+
+def enlaces_pagina(soup):
+    enlaces = []
+    for c in soup.select(SEL_CARD):
+        if c.select_one(EXCLUIR_SMALL):
+            continue
+        href = c.select_one(SEL_LINK)
+        if href:
+            enlaces.append(urljoin("https://www.unoentrerios.com.ar/", href.get("href")))
+    return enlaces
+
+def ultima_pagina(base_url):
+    """Primera página cuya última nota es anterior al corte (galope + binaria, ver page_seek.py)."""
+    def fecha_pagina(n):
+        try:
+            enlaces = enlaces_pagina(get_soup(f"{base_url.rstrip('/')}/{n}"))
+        except Exception:
+            return date.min  # página inexistente: fin del listado
+        if not enlaces:
+            return date.min
+        try:
+            r = http_client.get(enlaces[-1], headers=HEADERS, timeout=20)
+            fecha = parse_detalle(r.text, enlaces[-1])[1] if r.ok else None
+        except Exception:
+            fecha = None
+        return fecha.date() if fecha else None
+    return primera_pagina_vieja(fecha_pagina, FECHA_CORTE_DT.date(), MAX_PAGINAS,
+                                log=lambda m: logging.info(m) or print(m))
+
+def scrape_notas():
+    """
+    Antes se recorrían las 400 páginas de cada sección. Ahora el seek ubica la
+    página del corte y las páginas 1..P (listados y detalles) se bajan en paralelo
+    con la cortesía por host de fetch_pool.
+    """
     noticias = []
+    throttle = HostTokenBucket(rate=RATE, burst=WORKERS)
     for seccion, base_url in SECCIONES.items():
-        for n in range(1, 400):
-            url = f"{base_url.rstrip('/')}/{n}"
-            try:
-                soup = get_soup(url)
-            except:
+        ultima = ultima_pagina(base_url)
+        urls = [f"{base_url.rstrip('/')}/{n}" for n in range(1, ultima + 1)]
+        enlaces = []
+        # a lo sumo WORKERS páginas por delante: al cortar no se baja el resto del listado
+        for url, r in fetch_in_order(lambda u: http_client.get(u, headers=HEADERS, timeout=20),
+                                     urls, throttle, max_workers=WORKERS, adelanto=WORKERS):
+            if r is None or isinstance(r, Exception) or not r.ok:
                 break
-
-            cards = [c for c in soup.select(SEL_CARD) if not c.select_one(EXCLUIR_SMALL)]
-            if not cards:
+            nuevos = enlaces_pagina(sopa(r.text))
+            if not nuevos:
                 break
+            enlaces.extend(e for e in nuevos if e not in enlaces)
+
+        guardadas = AppendStore(OUT_PATH, key="id").contiene([make_hash(e) for e in enlaces])
+        fetch = lambda u: scrape_detalle(u, seccion, guardada=make_hash(u) in guardadas)
+        for enlace, res in fetch_in_order(fetch, enlaces, throttle, max_workers=WORKERS):
+            if isinstance(res, NotModified):
+                # sólo se pide condicional para notas ya guardadas: nada que agregar
+                logging.info("304 sin cambios (%s): %s", res.meta.get("fecha") or "-", enlace)
+                continue
+            if res is None or isinstance(res, Exception):
+                logging.warning("Error en nota %s: %s", enlace, res)
+                continue
+            nota, fecha, r = res
+            if nota and (not fecha or fecha >= FECHA_CORTE_DT):
+                nota["seccion"] = seccion
+                noticias.append(nota)
+                VALIDADORES.remember(enlace, r, fecha=fecha.strftime("%Y-%m-%d") if fecha else "")
+    return noticias
 
-            for c in cards:
-                href = c.select_one(SEL_LINK)
-                if not href:
-                    continue
-                enlace = urljoin("https://www.unoentrerios.com.ar/", href.get("href"))
-                try:
-                    nota, fecha = scrape_detalle(enlace)
-                    if nota and (not fecha or fecha >= FECHA_CORTE_DT):
-                        nota["seccion"] = seccion
-                        noticias.append(nota)
-                except Exception as e:
-                    continue
-
-            time.sleep(random.uniform(0.7, 1.4))
-
+def run():
+    noticias = replay_notas() if REPLAY else scrape_notas()
     df = pd.DataFrame(noticias)
     if df.empty:
         print("No se encontraron notas relevantes.")
         return
 
-    if os.path.exists(OUT_PATH):
-        prev = pd.read_csv(OUT_PATH)
-        df = pd.concat([prev, df], ignore_index=True).drop_duplicates(subset=["id"])
-    df.to_csv(OUT_PATH, index=False)
-    print(f"Total guardado: {len(df)} notas")
+    # append-only (ver store.py); en replay las filas re-extraídas pisan a las previas
+    _, total = AppendStore(OUT_PATH, key="id").save_incremental(df, reemplazar=REPLAY)
+    VALIDADORES.save()  # recién con las filas en OUT_PATH
+    print(f"Total guardado: {total} notas")
 
 if __name__ == "__main__":
     run()
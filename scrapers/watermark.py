@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Marca de agua por medio: lo que scraper_semanal necesita del histórico de
+data/raw/ para arrancar (máxima fecha + enlaces centinela de ese día), sin leer
+el CSV. Vive al lado del CSV, en <csv>.manifest.json:
+
+    {"version", "max_fecha", "sentinels", "filas", "crc32", "tamano", "mtime_ns"}
+
+- process_week.merge_into_raw lo mantiene: si AppendStore sólo agregó filas al
+  final, se parsean únicamente los bytes agregados y el crc32 sigue desde el
+  anterior; si el CSV se reescribió (replay, columnas nuevas) o el manifiesto no
+  estaba al día, se recalcula escaneando.
+- leer() es O(1) si tamaño y mtime coinciden; si sólo cambió el mtime (copia,
+  checkout) se verifica el crc32 del contenido y se guarda el mtime nuevo. Si
+  falta o quedó viejo → None, y ultimo() escanea el CSV y reescribe el manifiesto.
+"""
+
+import os, io, csv, json, zlib
+from datetime import date
+from typing import Optional, Set, Tuple
+
+import pandas as pd
+
+VERSION = 1
+CRC_CHUNK = 1 << 20
+
+def manifest_path(csv_path: str) -> str:
+    return csv_path + ".manifest.json"
+
+def _crc32(path: str) -> int:
+    crc = 0
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(CRC_CHUNK), b""):
+            crc = zlib.crc32(bloque, crc)
+    return crc
+
+def _marca(df: pd.DataFrame) -> Tuple[Optional[date], Set[str]]:
+    """(máxima fecha, enlaces de esa fecha) de un DataFrame con 'fecha' y 'enlace'."""
+    if "fecha" not in df.columns or df.empty:
+        return None, set()
+    d = pd.to_datetime(df["fecha"], errors="coerce").dt.date
+    if not d.notna().any():
+        return None, set()
+    max_fecha = d.dropna().max()
+    sentinels = set(df.loc[d == max_fecha, "enlace"].dropna().astype(str)) if "enlace" in df.columns else set()
+    return max_fecha, sentinels
+
+def _armar(csv_path: str, max_fecha: Optional[date], sentinels: Set[str], filas: int, crc: int) -> dict:
+    st = os.stat(csv_path)
+    return {"version": VERSION, "max_fecha": max_fecha.isoformat() if max_fecha else None,
+            "sentinels": sorted(sentinels), "filas": int(filas), "crc32": crc,
+            "tamano": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def escanear(csv_path: str) -> dict:
+    """Manifiesto calculado leyendo el CSV (sólo 'fecha' y 'enlace')."""
+    df = pd.read_csv(csv_path, usecols=lambda c: c in ("fecha", "enlace"), dtype=str)
+    max_fecha, sentinels = _marca(df)
+    return _armar(csv_path, max_fecha, sentinels, len(df), _crc32(csv_path))
+
+def guardar(csv_path: str, man: dict):
+    path = manifest_path(csv_path)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(man, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def leer(csv_path: str) -> Optional[dict]:
+    """El manifiesto si está al día con el CSV; None si falta o quedó viejo."""
+    try:
+        with open(manifest_path(csv_path), encoding="utf-8") as f:
+            man = json.load(f)
+        st = os.stat(csv_path)
+    except (OSError, ValueError):
+        return None
+    if man.get("version") != VERSION or st.st_size != man.get("tamano"):
+        return None
+    if st.st_mtime_ns != man.get("mtime_ns"):
+        if _crc32(csv_path) != man.get("crc32"):
+            return None
+        # mismo contenido (copia, checkout): se guarda el mtime nuevo para no volver a hashear
+        man["mtime_ns"] = st.st_mtime_ns
+        try:
+            guardar(csv_path, man)
+        except OSError:
+            pass
+    return man
+
+def actualizar(csv_path: str, previo: Optional[dict], agregado: bool) -> dict:
+    """
+    Reescribe el manifiesto tras una escritura del CSV. previo: leer() de antes de
+    escribir; agregado: la escritura sólo agregó filas al final (sin reescribir).
+    """
+    if previo is not None and agregado and os.path.getsize(csv_path) >= previo["tamano"]:
+        with open(csv_path, "rb") as f:
+            f.seek(previo["tamano"])
+            nuevo = f.read()
+        with open(csv_path, encoding="utf-8-sig", newline="") as f:
+            header = next(csv.reader(f), [])
+        filas = pd.DataFrame(columns=header)
+        if nuevo.strip():
+            filas = pd.read_csv(io.BytesIO(nuevo), header=None, names=header, dtype=str, encoding="utf-8")
+        prev_max = date.fromisoformat(previo["max_fecha"]) if previo["max_fecha"] else None
+        max_fecha, sentinels = _marca(filas)
+        if max_fecha is None or (prev_max is not None and max_fecha < prev_max):
+            max_fecha, sentinels = prev_max, set(previo["sentinels"])
+        elif max_fecha == prev_max:
+            sentinels |= set(previo["sentinels"])
+        man = _armar(csv_path, max_fecha, sentinels, previo["filas"] + len(filas),
+                     zlib.crc32(nuevo, previo["crc32"]))
+    else:
+        man = escanear(csv_path)
+    guardar(csv_path, man)
+    return man
+
+def ultimo(csv_path: str) -> Tuple[Optional[date], Set[str]]:
+    """(max_fecha, sentinels) del histórico: del manifiesto, o escaneando si hace falta."""
+    if not os.path.exists(csv_path):
+        return None, set()
+    man = leer(csv_path)
+    if man is None:
+        man = escanear(csv_path)
+        guardar(csv_path, man)
+    max_fecha = date.fromisoformat(man["max_fecha"]) if man["max_fecha"] else None
+    return max_fecha, set(man["sentinels"])
@@ -1,13 +1,17 @@
 import os
+import sys
 import pandas as pd
 import numpy as np
 import re
 import unicodedata
 from collections import Counter
 from pysentimiento import create_analyzer
-import spacy
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scrapers"))
+from matcher import Matcher
+from lemmas import load_nlp, lematizar
+from embeddings import EmbeddingStore
+from grafo import aristas_similitud
 
 # --- RUTAS ---
 RAW_PATH = os.path.join("..", "data", "raw")
@@ -53,10 +57,15 @@ def limpiar_y_estandarizar_df(df, medio):
     df['fecha'] = df['fecha'].apply(parse_fecha_flexible)
     return df
 
-def etiquetar_parrafos(texto, regex):
-    if pd.isna(texto): return []
+def etiquetar_parrafos(texto, matcher):
+    """{entidad: [párrafos que la mencionan]}: una sola pasada del matcher por párrafo."""
+    out = {}
+    if pd.isna(texto): return out
     parrafos = [p.strip() for p in re.split(r'\.\s+', str(texto)) if p.strip()]
-    return [p for p in parrafos if re.search(regex, p.lower())]
+    for p in parrafos:
+        for entidad in matcher.entidades(p):
+            out.setdefault(entidad, []).append(p)
+    return out
 
 def analizar_sentimiento(parrafos, figura, analyzer):
     resultados = []
@@ -74,44 +83,42 @@ def analizar_sentimiento(parrafos, figura, analyzer):
 def normalizar_palabra(palabra):
     return ''.join(c for c in unicodedata.normalize('NFD', palabra) if unicodedata.category(c) != 'Mn').lower()
 
-def procesar_texto_y_bigrams(texto, nlp, stopwords, excluir):
-    doc = nlp(texto)
-    tokens = [normalizar_palabra(t.lemma_) for t in doc if t.is_alpha]
+def procesar_texto_y_bigrams(lemas, stopwords, excluir):
+    tokens = [normalizar_palabra(l) for l in lemas.lemmas]
     bigramas = [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
     palabras_limpias = [w for w in tokens if w not in stopwords and w not in excluir and 3 <= len(w) <= 20]
     bigramas_limpios = [b for b in bigramas if all(w not in stopwords and w not in excluir for w in b.split())]
     return palabras_limpias + bigramas_limpios
 
 def contar_frecuencias(df):
+    # una sola pasada de spaCy para todos los párrafos, reutilizada entre corridas (scrapers/lemmas.py).
+    # n_process=1: este script no corre bajo `if __name__ == "__main__"` (spawn en Windows).
+    lemas = dict(zip(df['parrafo'], lematizar(df['parrafo'].tolist(), n_process=1)))
     registros = []
     for sent in df['sentimiento'].unique():
         subset = df[df['sentimiento'] == sent]
         tokens = []
         for texto in subset['parrafo']:
-            tokens.extend(procesar_texto_y_bigrams(texto, nlp, stopwords, excluir))
+            tokens.extend(procesar_texto_y_bigrams(lemas[texto], stopwords, excluir))
         for palabra, freq in Counter(tokens).items():
             registros.append({'palabra': palabra, 'sentimiento': sent, 'frecuencia': freq})
     return pd.DataFrame(registros)
 
 def construir_grafo_semantico(frecuencias_df):
-    model = SentenceTransformer('distiluse-base-multilingual-cased-v2')
-    grafo_rows = []
+    model = EmbeddingStore('distiluse-base-multilingual-cased-v2')  # sólo codifica palabras nuevas
+    grafos = []
     for sent in frecuencias_df['sentimiento'].unique():
         top = frecuencias_df[frecuencias_df['sentimiento'] == sent].nlargest(100, 'frecuencia')
         palabras = top['palabra'].tolist()
         embeddings = model.encode(palabras)
-        sims = cosine_similarity(embeddings)
-        for i in range(len(palabras)):
-            for j in range(i+1, len(palabras)):
-                sim = sims[i, j]
-                if sim > 0.5:
-                    grafo_rows.append({
-                        'palabra_1': palabras[i],
-                        'palabra_2': palabras[j],
-                        'peso': round(sim, 3),
-                        'sentimiento': sent
-                    })
-    return pd.DataFrame(grafo_rows)
+        aristas = aristas_similitud(embeddings, ids=palabras, umbral=0.5)
+        aristas = aristas.rename(columns={'from': 'palabra_1', 'to': 'palabra_2', 'weight': 'peso'})
+        aristas['peso'] = aristas['peso'].round(3)
+        aristas['sentimiento'] = sent
+        grafos.append(aristas)
+    if not grafos:
+        return pd.DataFrame(columns=['palabra_1', 'palabra_2', 'peso', 'sentimiento'])
+    return pd.concat(grafos, ignore_index=True)
 
 # --- EJECUCIÓN PRINCIPAL ---
 dfs = []
@@ -125,12 +132,15 @@ for archivo in ARCHIVOS:
 
 noticias = pd.concat(dfs, ignore_index=True).drop_duplicates(subset=['enlace'])
 
-# Regex
-FRIGERIO_REGEX = r'\b(rogelio\s+frigerio|frigerio|gobernador\s+frigerio)\b'
-ROMERO_REGEX = r'\b(rosario\s+romero|intendenta\s+romero)\b'
+# Figuras (palabra completa, sin tildes)
+FIGURAS = Matcher({
+    'frigerio': ['rogelio frigerio', 'frigerio', 'gobernador frigerio'],
+    'romero':   ['rosario romero', 'intendenta romero'],
+}, palabra_completa=True)
 
-noticias['parrafos_frigerio'] = noticias['contenido'].apply(lambda t: etiquetar_parrafos(t, FRIGERIO_REGEX))
-noticias['parrafos_romero'] = noticias['contenido'].apply(lambda t: etiquetar_parrafos(t, ROMERO_REGEX))
+etiquetas = noticias['contenido'].apply(lambda t: etiquetar_parrafos(t, FIGURAS))
+noticias['parrafos_frigerio'] = etiquetas.apply(lambda d: d.get('frigerio', []))
+noticias['parrafos_romero'] = etiquetas.apply(lambda d: d.get('romero', []))
 
 parrafos_f = sum(noticias['parrafos_frigerio'].tolist(), [])
 parrafos_r = sum(noticias['parrafos_romero'].tolist(), [])
@@ -142,7 +152,7 @@ sentimientos_f = analizar_sentimiento(parrafos_f, "frigerio", analyzer)
 sentimientos_r = analizar_sentimiento(parrafos_r, "romero", analyzer)
 df_sentimientos = pd.DataFrame(sentimientos_f + sentimientos_r)
 
-nlp = spacy.load("es_core_news_sm")
+nlp = load_nlp()
 stopwords = nlp.Defaults.stop_words
 excluir = {normalizar_palabra(w) for w in ['frigerio','rogeli','romero','rosario','gobernador','intendenta','gobierno','provincia','nacional','milei']}
 